@@ -1,760 +1,1485 @@
 # Author: Joshua Arnett
 # GitHub username: joshua-arnett
 # Date: 06/05/24
-# Description: Defines classes representing different chess pieces, all inheriting from a ChessPiece chess. Also defines a ChessVar class that represent an chess atomic chess game.
+# Description: Defines classes representing different chess pieces, all inheriting from a ChessPiece chess. Also defines an AtomicGame class that holds the rules of an atomic chess game without any terminal output,
+#              a BoardRenderer class that draws the board, and a ChessVar class that lets two players play an AtomicGame through a text UI.
+
+import random
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+
+# ------------------------------ Bitboard representation ------------------------------ #
+# Squares are the integers 0-63, with a1 = 0, b1 = 1, ..., h1 = 7, a2 = 8, ..., h8 = 63,
+# so a square's column is square % 8 and its row is square // 8.
+# A bitboard is an integer whose bit number n is set when square n is part of the set it represents.
+
+WHITE = 0
+BLACK = 1
+COLOR_NAMES = ("White", "Black")
+
+PAWN = 0
+KNIGHT = 1
+BISHOP = 2
+ROOK = 3
+QUEEN = 4
+KING = 5
+
+# Material values in centipawns, indexed by piece type. Kings have no material value,
+# because losing one loses the game.
+PIECE_VALUES = (100, 300, 300, 500, 900, 0)
+
+# A piece code is color * 6 + piece type, so white pieces are 0-5 and black pieces are 6-11.
+EMPTY = -1
+PIECE_EMOJIS = ("♟", "♞", "♝", "♜", "♛", "♚",
+                "♙", "♘", "♗", "♖", "♕", "♔")
+PIECE_LETTERS = "PNBRQKpnbrqk"
+
+SQUARE_NAMES = tuple(column + row for row in "12345678" for column in "abcdefgh")
+SQUARE_INDEX = {name: square for square, name in enumerate(SQUARE_NAMES)}
+BIT = tuple(1 << square for square in range(64))
+
+
+def _build_blast_masks():
+    """Returns, for each square, the bitboard of the 3 x 3 block of tiles centered on it."""
+    blast_masks = []
+    for square in range(64):
+        column, row = square % 8, square // 8
+        mask = 0
+        for row_offset in range(-1, 2):
+            for column_offset in range(-1, 2):
+                if 0 <= column + column_offset < 8 and 0 <= row + row_offset < 8:
+                    mask |= BIT[(row + row_offset) * 8 + column + column_offset]
+        blast_masks.append(mask)
+    return tuple(blast_masks)
+
+
+BLAST_MASKS = _build_blast_masks()
+
+
+def iter_squares(bitboard):
+    """Yields the squares of a bitboard, from lowest to highest."""
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+# ---------------------------------- Attack tables ----------------------------------- #
+# Every table below is built once, when the module is imported.
+
+# Ray directions as (column step, row step). The first four directions move toward higher squares,
+# so the nearest blocker on their rays is the lowest set bit; the last four move toward lower squares.
+NORTH, EAST, NORTH_EAST, NORTH_WEST, SOUTH, WEST, SOUTH_WEST, SOUTH_EAST = range(8)
+DIRECTION_STEPS = ((0, 1), (1, 0), (1, 1), (-1, 1), (0, -1), (-1, 0), (-1, -1), (1, -1))
+ROOK_DIRECTIONS = (NORTH, EAST, SOUTH, WEST)
+BISHOP_DIRECTIONS = (NORTH_EAST, NORTH_WEST, SOUTH_WEST, SOUTH_EAST)
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+
+def _step_mask(square, steps):
+    """Returns the bitboard of the tiles reached from a square by each (column step, row step) that stays on the board."""
+    column, row = square % 8, square // 8
+    mask = 0
+    for column_step, row_step in steps:
+        if 0 <= column + column_step < 8 and 0 <= row + row_step < 8:
+            mask |= BIT[(row + row_step) * 8 + column + column_step]
+    return mask
+
+
+def _ray_mask(square, column_step, row_step):
+    """Returns the bitboard of the tiles from a square (not included) to the edge of the board in one direction."""
+    column, row = square % 8 + column_step, square // 8 + row_step
+    mask = 0
+    while 0 <= column < 8 and 0 <= row < 8:
+        mask |= BIT[row * 8 + column]
+        column += column_step
+        row += row_step
+    return mask
+
+
+def _build_between_masks():
+    """Returns, for each pair of squares on a shared row, column or diagonal, the bitboard of the tiles strictly between them."""
+    between_masks = [[0] * 64 for _ in range(64)]
+    for square in range(64):
+        for column_step, row_step in DIRECTION_STEPS:
+            column, row = square % 8 + column_step, square // 8 + row_step
+            path = 0
+            while 0 <= column < 8 and 0 <= row < 8:
+                between_masks[square][row * 8 + column] = path
+                path |= BIT[row * 8 + column]
+                column += column_step
+                row += row_step
+    return tuple(tuple(masks) for masks in between_masks)
+
+
+KNIGHT_ATTACKS = tuple(_step_mask(square, ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+                       for square in range(64))
+KING_ATTACKS = tuple(_step_mask(square, ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)))
+                     for square in range(64))
+
+# Pawn tables are indexed by color first, because white and black pawns move in opposing directions.
+PAWN_ATTACKS = (tuple(_step_mask(square, ((-1, 1), (1, 1))) for square in range(64)),
+                tuple(_step_mask(square, ((-1, -1), (1, -1))) for square in range(64)))
+PAWN_PUSHES = (tuple(_step_mask(square, ((0, 1),)) for square in range(64)),
+               tuple(_step_mask(square, ((0, -1),)) for square in range(64)))
+PAWN_DIRECTIONS = (8, -8)
+
+RAYS = tuple(tuple(_ray_mask(square, column_step, row_step) for square in range(64))
+             for column_step, row_step in DIRECTION_STEPS)
+BETWEEN = _build_between_masks()
+
+
+def sliding_attacks(square, occupied, directions):
+    """
+    Returns the bitboard of the tiles a sliding piece on a square reaches in the given directions.
+    Each ray stops at (and includes) the first occupied tile.
+    """
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            if direction < 4:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            # Everything past the first blocker is cut off the ray
+            ray ^= RAYS[direction][blocker]
+        attacks |= ray
+    return attacks
+
+
+def piece_attacks(piece_code, square, occupied):
+    """
+    Returns the bitboard of the tiles a piece on a square could capture on, given the occupied tiles.
+    Pawns attack their two forward diagonals. Kings attack the tiles around them, even though they cannot capture.
+    """
+    piece_type = piece_code % 6
+    if piece_type == PAWN:
+        return PAWN_ATTACKS[piece_code // 6][square]
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[square]
+    if piece_type == BISHOP:
+        return sliding_attacks(square, occupied, BISHOP_DIRECTIONS)
+    if piece_type == ROOK:
+        return sliding_attacks(square, occupied, ROOK_DIRECTIONS)
+    if piece_type == QUEEN:
+        return sliding_attacks(square, occupied, QUEEN_DIRECTIONS)
+    return KING_ATTACKS[square]
+
+
+# For the attack maps: the attack table of each piece code that does not slide (None for sliding pieces),
+# and the directions of each piece code that does
+STEP_ATTACK_TABLES = tuple(PAWN_ATTACKS[piece_code // 6] if piece_code % 6 == PAWN else KNIGHT_ATTACKS
+                           if piece_code % 6 == KNIGHT else KING_ATTACKS if piece_code % 6 == KING else None
+                           for piece_code in range(12))
+SLIDING_DIRECTIONS = tuple(BISHOP_DIRECTIONS if piece_code % 6 == BISHOP else ROOK_DIRECTIONS
+                           if piece_code % 6 == ROOK else QUEEN_DIRECTIONS if piece_code % 6 == QUEEN else None
+                           for piece_code in range(12))
+
+
+# ----------------------------------- Move tables ------------------------------------ #
+# MOVE_MASKS[piece code][has been moved][square] is the bitboard of the tiles a piece could move to from a square,
+# not checking for occupied tiles. Only pawns depend on whether they have been moved,
+# because they may advance two tiles on their first move. MOVE_TILES holds the same moves as frozensets of tile names.
+
+def _unobstructed_moves(piece_code, square, has_been_moved):
+    """Returns the bitboard of the tiles a piece could move to from a square on an empty board."""
+    color, piece_type = divmod(piece_code, 6)
+    if piece_type == PAWN:
+        moves = PAWN_PUSHES[color][square] | PAWN_ATTACKS[color][square]
+        if not has_been_moved and PAWN_PUSHES[color][square]:
+            moves |= PAWN_PUSHES[color][square + PAWN_DIRECTIONS[color]]
+        return moves
+    return piece_attacks(piece_code, square, 0)
+
+
+MOVE_MASKS = tuple(tuple(tuple(_unobstructed_moves(piece_code, square, has_been_moved) for square in range(64))
+                         for has_been_moved in (False, True))
+                   for piece_code in range(12))
+MOVE_TILES = tuple(tuple(tuple(frozenset(SQUARE_NAMES[target] for target in iter_squares(mask)) for mask in masks)
+                         for masks in piece_masks)
+                   for piece_masks in MOVE_MASKS)
+
+
+# ---------------------------------- Zobrist keys ------------------------------------ #
+# A position's hash is the XOR of one random key for each (piece code, square) on the board, one for each pawn
+# that has not moved yet, and one more when it is black's turn. The keys come from a fixed seed,
+# so every process computes the same hash for the same position.
+
+_zobrist_random = random.Random(0xA70111C)
+ZOBRIST_PIECES = tuple(tuple(_zobrist_random.getrandbits(64) for _ in range(64)) for _ in range(12))
+ZOBRIST_UNMOVED_PAWNS = tuple(_zobrist_random.getrandbits(64) for _ in range(64))
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+del _zobrist_random
+
+
+def encode_move(move):
+    """Packs a (home square, destination square) move into a 12-bit integer, with the home square in the high bits."""
+    return move[0] << 6 | move[1]
+
+
+def move_to_uci(move):
+    """Returns a (home square, destination square) move in coordinate notation, such as "e2e4"."""
+    return SQUARE_NAMES[move[0]] + SQUARE_NAMES[move[1]]
+
+
+def decode_move(move_code):
+    """Unpacks a move packed by encode_move() into a (home square, destination square) tuple."""
+    return move_code >> 6, move_code & 63
+
+
+def uci_to_move(text):
+    """
+    Returns the (home square, destination square) move written in coordinate notation, such as "e2e4".
+    Raises ValueError if the text is not two tile names.
+    """
+    home_tile, destination_tile = text[:2].lower(), text[2:].lower()
+    if len(text) != 4 or home_tile not in SQUARE_INDEX or destination_tile not in SQUARE_INDEX:
+        raise ValueError(f"Expected a move such as 'e2e4', not {text!r}.")
+    return SQUARE_INDEX[home_tile], SQUARE_INDEX[destination_tile]
+
+
+# Every move in coordinate notation, such as "e2e4", and its encode_move() code
+UCI_MOVE_CODES = {SQUARE_NAMES[home_square] + SQUARE_NAMES[destination_square]: home_square << 6 | destination_square
+                  for home_square in range(64) for destination_square in range(64)}
+
+# parse_moves() stores a move it cannot read as this plus its error code, above every real move code
+PARSE_ERROR_BASE = 4096
+
+
+def parse_moves(moves):
+    """
+    Returns an array("H") with the encode_move() code of each move, for AtomicGame.apply_moves().
+    moves may be text such as "e2e4 e7e5", or an iterable of moves as text such as "e2e4",
+    as (home square, destination square) tuples, or as integers already packed by encode_move().
+    A move that cannot be read is stored as PARSE_ERROR_BASE plus the error code make_move() would give it
+    (ERROR_INVALID_CHARACTERS or ERROR_OUT_OF_BOUNDS), so one bad move does not stop the others from being read.
+    """
+    if isinstance(moves, str):
+        moves = moves.split()
+    elif isinstance(moves, array) and moves.typecode == "H" and (not moves or max(moves) < PARSE_ERROR_BASE):
+        # Already packed, as in selfplay and game_store records
+        return moves
+
+    move_codes = array("H")
+    append, uci_code = move_codes.append, UCI_MOVE_CODES.get
+    for move in moves:
+        if isinstance(move, str):
+            move_code = uci_code(move)
+            if move_code is None:
+                move_code = uci_code(move.lower())
+                if move_code is None:
+                    # The same checks as make_move(): two tiles, each a letter followed by a digit
+                    tiles = (move[:2], move[2:])
+                    if all(len(tile) == 2 and tile[0].isalpha() and tile[1].isnumeric() for tile in tiles):
+                        move_code = PARSE_ERROR_BASE + ERROR_OUT_OF_BOUNDS
+                    else:
+                        move_code = PARSE_ERROR_BASE + ERROR_INVALID_CHARACTERS
+        elif isinstance(move, int):
+            move_code = move if 0 <= move < PARSE_ERROR_BASE else PARSE_ERROR_BASE + ERROR_OUT_OF_BOUNDS
+        else:
+            home_square, destination_square = move
+            if 0 <= home_square < 64 and 0 <= destination_square < 64:
+                move_code = home_square << 6 | destination_square
+            else:
+                move_code = PARSE_ERROR_BASE + ERROR_OUT_OF_BOUNDS
+        append(move_code)
+    return move_codes
+
 
 class ChessPiece:
-    """Represents a chess piece."""
+    """
+    Represents a kind of chess piece of one color, such as a white knight.
+    Pieces are immutable flyweights: there is one shared object for each piece code (see PIECES),
+    and where a piece stands and whether it has moved are kept by the board, not by the piece.
+    """
 
-    def __init__(self, pos, color):
-        self._pos = pos
-        self._color = color
-        self._piece = ""
-        self._has_been_moved = False   # To keep track of pawns' available moves
+    __slots__ = ("_color", "_piece_code", "_piece")
+    _piece_type = None
 
-    def get_piece(self):
-        """Returns the picture of emoji of a chess piece."""
-        return self._piece
+    def __init__(self, color):
+        piece_code = COLOR_NAMES.index(color) * 6 + self._piece_type
+        object.__setattr__(self, "_color", color)
+        object.__setattr__(self, "_piece_code", piece_code)
+        object.__setattr__(self, "_piece", PIECE_EMOJIS[piece_code])
 
-    def set_piece(self, piece):
-        """Set a piece equal to its picture or emoji."""
-        self._piece = piece
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} pieces cannot be changed.")
 
-    def get_pos(self):
-        """Returns the position of a chess piece."""
-        return self._pos
+    def __repr__(self):
+        return f"{type(self).__name__}({self._color!r})"
 
-    def set_pos(self, new_pos):
-        """Set the position of a chess piece. When called, self._has_been_moved is set to True."""
-        self._pos = new_pos
-        self._has_been_moved = True
+    def __reduce__(self):
+        # Copying or unpickling a piece gives back the shared piece with the same piece code
+        return _shared_piece, (self._piece_code,)
+
+    def get_piece(self):
+        """Returns the picture of emoji of a chess piece."""
+        return self._piece
 
     def get_color(self):
         """Returns the color of a chess piece."""
         return self._color
 
-    def move_is_valid(self, move_to):
+    def get_piece_type(self):
+        """Returns the piece type of a chess piece (PAWN to KING)."""
+        return self._piece_type
+
+    def get_piece_code(self):
+        """Returns the piece code of a chess piece (its color times 6 plus its piece type)."""
+        return self._piece_code
+
+    def move_is_valid(self, pos, move_to, has_been_moved=False):
         """
-        Returns True if a move is valid,
+        Returns True if a move is valid for this piece standing on the tile pos,
         by checking whether a tile is in the available_moves set returned by self.available_moves().
         """
-        if move_to in self.available_moves():
-            return True
-        else:
-            return False
+        return move_to in self.available_moves(pos, has_been_moved)
 
-    def available_moves(self):
-        """Returns available moves based on type of chess piece (not checking for occupied tiles) within a set."""
-        available_moves = set()
-        current_position = self._pos
-        columns_on_board = ["a", "b", "c", "d", "e", "f", "g", "h"]
-        rows_on_board = ["1", "2", "3", "4", "5", "6", "7", "8"]
-
-        # The ord() function assigns numbers (a key, if you will) to single-character strings.
-        # We use this to index columns on the chess board.
-        current_column_index = ord(current_position[0])
-
-        current_column = current_position[0]
-        current_row = int(current_position[1])
-
-        # ---------------------- Helper Functions ----------------------- #
-        def _set_temp_to_current():
-            """Helper function for available diagonal moves."""
-            return current_row, current_column_index
-
-        def _add_diagonal_spaces():
-            """Helper function for Queen and Bishop to add diagonal spaces."""
-            # Top right diagonal
-            temp_row, temp_column_index = _set_temp_to_current()
-            while temp_column_index + 1 <= 104 and temp_row + 1 <= 8:
-                available_moves.add(chr(temp_column_index + 1) + str(temp_row + 1))
-                temp_column_index += 1
-                temp_row += 1
-
-            # Bottom right diagonal
-            temp_row, temp_column_index = _set_temp_to_current()
-            while temp_column_index + 1 <= 104 and temp_row - 1 >= 1:
-                available_moves.add(chr(temp_column_index + 1) + str(temp_row - 1))
-                temp_column_index += 1
-                temp_row -= 1
-
-            # Top left diagonal
-            temp_row, temp_column_index = _set_temp_to_current()
-            while temp_column_index - 1 >= 97 and temp_row + 1 <= 8:
-                available_moves.add(chr(temp_column_index - 1) + str(temp_row + 1))
-                temp_column_index -= 1
-                temp_row += 1
-
-            # Bottom left diagonal
-            temp_row, temp_column_index = _set_temp_to_current()
-            while temp_column_index - 1 >= 97 and temp_row - 1 >= 1:
-                available_moves.add(chr(temp_column_index - 1) + str(temp_row - 1))
-                temp_column_index -= 1
-                temp_row -= 1
-
-        def _add_vertical_and_horizontal_spaces():
-            """Helper function for the Queen and Rook to add vertical and horizontal spaces."""
-            # Sideways movement
-            for column in columns_on_board:
-                if current_column != column:
-                    available_moves.add(column + str(current_row))
-
-            # Up and down movement
-            for row in rows_on_board:
-                if str(current_row) != row:
-                    available_moves.add(current_column + row)
-
-        # ----------------- Adding available moves based on piece type ---------------- #
-
-        if type(self) is Pawn:
-            # Black and white pieces move in opposing directions
-            pawn_direction = 1
-            if self._color == "Black":
-                pawn_direction = -1
-
-            # Advancing
-            if self._has_been_moved is False:
-                available_moves.add(current_column + str(current_row + 2 * pawn_direction))
-            available_moves.add(current_column + str(current_row + 1 * pawn_direction))
-
-            # Capturing
-            # The chr() function undoes the ord() function.
-            if current_column == "a":
-                available_moves.add(chr(current_column_index + 1) + str(current_row + 1 * pawn_direction))
-            elif current_column == "h":
-                available_moves.add(chr(current_column_index - 1) + str(current_row + 1 * pawn_direction))
-            else:
-                available_moves.add(chr(current_column_index + 1) + str(current_row + 1 * pawn_direction))
-                available_moves.add(chr(current_column_index - 1) + str(current_row + 1 * pawn_direction))
-
-        elif type(self) is Rook:
-            _add_vertical_and_horizontal_spaces()
-
-        elif type(self) is Knight:
-            # 1st direction (forward)
-            if current_row + 2 <= 8:
-                if current_column_index + 1 <= 104:
-                    available_moves.add(chr(current_column_index + 1) + str(current_row + 2))
-                if current_column_index - 1 >= 97:
-                    available_moves.add(chr(current_column_index - 1) + str(current_row + 2))
-
-            # 2nd direction (backward)
-            if current_row - 2 >= 1:
-                if current_column_index + 1 <= 104:
-                    available_moves.add(chr(current_column_index + 1) + str(current_row - 2))
-                if current_column_index - 1 >= 97:
-                    available_moves.add(chr(current_column_index - 1) + str(current_row - 2))
-
-            # 3rd direction (left)
-            if current_column_index - 2 >= 97:
-                if current_row + 1 <= 8:
-                    available_moves.add(chr(current_column_index - 2) + str(current_row + 1))
-                if current_row - 1 >= 1:
-                    available_moves.add(chr(current_column_index - 2) + str(current_row - 1))
-
-            # 4th direction (right)
-            if current_column_index + 2 <= 104:
-                if current_row + 1 <= 8:
-                    available_moves.add(chr(current_column_index + 2) + str(current_row + 1))
-                if current_row - 1 >= 1:
-                    available_moves.add(chr(current_column_index + 2) + str(current_row - 1))
-
-        elif type(self) is Bishop:
-            # Add diagonals
-            _add_diagonal_spaces()
-
-        elif type(self) is Queen:
-            # Add diagonals, verticals, and horizontals
-            _add_diagonal_spaces()
-            _add_vertical_and_horizontal_spaces()
-
-        elif type(self) is King:
-            # Top three tiles above the king
-            available_moves.add(chr(current_column_index - 1) + str(current_row + 1))
-            available_moves.add(chr(current_column_index) + str(current_row + 1))
-            available_moves.add(chr(current_column_index + 1) + str(current_row + 1))
-
-            # Two tiles beside the king (left and right)
-            available_moves.add(chr(current_column_index - 1) + str(current_row))
-            available_moves.add(chr(current_column_index + 1) + str(current_row))
-
-            # Bottom three tiles below king
-            available_moves.add(chr(current_column_index - 1) + str(current_row - 1))
-            available_moves.add(chr(current_column_index) + str(current_row - 1))
-            available_moves.add(chr(current_column_index + 1) + str(current_row - 1))
-
-        return available_moves
+    def available_moves(self, pos, has_been_moved=False):
+        """
+        Returns available moves from the tile pos based on type of chess piece (not checking for occupied tiles) within a frozenset.
+        has_been_moved only matters for pawns, which can move forward two tiles until they have moved.
+        The sets are built once for every piece, square and pawn state when the module is imported,
+        so this is a table lookup and the returned set must not be changed.
+        """
+        return MOVE_TILES[self._piece_code][has_been_moved][SQUARE_INDEX[pos]]
 
 
 class Pawn(ChessPiece):
     """
     Represents a pawn.
-    The '_has_been_moved' data member is to keep track of which pawns can move forward two tiles.
+    Whether a pawn can move forward two tiles is kept by the board (see AtomicGame.get_unmoved_pawns()), not by the pawn.
     The pawn color is to determine its available moves, since white and black move in opposite directions.
     """
-    def __init__(self, pos, color):
-        super().__init__(pos, color)
-        self.create_piece()
 
-    def create_piece(self):
-        """Create the chess piece image that represents the Pawn."""
-        if self._color == "White":
-            self.set_piece("♟")
-        elif self._color == "Black":
-            self.set_piece("♙")
+    __slots__ = ()
+    _piece_type = PAWN
 
 
 class Rook(ChessPiece):
     """Represents a rook."""
-    def __init__(self, pos, color):
-        super().__init__(pos, color)
-        self.create_piece()
 
-    def create_piece(self):
-        """Create the chess piece image that represents the Rook."""
-        if self._color == "White":
-            self.set_piece("♜")
-        elif self._color == "Black":
-            self.set_piece("♖")
+    __slots__ = ()
+    _piece_type = ROOK
 
 
 class Knight(ChessPiece):
     """Represents a knight."""
-    def __init__(self, pos, color):
-        super().__init__(pos, color)
-        self.create_piece()
 
-    def create_piece(self):
-        """Create the chess piece image that represents the Knight."""
-        if self._color == "White":
-            self.set_piece("♞")
-        elif self._color == "Black":
-            self.set_piece("♘")
+    __slots__ = ()
+    _piece_type = KNIGHT
 
 
 class Bishop(ChessPiece):
     """Represents a bishop."""
-    def __init__(self, pos, color):
-        super().__init__(pos, color)
-        self.create_piece()
 
-    def create_piece(self):
-        """Create the chess piece image that represents the Bishop."""
-        if self._color == "White":
-            self.set_piece("♝")
-        elif self._color == "Black":
-            self.set_piece("♗")
+    __slots__ = ()
+    _piece_type = BISHOP
 
 
 class Queen(ChessPiece):
     """Represents a queen."""
-    def __init__(self, pos, color):
-        super().__init__(pos, color)
-        self.create_piece()
 
-    def create_piece(self):
-        """Create the chess piece image that represents the Queen."""
-        if self._color == "White":
-            self.set_piece("♛")
-        elif self._color == "Black":
-            self.set_piece("♕")
+    __slots__ = ()
+    _piece_type = QUEEN
 
 
 class King(ChessPiece):
     """Represents a king."""
-    def __init__(self, pos, color):
-        super().__init__(pos, color)
-        self.create_piece()
 
-    def create_piece(self):
-        """Create the chess piece image that represents the King."""
-        if self._color == "White":
-            self.set_piece("♚")
-        elif self._color == "Black":
-            self.set_piece("♔")
+    __slots__ = ()
+    _piece_type = KING
 
 
-class ChessVar:
-    """ChessVar class to represent chess game, played by two players. White always starts first."""
-
-    def __init__(self):
-        self._unfinished = "UNFINISHED"
-        self._white_wins = "WHITE_WON"
-        self._black_wins = "BLACK_WON"
-
-        # Initialize board
-        self._all_rows_dict = {"8": [" ", " ", " ", " ", " ", " ", " ", " "],
-                               "7": [" ", " ", " ", " ", " ", " ", " ", " "],
-                               "6": [" ", " ", " ", " ", " ", " ", " ", " "],
-                               "5": [" ", " ", " ", " ", " ", " ", " ", " "],
-                               "4": [" ", " ", " ", " ", " ", " ", " ", " "],
-                               "3": [" ", " ", " ", " ", " ", " ", " ", " "],
-                               "2": [" ", " ", " ", " ", " ", " ", " ", " "],
-                               "1": [" ", " ", " ", " ", " ", " ", " ", " "]}
-
-        self._pos_to_piece_dict = {}
-        self._game_status = self._unfinished
-        self._whose_turn = "Black"
-        self.initialize_pieces()
-        self.update_turn()
-        self.print_board()
-        self.print_whose_turn()
+# The shared piece object of each piece code, so that PIECES[piece_code] is the piece standing on a square
+PIECES = tuple(piece_class(color) for color in COLOR_NAMES for piece_class in (Pawn, Knight, Bishop, Rook, Queen, King))
 
-        while self._game_status == self._unfinished:
-            move_from, move_to = self.request_user_input()
-            while self.make_move(move_from, move_to) is False:
-                move_from, move_to = self.request_user_input()
 
-    def initialize_pieces(self):
-        """Initializes pieces on the board."""
+def _shared_piece(piece_code):
+    """Returns the shared piece of a piece code. Used by ChessPiece.__reduce__() for copying and pickling."""
+    return PIECES[piece_code]
 
-        set_of_pieces = set()
-
-        # White pieces
-        set_of_pieces.add(Pawn("a2", "White"))
-        set_of_pieces.add(Pawn("b2", "White"))
-        set_of_pieces.add(Pawn("c2", "White"))
-        set_of_pieces.add(Pawn("d2", "White"))
-        set_of_pieces.add(Pawn("e2", "White"))
-        set_of_pieces.add(Pawn("f2", "White"))
-        set_of_pieces.add(Pawn("g2", "White"))
-        set_of_pieces.add(Pawn("h2", "White"))
-        set_of_pieces.add(Rook("a1", "White"))
-        set_of_pieces.add(Rook("h1", "White"))
-        set_of_pieces.add(Knight("b1", "White"))
-        set_of_pieces.add(Knight("g1", "White"))
-        set_of_pieces.add(Bishop("c1", "White"))
-        set_of_pieces.add(Bishop("f1", "White"))
-        set_of_pieces.add(Queen("d1", "White"))
-        set_of_pieces.add(King("e1", "White"))
-
-        # Black pieces
-        set_of_pieces.add(Pawn("h7", "Black"))
-        set_of_pieces.add(Pawn("g7", "Black"))
-        set_of_pieces.add(Pawn("f7", "Black"))
-        set_of_pieces.add(Pawn("e7", "Black"))
-        set_of_pieces.add(Pawn("d7", "Black"))
-        set_of_pieces.add(Pawn("c7", "Black"))
-        set_of_pieces.add(Pawn("b7", "Black"))
-        set_of_pieces.add(Pawn("a7", "Black"))
-        set_of_pieces.add(Rook("h8", "Black"))
-        set_of_pieces.add(Rook("a8", "Black"))
-        set_of_pieces.add(Knight("b8", "Black"))
-        set_of_pieces.add(Knight("g8", "Black"))
-        set_of_pieces.add(Bishop("f8", "Black"))
-        set_of_pieces.add(Bishop("c8", "Black"))
-        set_of_pieces.add(Queen("d8", "Black"))
-        set_of_pieces.add(King("e8", "Black"))
-
-        for piece in set_of_pieces:
-            # Put each piece on the board and link their positions on the board to their respective ChessPiece objects
-            self.put_piece_on_the_board(piece)
-            self._pos_to_piece_dict[piece.get_pos()] = piece
 
-    def request_user_input(self):
-        """Asks the user what their desired moved is."""
+# ---------------------------------- Game states ------------------------------------ #
 
-        move_from = input("Move piece from: ")
-        move_to = input("Move piece to: ")
-        print()
+UNFINISHED = "UNFINISHED"
+WHITE_WON = "WHITE_WON"
+BLACK_WON = "BLACK_WON"
 
-        return move_from, move_to
+# ------------------------------ Move result error codes ------------------------------ #
+# Codes are small integers so that results can be stored compactly in bulk.
 
-    def clear_tile_on_board(self, tile_position):
-        """Clears the current chess tile, given its position on the board."""
+MOVE_OK = 0
+ERROR_INVALID_CHARACTERS = 1
+ERROR_OUT_OF_BOUNDS = 2
+ERROR_NO_MOVEMENT = 3
+ERROR_GAME_OVER = 4
+ERROR_EMPTY_TILE = 5
+ERROR_NOT_YOUR_PIECE = 6
+ERROR_ILLEGAL_PIECE_MOVE = 7
+ERROR_PAWN_CAPTURES_EMPTY = 8
+ERROR_OWN_PIECE_CAPTURE = 9
+ERROR_KING_CAPTURE = 10
+ERROR_TWO_KINGS_EXPLODED = 11
 
-        # The ord() function assigns single-character strings to numbers.
-        # We subtract 97 to make the keys for letters 'a' through 'h' equal 0-7.
-        # This allows us to index through each list of rows to find the appropriate column.
-        column_index_to_be_cleared = ord(tile_position[0]) - 97
-        desired_row_to_be_cleared = tile_position[1]
+# The messages the text UI shows for each rejected move.
+ERROR_MESSAGES = {
+    ERROR_INVALID_CHARACTERS: "Enter valid moves.",
+    ERROR_OUT_OF_BOUNDS: "Move is out of bounds.",
+    ERROR_NO_MOVEMENT: "You must move a piece.",
+    ERROR_GAME_OVER: "Game has ended.",
+    ERROR_EMPTY_TILE: "No piece to move on that tile.",
+    ERROR_NOT_YOUR_PIECE: "The piece you are trying to move is not yours.",
+    ERROR_ILLEGAL_PIECE_MOVE: "Your piece cannot make that move.",
+    ERROR_PAWN_CAPTURES_EMPTY: "Your pawn cannot capture an empty tile.",
+    ERROR_OWN_PIECE_CAPTURE: "You cannot move to a tile that is being occupied by your own piece.",
+    ERROR_KING_CAPTURE: "Your king cannot make captures.",
+    ERROR_TWO_KINGS_EXPLODED: "You cannot capture two kings at once.",
+}
 
-        self._all_rows_dict[desired_row_to_be_cleared][column_index_to_be_cleared] = " "
 
-    def put_piece_on_the_board(self, chess_piece):
-        """Puts chess piece on the board."""
+class MoveResult(namedtuple("MoveResult", ["success", "error", "exploded", "game_state"])):
+    """
+    Represents the outcome of AtomicGame.make_move().
+    success is True if the move was made, error is MOVE_OK or one of the ERROR_* codes,
+    exploded is a frozenset of the tiles that lost a piece to an explosion (including the capturing piece's tile),
+    and game_state is the game state after the move.
+    """
+    __slots__ = ()
 
-        # The ord() function assigns single-character strings to numbers.
-        # We subtract 97 to make the keys for letters 'a' through 'h' equal 0-7.
-        # This allows us to index through each list of rows to find the appropriate column.
-        position = chess_piece.get_pos()
-        desired_column = ord(position[0]) - 97
-        desired_row = position[1]
 
-        self._all_rows_dict[desired_row][desired_column] = chess_piece.get_piece()
+# ------------------------------- Capture evaluation -------------------------------- #
+# A capture that blows up a king is worth more than any amount of material.
+EXPLODED_KING_VALUE = 100000
 
-    def make_move(self, move_from, move_to):
+# CAPTURE_SWINGS[color][piece code] is what blowing up that piece is worth to the player of the given color:
+# the piece's value if it belongs to the enemy, minus its value if it is the player's own.
+# The extra last entry (index EMPTY) is 0, for an empty tile.
+CAPTURE_SWINGS = tuple(tuple(PIECE_VALUES[piece_code % 6] * (1 if piece_code // 6 != color else -1)
+                             for piece_code in range(12)) + (0,) for color in (WHITE, BLACK))
+
+
+class CaptureEvaluation(namedtuple("CaptureEvaluation", ["swing", "king_exploded", "illegal", "score"])):
+    """
+    Represents the result of AtomicGame.evaluate_capture(), worked out without making the capture.
+    swing is the enemy material blown up minus the player's own material lost (including the capturing piece),
+    king_exploded is the color of the king the explosion would blow up (None if neither),
+    illegal is True if it would blow up both kings, and score orders captures from best to worst:
+    the swing, plus EXPLODED_KING_VALUE for blowing up the enemy king or minus it for blowing up one's own.
+    """
+    __slots__ = ()
+
+
+# ------------------------------ Position serialization ------------------------------ #
+# Positions are written as text in a FEN-like format with three fields separated by spaces:
+#   1. The piece placement, row 8 first, exactly as in standard FEN ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+#   2. Whose turn it is ("w" or "b")
+#   3. The tiles of the pawns that have not moved yet and may still advance two tiles ("a2b2c2..."), or "-" for none
+# Castling, en passant and move counters from standard FEN do not exist in this variant and are left out.
+#
+# The binary form of a position is always POSITION_STRUCT.size (33) bytes:
+#   the occupied-tile bitboard (8 bytes), the piece code of each occupied tile from a1 to h8 packed two to a byte
+#   (16 bytes, enough for 32 pieces), the unmoved-pawn bitboard (8 bytes), and whose turn it is (1 byte).
+# Only positions with at most MAX_PACKED_PIECES pieces fit, so to_fen() text with more pieces (or more than one king
+# of a color) is rejected by set_fen().
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w a2b2c2d2e2f2g2h2a7b7c7d7e7f7g7h7"
+POSITION_STRUCT = struct.Struct("<Q16sQB")
+MAX_PACKED_PIECES = 32
+_BYTE_NIBBLES = tuple((byte & 15, byte >> 4) for byte in range(256))
+
+
+def _build_byte_tables():
+    """
+    Returns, for each byte of a little-endian bitboard and each value of that byte,
+    the squares of its set bits and the Zobrist key of unmoved pawns on those squares.
+    set_bytes() and _install_position() look bitboards up a byte at a time with them rather than a bit at a time.
+    """
+    byte_squares = []
+    unmoved_pawn_keys = []
+    for byte_index in range(8):
+        squares_of_byte = []
+        keys_of_byte = []
+        for byte in range(256):
+            squares = tuple(byte_index * 8 + bit for bit in range(8) if byte >> bit & 1)
+            key = 0
+            for square in squares:
+                key ^= ZOBRIST_UNMOVED_PAWNS[square]
+            squares_of_byte.append(squares)
+            keys_of_byte.append(key)
+        byte_squares.append(tuple(squares_of_byte))
+        unmoved_pawn_keys.append(tuple(keys_of_byte))
+    return tuple(byte_squares), tuple(unmoved_pawn_keys)
+
+
+_BYTE_SQUARES, _BYTE_UNMOVED_PAWN_KEYS = _build_byte_tables()
+
+
+class AtomicGame:
+    """
+    Represents an atomic chess game, played by two players. White always starts first.
+    AtomicGame never prints or asks for input, so any number of games can be played from code.
+    Moves are made with make_move(), which returns a MoveResult describing what happened.
+
+    The position is held as bitboards: one for each piece type and color, plus one for each color's occupancy.
+    A 64-entry list of piece codes mirrors the bitboards so that the piece on a square can be found in one lookup.
+    """
+
+    def __init__(self, fen=None):
+        self._bitboards = [0] * 12
+        self._occupancy = [0, 0]
+        self._board = [EMPTY] * 64
+        self._unmoved_pawns = 0     # To keep track of which pawns can still move forward two tiles
+        self._game_status = UNFINISHED
+        self._turn = WHITE
+        self._undo_stack = []
+        self._hash = 0              # Zobrist hash, updated with every change to the position
+        # Attack maps, updated with every piece put on or removed from the board (see piece_attacks()):
+        # the tiles the piece on each square attacks, and the squares of the pieces attacking each square.
+        # They are None until one of the attack queries first needs them (see _get_attack_maps()), and only kept up
+        # from then on: move generation works without them, so searches and perft never pay for their upkeep.
+        self._attacks_from = None
+        self._attackers_to = None
+        self._attack_journal = None     # While push() runs, the (square, old attacks) of each attacks_from change
+
+        if fen is None:
+            self.initialize_pieces()
+        else:
+            self.set_fen(fen)
+
+    def copy(self):
         """
-        Move a chess piece from one tile to another.
-        If the square being moved from does not contain a piece belonging to the player whose turn it is, or if the indicated move is not allowed, or if the game has already been won, then it returns False.
-        Otherwise, it makes the indicated move, removes any captured (exploded) pieces from the board, updates the game state (unfinished to who wins) if necessary, updates whose turn it is, and returns True.
-        Calls print_board() and update_turn() automatically when returning True.
-        If either king is captured, it calls self.declare_winner().
+        Returns an independent copy of the game, including the moves that can be taken back with pop().
+        Pieces are shared flyweights and undo records are immutable, so only a few flat lists are copied.
+        """
+        game = self.__class__.__new__(self.__class__)
+        game._bitboards = self._bitboards[:]
+        game._occupancy = self._occupancy[:]
+        game._board = self._board[:]
+        game._unmoved_pawns = self._unmoved_pawns
+        game._game_status = self._game_status
+        game._turn = self._turn
+        game._undo_stack = self._undo_stack[:]
+        game._hash = self._hash
+        if self._attacks_from is None:
+            game._attacks_from = game._attackers_to = None
+        else:
+            game._attacks_from = self._attacks_from[:]
+            game._attackers_to = self._attackers_to[:]
+        game._attack_journal = None
+        return game
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Returns a new AtomicGame holding a position written by to_bytes()."""
+        game = cls.__new__(cls)
+        game.set_bytes(data)
+        return game
+
+    def initialize_pieces(self):
+        """Initializes pieces on the board."""
+        back_row = (ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK)
+
+        for column in range(8):
+            # White pieces on rows 1 and 2, black pieces on rows 7 and 8
+            self.put_piece(WHITE * 6 + back_row[column], column)
+            self.put_piece(WHITE * 6 + PAWN, 8 + column)
+            self.put_piece(BLACK * 6 + PAWN, 48 + column)
+            self.put_piece(BLACK * 6 + back_row[column], 56 + column)
+
+        self.set_unmoved_pawns(0x00FF00000000FF00)
+
+    def set_position(self, pieces, unmoved_pawns=0, turn=WHITE):
+        """
+        Replaces the whole position, and forgets the moves made so far.
+        pieces is an iterable of (square, piece code) pairs. If a king is missing, the game is over and its player has lost.
         """
+        bitboards = [0] * 12
+        board = [EMPTY] * 64
+        position_hash = 0
+
+        for square, piece_code in pieces:
+            bitboards[piece_code] |= BIT[square]
+            board[square] = piece_code
+            position_hash ^= ZOBRIST_PIECES[piece_code][square]
+
+        self._install_position(bitboards, board, position_hash, unmoved_pawns, turn)
 
+    def _install_position(self, bitboards, board, piece_hash, unmoved_pawns, turn):
+        """
+        Replaces the position with the given piece bitboards and matching board list,
+        where piece_hash is the Zobrist hash of the pieces alone. Used by set_position() and set_bytes().
+        """
+        # Only pawns can be unmoved pawns
+        unmoved_pawns &= bitboards[PAWN] | bitboards[6 + PAWN]
+        for unmoved_pawn_keys, byte in zip(_BYTE_UNMOVED_PAWN_KEYS, unmoved_pawns.to_bytes(8, "little")):
+            piece_hash ^= unmoved_pawn_keys[byte]
+
+        self._bitboards = bitboards
+        self._occupancy = [bitboards[0] | bitboards[1] | bitboards[2] | bitboards[3] | bitboards[4] | bitboards[5],
+                           bitboards[6] | bitboards[7] | bitboards[8] | bitboards[9] | bitboards[10] | bitboards[11]]
+        self._board = board
+        self._unmoved_pawns = unmoved_pawns
+        self._turn = turn
+        self._undo_stack = []
+        self._hash = piece_hash ^ ZOBRIST_BLACK_TO_MOVE if turn == BLACK else piece_hash
+
+        # Loading many positions rarely needs the attack maps, so they are only built when a query asks for them
+        self._attacks_from = self._attackers_to = None
+        self._attack_journal = None
+
+        if not bitboards[KING]:
+            self._game_status = BLACK_WON
+        elif not bitboards[6 + KING]:
+            self._game_status = WHITE_WON
+        else:
+            self._game_status = UNFINISHED
+
+    def to_fen(self):
+        """Returns the position in the FEN-like text format described above POSITION_STRUCT."""
+        rows = []
+        for row in range(7, -1, -1):
+            row_text = ""
+            empty_tiles = 0
+            for piece_code in self._board[row * 8:row * 8 + 8]:
+                if piece_code == EMPTY:
+                    empty_tiles += 1
+                    continue
+                if empty_tiles:
+                    row_text += str(empty_tiles)
+                    empty_tiles = 0
+                row_text += PIECE_LETTERS[piece_code]
+            if empty_tiles:
+                row_text += str(empty_tiles)
+            rows.append(row_text)
+
+        unmoved_pawns = "".join(SQUARE_NAMES[square] for square in iter_squares(self._unmoved_pawns)) or "-"
+        return f"{'/'.join(rows)} {'wb'[self._turn]} {unmoved_pawns}"
+
+    def set_fen(self, fen):
+        """
+        Replaces the position with one written by to_fen(). Raises ValueError if the text is not a valid position,
+        including one that to_bytes() could not write: more than MAX_PACKED_PIECES pieces, or two kings of a color.
+        """
+        fields = fen.split()
+        if len(fields) != 3 or fields[1] not in ("w", "b"):
+            raise ValueError(f"Expected placement, turn and unmoved pawns in {fen!r}.")
+
+        placement_rows = fields[0].split("/")
+        if len(placement_rows) != 8:
+            raise ValueError(f"Expected 8 rows in {fen!r}.")
+
+        pieces = []
+        for row_index, row_text in enumerate(placement_rows):
+            square = (7 - row_index) * 8
+            row_end = square + 8
+            for character in row_text:
+                if character.isdigit():
+                    square += int(character)
+                elif character in PIECE_LETTERS and square < row_end:
+                    pieces.append((square, PIECE_LETTERS.index(character)))
+                    square += 1
+                else:
+                    raise ValueError(f"Unexpected {character!r} in row {8 - row_index} of {fen!r}.")
+            if square != row_end:
+                raise ValueError(f"Row {8 - row_index} of {fen!r} does not have 8 tiles.")
+
+        unmoved_pawns = 0
+        if fields[2] != "-":
+            for index in range(0, len(fields[2]), 2):
+                tile = fields[2][index:index + 2]
+                if tile not in SQUARE_INDEX:
+                    raise ValueError(f"Unexpected unmoved pawn tile {tile!r} in {fen!r}.")
+                unmoved_pawns |= BIT[SQUARE_INDEX[tile]]
+
+        if len(pieces) > MAX_PACKED_PIECES:
+            raise ValueError(f"{fen!r} has {len(pieces)} pieces; a position can have at most {MAX_PACKED_PIECES}.")
+        for color in (WHITE, BLACK):
+            if sum(1 for _, piece_code in pieces if piece_code == color * 6 + KING) > 1:
+                raise ValueError(f"{fen!r} has more than one {COLOR_NAMES[color].lower()} king.")
+
+        self.set_position(pieces, unmoved_pawns, WHITE if fields[1] == "w" else BLACK)
+
+    def to_bytes(self):
+        """
+        Returns the position in the fixed-size binary format described above POSITION_STRUCT.
+        Raises ValueError if it has more than MAX_PACKED_PIECES pieces (possible with set_position() or put_piece()).
+        """
+        occupied = self._occupancy[WHITE] | self._occupancy[BLACK]
+        if occupied.bit_count() > MAX_PACKED_PIECES:
+            raise ValueError(f"A position with {occupied.bit_count()} pieces cannot be packed; "
+                             f"at most {MAX_PACKED_PIECES} fit.")
+        board = self._board
+        piece_codes = [board[square] for byte_squares, byte in zip(_BYTE_SQUARES, occupied.to_bytes(8, "little"))
+                       for square in byte_squares[byte]]
+        # Two piece codes to a byte, low nibble first; struct pads the rest of the 16 bytes with zeros
+        if len(piece_codes) & 1:
+            piece_codes.append(0)
+        packed_pieces = bytes([low | high << 4 for low, high in zip(piece_codes[::2], piece_codes[1::2])])
+        return POSITION_STRUCT.pack(occupied, packed_pieces, self._unmoved_pawns, self._turn)
+
+    def set_bytes(self, data):
+        """Replaces the position with one written by to_bytes(). Raises ValueError if the record has too many pieces."""
+        occupied, packed_pieces, unmoved_pawns, turn = POSITION_STRUCT.unpack(data)
+        bitboards = [0] * 12
+        board = [EMPTY] * 64
+        position_hash = 0
+
+        # This runs for every position of a bulk load, so the squares and piece codes are looked up a byte at a time
+        squares = [square for byte_squares, byte in zip(_BYTE_SQUARES, occupied.to_bytes(8, "little"))
+                   for square in byte_squares[byte]]
+        if len(squares) > MAX_PACKED_PIECES:
+            raise ValueError(f"A position record cannot hold {len(squares)} pieces.")
+        piece_codes = [piece_code for byte in packed_pieces for piece_code in _BYTE_NIBBLES[byte]]
+        for square, piece_code in zip(squares, piece_codes):
+            board[square] = piece_code
+            bitboards[piece_code] |= BIT[square]
+            position_hash ^= ZOBRIST_PIECES[piece_code][square]
+
+        self._install_position(bitboards, board, position_hash, unmoved_pawns, turn)
+
+    def put_piece(self, piece_code, square):
+        """Puts the piece with the given piece code on an empty square."""
+        self._place_piece(piece_code, square)
+        self._update_attack_maps(BIT[square])
+
+    def remove_piece(self, square):
+        """Removes the piece on a square from the board and returns its piece code."""
+        piece_code = self._lift_piece(square)
+        self._update_attack_maps(BIT[square])
+        return piece_code
+
+    def _place_piece(self, piece_code, square):
+        """Same as put_piece(), but leaves the attack maps for the caller to update."""
+        self._bitboards[piece_code] |= BIT[square]
+        self._occupancy[piece_code // 6] |= BIT[square]
+        self._board[square] = piece_code
+        self._hash ^= ZOBRIST_PIECES[piece_code][square]
+
+    def _lift_piece(self, square):
+        """Same as remove_piece(), but leaves the attack maps for the caller to update."""
+        piece_code = self._board[square]
+        self._bitboards[piece_code] ^= BIT[square]
+        self._occupancy[piece_code // 6] ^= BIT[square]
+        self._board[square] = EMPTY
+        self._hash ^= ZOBRIST_PIECES[piece_code][square]
+        return piece_code
+
+    # ---------------------------------- Attack maps ---------------------------------- #
+
+    def _get_attack_maps(self):
+        """Returns the (attacks_from, attackers_to) maps, building them first if the position was just installed."""
+        if self._attacks_from is None:
+            self._compute_attack_maps()
+        return self._attacks_from, self._attackers_to
+
+    def _compute_attack_maps(self):
+        """Computes the attack maps from scratch, for a whole new position."""
+        board = self._board
+        occupied = self._occupancy[WHITE] | self._occupancy[BLACK]
+        self._attacks_from = attacks_from = [0] * 64
+        self._attackers_to = attackers_to = [0] * 64
+        for square in iter_squares(occupied):
+            attacks_from[square] = attacks = piece_attacks(board[square], square, occupied)
+            for attacked_square in iter_squares(attacks):
+                attackers_to[attacked_square] |= BIT[square]
+
+    def _update_attack_maps(self, changed_squares):
+        """
+        Brings the attack maps up to date after pieces were put on or removed from the squares of a bitboard.
+        Only the attacks of those pieces and of the sliding pieces whose lines reach those squares can have changed,
+        since the squares now block (or no longer block) those lines.
+        Inside push(), the old attacks of every changed square are added to the journal, so that pop() can restore them.
+        """
+        attacks_from, attackers_to = self._attacks_from, self._attackers_to
+        if attacks_from is None:
+            # The maps have not been built yet, and will be built from the position when first needed
+            return
+        journal = self._attack_journal
+        bitboards, board = self._bitboards, self._board
+        occupied = self._occupancy[WHITE] | self._occupancy[BLACK]
+        sliders = (bitboards[BISHOP] | bitboards[ROOK] | bitboards[QUEEN]
+                   | bitboards[6 + BISHOP] | bitboards[6 + ROOK] | bitboards[6 + QUEEN])
+
+        affected = changed_squares
+        remaining = changed_squares
+        while remaining:
+            square_bit = remaining & -remaining
+            remaining ^= square_bit
+            affected |= attackers_to[square_bit.bit_length() - 1] & sliders
+
+        while affected:
+            piece_bit = affected & -affected
+            affected ^= piece_bit
+            piece_square = piece_bit.bit_length() - 1
+            piece_code = board[piece_square]
+            if piece_code == EMPTY:
+                attacks = 0
+            elif STEP_ATTACK_TABLES[piece_code] is not None:
+                attacks = STEP_ATTACK_TABLES[piece_code][piece_square]
+            else:
+                attacks = sliding_attacks(piece_square, occupied, SLIDING_DIRECTIONS[piece_code])
+            changed = attacks ^ attacks_from[piece_square]
+            if changed:
+                if journal is not None:
+                    journal.append((piece_square, attacks_from[piece_square]))
+                attacks_from[piece_square] = attacks
+                while changed:
+                    attacked_bit = changed & -changed
+                    changed ^= attacked_bit
+                    attackers_to[attacked_bit.bit_length() - 1] ^= piece_bit
+
+    def get_attacks_from(self, square):
+        """Returns the bitboard of the tiles the piece on a square attacks (see piece_attacks()), or 0 for an empty square."""
+        return self._get_attack_maps()[0][square]
+
+    def get_attackers_to(self, square, color=None):
+        """Returns the bitboard of the squares of the pieces attacking a square, or only those of one color."""
+        attackers = self._get_attack_maps()[1][square]
+        if color is None:
+            return attackers
+        return attackers & self._occupancy[color]
+
+    def is_attacked(self, square, color):
+        """Returns True if a piece of the given color attacks a square."""
+        return self._get_attack_maps()[1][square] & self._occupancy[color] != 0
+
+    def get_attacked_squares(self, color):
+        """Returns the bitboard of every tile attacked by at least one piece of the given color."""
+        attacks_from = self._get_attack_maps()[0]
+        attacked = 0
+        for square in iter_squares(self._occupancy[color]):
+            attacked |= attacks_from[square]
+        return attacked
+
+    def get_blast_zone_attackers(self, color):
+        """
+        Returns the bitboard of the enemy pieces that could capture within the blast zone of a color's king
+        (the king's tile and the tiles around it), which is how a king gets blown up: capturing any of the color's pieces
+        there explodes the king. Enemy kings are left out, since they cannot capture. Returns 0 if the king is gone.
+        """
+        kings = self._bitboards[color * 6 + KING]
+        if not kings:
+            return 0
+        attackers_to = self._get_attack_maps()[1]
+        attackers = 0
+        for square in iter_squares(BLAST_MASKS[kings.bit_length() - 1] & self._occupancy[color]):
+            attackers |= attackers_to[square]
+        return attackers & self._occupancy[color ^ 1] & ~self._bitboards[(color ^ 1) * 6 + KING]
+
+    def set_unmoved_pawns(self, unmoved_pawns):
+        """Sets the bitboard of the pawns that have not moved yet, and may advance two tiles."""
+        for square in iter_squares(self._unmoved_pawns ^ unmoved_pawns):
+            self._hash ^= ZOBRIST_UNMOVED_PAWNS[square]
+        self._unmoved_pawns = unmoved_pawns
+
+    def get_hash(self):
+        """Returns the 64-bit Zobrist hash of the position (piece placement, unmoved pawns and whose turn it is)."""
+        return self._hash
+
+    def compute_hash(self):
+        """Returns the Zobrist hash of the position computed from scratch, rather than incrementally."""
+        position_hash = ZOBRIST_BLACK_TO_MOVE if self._turn == BLACK else 0
+        for square in range(64):
+            if self._board[square] != EMPTY:
+                position_hash ^= ZOBRIST_PIECES[self._board[square]][square]
+        for square in iter_squares(self._unmoved_pawns):
+            position_hash ^= ZOBRIST_UNMOVED_PAWNS[square]
+        return position_hash
+
+    def get_piece_code(self, square):
+        """Returns the piece code of the piece on a square, or EMPTY."""
+        return self._board[square]
+
+    def get_piece(self, square):
+        """Returns the shared ChessPiece standing on a square (see PIECES), or None if the square is empty."""
+        piece_code = self._board[square]
+        return None if piece_code == EMPTY else PIECES[piece_code]
+
+    def get_bitboard(self, color, piece_type):
+        """Returns the bitboard of the pieces of the given color and type."""
+        return self._bitboards[color * 6 + piece_type]
+
+    def get_occupancy(self, color=None):
+        """Returns the bitboard of every occupied square, or of the squares occupied by one color."""
+        if color is None:
+            return self._occupancy[WHITE] | self._occupancy[BLACK]
+        return self._occupancy[color]
+
+    def get_unmoved_pawns(self):
+        """Returns the bitboard of the pawns that have not moved yet, and may advance two tiles."""
+        return self._unmoved_pawns
+
+    def make_move(self, move_from, move_to):
+        """
+        Move a chess piece from one tile to another, given in algebraic notation (such as "e2" and "e4").
+        If the square being moved from does not contain a piece belonging to the player whose turn it is, or if the indicated move is not allowed, or if the game has already been won, then it returns an unsuccessful MoveResult with the reason as its error code.
+        Otherwise, it makes the indicated move, removes any captured (exploded) pieces from the board, updates the game state (unfinished to who wins) if necessary, updates whose turn it is, and returns a successful MoveResult.
+        """
         home_tile = move_from.lower()
         destination_tile = move_to.lower()
 
-        # ------------------------------------ Data Validation ---------------------------------------#
-
         if self.characters_are_invalid(home_tile, destination_tile):
-            # If home or destination tile are invalid tiles, return False.
-            print("Enter valid moves.")
-            return False
+            # If home or destination tile are invalid tiles, the move is rejected.
+            return self._reject(ERROR_INVALID_CHARACTERS)
 
-        if self.out_of_bounds(home_tile) or self.out_of_bounds(destination_tile):
-            # If the home or destination tile is out of bounds, return False.
-            print("Move is out of bounds.")
-            return False
+        squares = self.tile_squares(home_tile, destination_tile)
+        if squares is None:
+            # A letter and a digit that do not name a tile on the board (such as "i9", or "e٢" with another script's digit)
+            return self._reject(ERROR_OUT_OF_BOUNDS)
 
-        if home_tile == destination_tile:
-            # If both position arguments are equal, the piece has not moved.
-            print("You must move a piece.")
-            return False
+        return self.make_square_move(*squares)
 
-        if self._game_status != self._unfinished:
-            # If the game has already ended, return False.
-            print("Game has ended.")
-            return False
+    def make_square_move(self, home_square, destination_square):
+        """Same as make_move(), but the tiles are given as squares (integers from 0 to 63)."""
+        error = self._play_square_move(home_square, destination_square)
+        if error != MOVE_OK:
+            return self._reject(error)
 
-        if self._pos_to_piece_dict[home_tile].get_color() != self._whose_turn:
-            # If piece being moved does not belong to current player's color, return False.
-            print("The piece you are trying to move is not yours.")
-            return False
+        # Captures record every piece they removed, including the suicidal capturing piece
+        removed_pieces = self._undo_stack[-1][2]
+        return MoveResult(True, MOVE_OK, frozenset(SQUARE_NAMES[square] for square, _ in removed_pieces),
+                          self._game_status)
 
-        if self._pos_to_piece_dict[home_tile].move_is_valid(destination_tile) is False:
-            # If the destination tile is not a valid move based on the piece's position, return False.
-            print("Your piece cannot make that move.")
-            return False
+    def apply_moves(self, moves, stop_at_error=True):
+        """
+        Makes a whole sequence of moves and returns an array("B") with the error code of each (MOVE_OK for a move made).
+        moves may be text such as "e2e4 e7e5", or an iterable of moves as text such as "e2e4",
+        as (home square, destination square) tuples, or as integers packed by encode_move() (see parse_moves()).
+        The moves are parsed once for the whole batch, and no MoveResult is built for each move.
+        With stop_at_error, the moves after the first illegal one are not tried, so the array ends with its error code.
+        """
+        results = array("B")
+        play_square_move = self._play_square_move
+        for move_code in parse_moves(moves):
+            if move_code >= PARSE_ERROR_BASE:
+                error = move_code - PARSE_ERROR_BASE
+            else:
+                error = play_square_move(move_code >> 6, move_code & 63)
 
-        # The ord() function assigns single-character strings to numbers.
-        # We subtract 97 to make the keys for letters 'a' through 'h' equal 0-7.
-        # This allows us to index through each row to find the appropriate column.
-        current_column = ord(home_tile[0]) - 97
-        current_row = home_tile[1]
-        current_tile = self._all_rows_dict[current_row][current_column]
+            results.append(error)
+            if error != MOVE_OK:
+                # Rejections go through _reject() like those of make_move(), so they are counted the same way
+                self._reject(error)
+                if stop_at_error:
+                    break
+        return results
 
-        desired_column = ord(destination_tile[0]) - 97
-        desired_row = destination_tile[1]
-        desired_tile = self._all_rows_dict[desired_row][desired_column]
+    def _play_square_move(self, home_square, destination_square):
+        """
+        Makes the move from the home square to the destination square if it is legal, and returns its error code
+        (MOVE_OK if it was made). make_square_move() and apply_moves() both make their moves here.
+        """
+        error = self.move_error(home_square, destination_square)
+        if error == MOVE_OK:
+            self.push((home_square, destination_square))
+        return error
 
-        if current_tile == " ":
-            # If there is no piece on the current tile, return False.
-            print("No piece to move on that tile.")
-            return False
+    def move_error(self, home_square, destination_square):
+        """
+        Returns MOVE_OK if moving from the home square to the destination square is legal for the player whose turn it is,
+        or the error code of the first rule it breaks. The game is left unchanged.
+        """
 
-        if type(self._pos_to_piece_dict[home_tile]) is Pawn:
-            # If the piece we are moving is a pawn
-
-            if desired_tile == " " and home_tile[0] != destination_tile[0]:
-                # The 0th index of the position arguments are the columns.
-                # If the columns are not the same letter, the Pawn is capturing.
-                # This is only allowed if the destination tile is occupied by a piece of the other color.
-                print("Your pawn cannot capture an empty tile.")
-                return False
-            if desired_tile != " " and home_tile[0] == destination_tile[0]:
-                # The 0th index of the position arguments are the columns.
-                # If the columns are the same letter, the Pawn is advancing forward.
-                # This is not allowed if the destination tile is occupied.
-                print("Your piece cannot make that move.")
-                return False
-
-        if (type(self._pos_to_piece_dict[home_tile]) is not Knight and
-                type(self._pos_to_piece_dict[home_tile]) is not Pawn):
-            # The purpose of this if statement is to fix the issue of a piece
-            # travelling to a vacant tile while another piece is in the way
-
-            temp_column = current_column
-            temp_row = int(current_row)
-
-            if home_tile[0] == destination_tile[0]:
-                # The 0th index of the position arguments are the columns. When equal, we are moving up or down.
-
-                if current_row > desired_row:
-                    # We increment the value of temp so that we are not analyzing the tile we're on
-                    temp_row -= 1
-                    while temp_row > int(desired_row) and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                        # While the row we are at is higher than our destination row,
-                        # we increment down and keep checking if the tile is empty
-                        temp_row -= 1
-                    if temp_row > int(desired_row):
-                        # If  we are not at our destination tile yet after the while loop expires,
-                        # there is a piece blocking the path to the destination tile.
-                        print("Your piece cannot make that move.")
-                        return False
-                else:
-                    # We increment the value of temp so that we are not analyzing the tile we're on
-                    temp_row += 1
-                    while temp_row < int(desired_row) and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                        # While the row we are at is lower than our destination column,
-                        # we increment up and keep checking if the tile is empty
-                        temp_row += 1
-                    if temp_row < int(desired_row):
-                        # If the row is still lower after the while loop expires,
-                        # there is a piece blocking the path to the destination tile.
-                        print("Your piece cannot make that move.")
-                        return False
-
-            elif temp_row == int(desired_row):
-                # If the current and destination tiles are on the same row
-
-                if temp_column > desired_column:
-
-                    # We increment the value of temp so that we are not analyzing the tile we're on
-                    temp_column -= 1
-                    while temp_column > desired_column and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                        # While the column we are at is further right from our destination column,
-                        # we increment left and keep checking if the tile is empty
-                        temp_column -= 1
-                    if temp_column > desired_column:
-                        # If the column is still further right after the while loop expires,
-                        # there is a piece blocking the path to the destination tile.
-                        print("Your piece cannot make that move.")
-                        return False
-                else:
-                    # We increment the value of temp so that we are not analyzing the tile we're on
-                    temp_column += 1
-                    while temp_column < desired_column and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                        # While the column we are at is further left from our destination column,
-                        # we increment right and keep checking if the tile is empty
-                        temp_column += 1
-                    if temp_column < desired_column:
-                        # If the column is still further left after the while loop expires,
-                        # there is a piece blocking the path to the destination tile.
-                        print("Your piece cannot make that move.")
-                        return False
-
-            elif temp_column < desired_column and temp_row < int(desired_row):
-                # Destination tile is in the top right diagonal
-
-                # We increment the value of temp so that we are not analyzing the tile we're on
-                temp_column += 1
-                temp_row += 1
-                while temp_column < desired_column and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                    # While the column we are at is further left from our destination column,
-                    # we increment right and up and keep checking if the tile is empty
-                    temp_column += 1
-                    temp_row += 1
-                if temp_column < desired_column:
-                    # If the column is still further left after the while loop expires,
-                    # there is a piece blocking the path to the destination tile.
-                    print("Your piece cannot make that move.")
-                    return False
-
-            elif temp_column < desired_column and temp_row > int(desired_row):
-                # Destination tile is in the bottom right diagonal
-
-                # We increment the value of temp so that we are not analyzing the tile we're on
-                temp_column += 1
-                temp_row -= 1
-                while temp_column < desired_column and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                    # While the column we are at is further left from our destination column,
-                    # we increment right and down and keep checking if the tile is empty
-                    temp_column += 1
-                    temp_row -= 1
-                if temp_column < desired_column:
-                    # If the column is still further left after the while loop expires,
-                    # there is a piece blocking the path to the destination tile.
-                    print("Your piece cannot make that move.")
-                    return False
-
-            elif temp_column > desired_column and temp_row < int(desired_row):
-                # Destination tile is in the top left diagonal
-
-                # We increment the value of temp so that we are not analyzing the tile we're on
-                temp_column -= 1
-                temp_row += 1
-                while temp_column > desired_column and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                    # While the column we are at is further right from our destination column,
-                    # we increment left and up and keep checking if the tile is empty
-                    temp_column -= 1
-                    temp_row += 1
-                if temp_column > desired_column:
-                    # If the column is still further right after the while loop expires,
-                    # there is a piece blocking the path to the destination tile.
-                    print("Your piece cannot make that move.")
-                    return False
-
-            elif temp_column > desired_column and temp_row > int(desired_row):
-                # Destination tile is in the bottom left diagonal
-
-                # We increment the value of temp so that we are not analyzing the tile we're on
-                temp_column -= 1
-                temp_row -= 1
-                while temp_column > desired_column and self._all_rows_dict[str(temp_row)][temp_column] == " ":
-                    # While the column we are at is further right from our destination column,
-                    # we increment left and down and keep checking if the tile is empty
-                    temp_column -= 1
-                    temp_row -= 1
-                if temp_column > desired_column:
-                    # If the column is still further right after the while loop expires,
-                    # there is a piece blocking the path to the destination tile.
-                    print("Your piece cannot make that move.")
-                    return False
-
-        if desired_tile != " ":
+        # ------------------------------------ Data Validation ---------------------------------------#
 
-            # --------------------------- CAPTURING --------------------------------- #
+        if home_square == destination_square:
+            # If both squares are equal, the piece has not moved.
+            return ERROR_NO_MOVEMENT
 
-            if self._pos_to_piece_dict[destination_tile].get_color() == self._whose_turn:
-                # Cannot capture a piece of the same color
-                print("You cannot move to a tile that is being occupied by your own piece.")
-                return False
+        if self._game_status != UNFINISHED:
+            return ERROR_GAME_OVER
 
-            if type(self._pos_to_piece_dict[home_tile]) is King:
-                # A king cannot capture in atomic chess
-                print("Your king cannot make captures.")
-                return False
+        piece_code = self._board[home_square]
+        if piece_code == EMPTY:
+            return ERROR_EMPTY_TILE
 
-            # If tests pass:
-            # We explode the surroundings of the tile where the captured piece is by calling explode_surroundings
+        if piece_code // 6 != self._turn:
+            return ERROR_NOT_YOUR_PIECE
 
-            if self.explode_surroundings(destination_tile) is False:
-                # explode_surroundings returns False if two kings are blown up at once
+        piece_move_error = self.piece_move_error(home_square, destination_square)
+        if piece_move_error != MOVE_OK:
+            return piece_move_error
 
-                print("You cannot capture two kings at once.")
-                return False
-            else:
-                # We delete the capturing piece from the pieces dictionary and clear the tile,
-                # because all capturing pieces in atomic chess are suicidal.
-                if home_tile in self._pos_to_piece_dict:
-                    del self._pos_to_piece_dict[home_tile]
-                    self.clear_tile_on_board(home_tile)
-
-                self.print_board()
-
-                # If the game status is still unfinished, the game goes on. Else, declare winner.
-                if self._game_status == self._unfinished:
-                    self.update_turn()
-                    self.print_whose_turn()
-                else:
-                    self.declare_winner()
+        if self.path_is_blocked(home_square, destination_square):
+            return ERROR_ILLEGAL_PIECE_MOVE
 
-                return True
+        destination_code = self._board[destination_square]
+        if destination_code != EMPTY:
 
-        # ------------------------- Moving without capturing ---------------------------- #
+            # --------------------------- CAPTURING --------------------------------- #
 
-        # Move current piece to a different position in the dictionary
-        piece = self._pos_to_piece_dict[home_tile]
-        self._pos_to_piece_dict[destination_tile] = piece
+            if destination_code // 6 == self._turn:
+                return ERROR_OWN_PIECE_CAPTURE
 
-        # Update piece's position attribute
-        piece.set_pos(destination_tile)
+            if piece_code % 6 == KING:
+                # A king cannot capture in atomic chess
+                return ERROR_KING_CAPTURE
 
-        # Move chess piece image to destination tile
-        piece_image = self._all_rows_dict[current_row][current_column]
-        self._all_rows_dict[desired_row][desired_column] = piece_image
+            kings_exploded = self.explosion_mask(destination_square) & (self._bitboards[KING] | self._bitboards[6 + KING])
+            if kings_exploded & (kings_exploded - 1):
+                # We cannot explode two kings at the same time.
+                return ERROR_TWO_KINGS_EXPLODED
 
-        # Clear tile we are moving from
-        self.clear_tile_on_board(home_tile)
+        return MOVE_OK
 
-        self.update_turn()
-        self.print_board()
-        self.print_whose_turn()
+    def piece_move_error(self, home_square, destination_square):
+        """
+        Returns MOVE_OK if the piece on the home square moves in a way that can reach the destination square,
+        ignoring pieces in between: ERROR_ILLEGAL_PIECE_MOVE if it cannot (including a pawn advancing onto a piece),
+        or ERROR_PAWN_CAPTURES_EMPTY for a pawn moving diagonally onto an empty tile.
+        """
+        piece_code = self._board[home_square]
+        has_been_moved = not self._unmoved_pawns & BIT[home_square]
+        if not MOVE_MASKS[piece_code][has_been_moved][home_square] & BIT[destination_square]:
+            # If the destination is not a move this kind of piece can make from its square, the move is rejected.
+            return ERROR_ILLEGAL_PIECE_MOVE
+
+        if piece_code % 6 == PAWN:
+            destination_code = self._board[destination_square]
+            if home_square % 8 != destination_square % 8:
+                # If the columns are not the same, the pawn is capturing.
+                # This is only allowed if the destination tile is occupied.
+                if destination_code == EMPTY:
+                    return ERROR_PAWN_CAPTURES_EMPTY
+            elif destination_code != EMPTY:
+                # If the columns are the same, the pawn is advancing forward.
+                # This is not allowed if the destination tile is occupied.
+                return ERROR_ILLEGAL_PIECE_MOVE
 
-        return True
+        return MOVE_OK
 
-    def print_whose_turn(self):
+    def path_is_blocked(self, home_square, destination_square):
         """
-        Prints whose turn it is.
+        Returns True if another piece stands between the two squares, so a piece cannot travel from one to the other
+        (this includes a pawn advancing two tiles past an occupied tile).
+        Knights and one-tile moves have no tiles in between, so they are never blocked.
         """
-        print(f"{self._whose_turn}'s turn!\n")
+        return BETWEEN[home_square][destination_square] & (self._occupancy[WHITE] | self._occupancy[BLACK]) != 0
 
-    def update_turn(self):
+    def push(self, move):
         """
-        Updates and prints whose turn it is.
-        If current turn equals white, update to black. And vice versa.
+        Makes a move, given as a (home square, destination square) tuple, and records how to undo it.
+        The move is not validated, so it must be legal (such as a move from generate_legal_moves()).
+        Every move pushed can be taken back, most recent first, with pop().
         """
-        if self._whose_turn == "White":
-            self._whose_turn = "Black"
+        home_square, destination_square = move
+        board = self._board
+        piece_code = board[home_square]
+        unmoved_pawns, turn, game_status, position_hash = self._unmoved_pawns, self._turn, self._game_status, self._hash
+        # Only the attack map entries the move changes are kept for pop() (none if the maps are not built yet)
+        attack_journal = self._attack_journal = [] if self._attacks_from is not None else None
+
+        if board[destination_square] == EMPTY:
+            removed_pieces = ()
+            self._lift_piece(home_square)
+            self._place_piece(piece_code, destination_square)
+            self._update_attack_maps(BIT[home_square] | BIT[destination_square])
+            if unmoved_pawns & BIT[home_square]:
+                self.set_unmoved_pawns(unmoved_pawns ^ BIT[home_square])
+            self.update_turn()
         else:
-            self._whose_turn = "White"
+            # The capturing piece is suicidal, so it is removed along with everything in the explosion.
+            self.remove_piece(home_square)
+            exploded = self.explosion_mask(destination_square)
+            removed_pieces = ((home_square, piece_code),) + tuple(
+                (square, board[square]) for square in iter_squares(exploded))
+
+            # The hash is updated for every piece the explosion clears
+            self.explode_surroundings(destination_square)
+            exploded |= BIT[home_square]
+            if unmoved_pawns & exploded:
+                self.set_unmoved_pawns(unmoved_pawns & ~exploded)
+
+            # If the game status is still unfinished, the game goes on.
+            if self._game_status == UNFINISHED:
+                self.update_turn()
+
+        self._attack_journal = None
+        self._undo_stack.append((move, piece_code, removed_pieces, unmoved_pawns, turn, game_status, position_hash,
+                                 attack_journal))
+
+    def pop(self):
+        """Takes back the most recent move made with push() (or make_move()) and returns it."""
+        move, piece_code, removed_pieces, unmoved_pawns, turn, game_status, position_hash, attack_journal = \
+            self._undo_stack.pop()
+
+        # The hash and attack maps are restored directly, so the pieces are put back without put_piece() and remove_piece()
+        bitboards, occupancy, board = self._bitboards, self._occupancy, self._board
+        if removed_pieces:
+            # Put back every piece the explosion removed, including the capturing piece
+            for square, removed_code in removed_pieces:
+                bitboards[removed_code] |= BIT[square]
+                occupancy[removed_code // 6] |= BIT[square]
+                board[square] = removed_code
+        else:
+            home_square, destination_square = move
+            move_bits = BIT[home_square] | BIT[destination_square]
+            bitboards[piece_code] ^= move_bits
+            occupancy[piece_code // 6] ^= move_bits
+            board[destination_square] = EMPTY
+            board[home_square] = piece_code
+
+        self._unmoved_pawns = unmoved_pawns
+        self._turn = turn
+        self._game_status = game_status
+        self._hash = position_hash
+
+        if attack_journal is None:
+            # The maps were built after the move (or never), so they are built again when next needed
+            self._attacks_from = self._attackers_to = None
+        else:
+            # Each changed entry gets its old attacks back, newest change first, and attackers_to follows the difference
+            attacks_from, attackers_to = self._attacks_from, self._attackers_to
+            for piece_square, old_attacks in reversed(attack_journal):
+                changed = old_attacks ^ attacks_from[piece_square]
+                attacks_from[piece_square] = old_attacks
+                piece_bit = BIT[piece_square]
+                while changed:
+                    attacked_bit = changed & -changed
+                    changed ^= attacked_bit
+                    attackers_to[attacked_bit.bit_length() - 1] ^= piece_bit
+        return move
+
+    def get_ply(self):
+        """Returns the number of moves on the undo stack, which pop() can take back."""
+        return len(self._undo_stack)
+
+    def get_last_move(self):
+        """Returns the most recent move that pop() can take back, or None if there is none."""
+        return self._undo_stack[-1][0] if self._undo_stack else None
+
+    def get_move_history(self):
+        """Returns the list of moves made so far that can be taken back with pop(), oldest first."""
+        return [undo_record[0] for undo_record in self._undo_stack]
+
+    def explosion_mask(self, square):
+        """
+        Returns the bitboard of the pieces a capture on a square would blow up: the captured piece,
+        and every piece in the 3 x 3 block of tiles around it except for pawns. The capturing piece is not included.
+        """
+        pawns = self._bitboards[PAWN] | self._bitboards[6 + PAWN]
+        all_pieces = self._occupancy[WHITE] | self._occupancy[BLACK]
+        return (BLAST_MASKS[square] & all_pieces & ~pawns) | BIT[square]
 
-    def get_game_state(self):
-        """Returns the current game state."""
-        return self._game_status
+    def explode_surroundings(self, square):
+        """
+        Clears the captured piece on a square and all pieces surrounding it, except for pawns that are not directly attacked.
+        Returns the bitboard of the squares that were cleared, or None (clearing nothing) if two kings would be blown up at the same time.
+        If one king is blown up, the other player wins.
+        """
+        # Every non-pawn piece in the 3 x 3 block of tiles around the square, plus the captured piece itself
+        exploded = self.explosion_mask(square)
+
+        kings_exploded = exploded & (self._bitboards[KING] | self._bitboards[6 + KING])
+        if kings_exploded & (kings_exploded - 1):
+            # We cannot explode two kings at the same time.
+            return None
+
+        if kings_exploded:
+            # The player whose king was blown up loses.
+            if kings_exploded & self._bitboards[KING]:
+                self.declare_winner(BLACK)
+            else:
+                self.declare_winner(WHITE)
 
-    def print_board(self):
-        """Prints the board."""
-        if self._whose_turn == "White":
-            print("8 ", self._all_rows_dict["8"])
-            print("7 ", self._all_rows_dict["7"])
-            print("6 ", self._all_rows_dict["6"])
-            print("5 ", self._all_rows_dict["5"])
-            print("4 ", self._all_rows_dict["4"])
-            print("3 ", self._all_rows_dict["3"])
-            print("2 ", self._all_rows_dict["2"])
-            print("1 ", self._all_rows_dict["1"])
-            print("     A    B    C    D    E    F    G    H")
-        elif self._whose_turn == "Black":
-            # We print the rows backwards because they appear that way from black's perspective
-            print("1 ", self._all_rows_dict["1"][::-1])
-            print("2 ", self._all_rows_dict["2"][::-1])
-            print("3 ", self._all_rows_dict["3"][::-1])
-            print("4 ", self._all_rows_dict["4"][::-1])
-            print("5 ", self._all_rows_dict["5"][::-1])
-            print("6 ", self._all_rows_dict["6"][::-1])
-            print("7 ", self._all_rows_dict["7"][::-1])
-            print("8 ", self._all_rows_dict["8"][::-1])
-            print("     H    G    F    E    D    C    B    A")
-        print()
+        for exploded_square in iter_squares(exploded):
+            self._lift_piece(exploded_square)
+        # The attack maps are updated once for the whole explosion
+        self._update_attack_maps(exploded)
+
+        return exploded
 
-    def explode_surroundings(self, tile_pos):
+    def evaluate_capture(self, move):
         """
-        Clears the capturing piece and all pieces surrounding it, except for pawns that are not directly attacked.
-        Returns False if more than two kings are blown up at the same time.
+        Returns a CaptureEvaluation of a capture, given as a (home square, destination square) tuple,
+        by looking at the pieces its explosion would remove rather than making it.
         """
+        return CaptureEvaluation._make(self._capture_outcome(move))
 
-        pos_of_exploded_pieces = set()
+    def capture_value(self, move):
+        """Returns evaluate_capture(move).score, without building the CaptureEvaluation. Used to sort captures."""
+        return self._capture_outcome(move)[3]
 
-        # The ord() function assigns single-character strings to numbers.
-        # We subtract 97 to make the keys for letters 'a' through 'h' equal 0-7.
-        # This allows us to index through each list of rows to find the appropriate column.
-        column_index = ord(tile_pos[0]) - 97
-        row = int(tile_pos[1])
+    def _capture_outcome(self, move):
+        """
+        Returns the (swing, king exploded, illegal, score) fields of evaluate_capture() as a plain tuple,
+        so that capture_value() sorts by exactly the score evaluate_capture() reports.
+        """
+        home_square, destination_square = move
+        board = self._board
+        mover = board[home_square] // 6
+        swings = CAPTURE_SWINGS[mover]
+        exploded = self.explosion_mask(destination_square) | BIT[home_square]
+
+        swing = 0
+        for square in iter_squares(exploded):
+            swing += swings[board[square]]
+
+        kings_exploded = exploded & (self._bitboards[KING] | self._bitboards[6 + KING])
+        if not kings_exploded:
+            return swing, None, False, swing
+        if kings_exploded & (kings_exploded - 1):
+            return swing, None, True, swing - 2 * EXPLODED_KING_VALUE
+
+        king_color = WHITE if kings_exploded & self._bitboards[KING] else BLACK
+        if king_color == mover:
+            return swing, king_color, False, swing - EXPLODED_KING_VALUE
+        return swing, king_color, False, swing + EXPLODED_KING_VALUE
+
+    def generate_captures(self):
+        """
+        Returns a list of the legal captures of the player whose turn it is, sorted by capture_value(), best first:
+        captures that blow up the enemy king, then the others by material swing.
+        """
+        if self._game_status != UNFINISHED:
+            return []
+
+        turn = self._turn
+        board = self._board
+        own_pieces = self._occupancy[turn]
+        enemy_pieces = self._occupancy[turn ^ 1]
+        all_pieces = own_pieces | enemy_pieces
+        kings = self._bitboards[KING] | self._bitboards[6 + KING]
+        non_pawns = all_pieces & ~(self._bitboards[PAWN] | self._bitboards[6 + PAWN])
+
+        scored_captures = []
+        # Kings cannot capture, so they have no captures to look at
+        for home_square in iter_squares(own_pieces & ~kings):
+            # The tiles a piece attacks are exactly the tiles it could capture on
+            attacks = piece_attacks(board[home_square], home_square, all_pieces)
+            for destination_square in iter_squares(attacks & enemy_pieces):
+                # A capture cannot blow up both kings at once
+                kings_exploded = ((BLAST_MASKS[destination_square] & non_pawns) | BIT[destination_square]) & kings
+                if kings_exploded & (kings_exploded - 1):
+                    continue
+                move = (home_square, destination_square)
+                scored_captures.append((self.capture_value(move), move))
+
+        scored_captures.sort(key=lambda scored_capture: scored_capture[0], reverse=True)
+        return [move for _, move in scored_captures]
+
+    def generate_king_kills(self):
+        """
+        Returns a list of the legal captures that blow up the enemy king: capturing the king itself,
+        or any enemy piece next to it. Each one wins the game on the spot.
+        """
+        if self._game_status != UNFINISHED:
+            return []
+
+        turn = self._turn
+        enemy_kings = self._bitboards[(turn ^ 1) * 6 + KING]
+        if not enemy_kings:
+            return []
+        bitboards = self._bitboards
+        own_king = bitboards[turn * 6 + KING]
+        occupied = self._occupancy[WHITE] | self._occupancy[BLACK]
+        # Kings cannot capture, so the player's own king is never one of the attackers
+        pawns, knights = bitboards[turn * 6 + PAWN], bitboards[turn * 6 + KNIGHT]
+        diagonal_sliders = bitboards[turn * 6 + BISHOP] | bitboards[turn * 6 + QUEEN]
+        straight_sliders = bitboards[turn * 6 + ROOK] | bitboards[turn * 6 + QUEEN]
+
+        king_kills = []
+        for destination_square in iter_squares(BLAST_MASKS[enemy_kings.bit_length() - 1] & self._occupancy[turn ^ 1]):
+            if BLAST_MASKS[destination_square] & own_king:
+                # The explosion would take the player's own king too
+                continue
+            # Attacks are symmetric: a piece attacks the destination if the same piece there would attack it back
+            # (for pawns, a pawn of the other color)
+            attackers = ((PAWN_ATTACKS[turn ^ 1][destination_square] & pawns)
+                         | (KNIGHT_ATTACKS[destination_square] & knights))
+            if diagonal_sliders:
+                attackers |= sliding_attacks(destination_square, occupied, BISHOP_DIRECTIONS) & diagonal_sliders
+            if straight_sliders:
+                attackers |= sliding_attacks(destination_square, occupied, ROOK_DIRECTIONS) & straight_sliders
+            for home_square in iter_squares(attackers):
+                king_kills.append((home_square, destination_square))
+        return king_kills
+
+    def generate_quiet_moves(self):
+        """
+        Returns a list of the legal moves of the player whose turn it is that capture nothing,
+        in the same order as generate_legal_moves().
+        """
+        if self._game_status != UNFINISHED:
+            return []
+
+        turn = self._turn
+        board = self._board
+        all_pieces = self._occupancy[WHITE] | self._occupancy[BLACK]
+        empty_tiles = ~all_pieces
+        pawn_pushes = PAWN_PUSHES[turn]
+
+        moves = []
+        for home_square in iter_squares(self._occupancy[turn]):
+            piece_type = board[home_square] % 6
+
+            if piece_type == PAWN:
+                destinations = pawn_pushes[home_square] & empty_tiles
+                if destinations and self._unmoved_pawns & BIT[home_square]:
+                    destinations |= pawn_pushes[home_square + PAWN_DIRECTIONS[turn]] & empty_tiles
+            elif piece_type == KING:
+                destinations = KING_ATTACKS[home_square] & empty_tiles
+            else:
+                destinations = piece_attacks(board[home_square], home_square, all_pieces) & empty_tiles
 
-        for row_num in range(-1, 2):
-            # Going through the 3 x 3 block of tiles by iterating through each row
-            # and column next to the captured piece.
-            for num in range(-1, 2):
+            for destination_square in iter_squares(destinations):
+                moves.append((home_square, destination_square))
 
-                # Create a tile position variable to simplify the code
-                tile_position = chr(column_index + 97 + num) + str(row + row_num)
+        return moves
 
-                # If certain tiles are out of bounds, we do not clear them.
-                if self.out_of_bounds(tile_position) is False:
+    def iter_moves(self, first_move=None, quiet_first=(), quiet_key=None):
+        """
+        Yields every legal move of the player whose turn it is, in stages: first_move (if it is legal here),
+        captures that blow up the enemy king, the other captures by capture_value(), best first,
+        the moves of quiet_first that are legal quiet moves here, then the other quiet moves,
+        highest quiet_key(move) first if a key is given. No move is yielded twice.
+        Each stage is only generated once the moves before it have been used up, so a caller that stops early
+        (such as a search that finds a cutoff) skips most of the work. The game must not change between moves.
+        """
+        # first_move and quiet_first may come from other positions (such as a search's hash move and killer moves),
+        # so they are checked before they are yielded
+        if first_move is not None and self.move_error(*first_move) == MOVE_OK:
+            yield first_move
+        else:
+            first_move = None
+
+        king_kills = self.generate_king_kills()
+        for move in king_kills:
+            if move != first_move:
+                yield move
+
+        # generate_captures() includes the king kills, which have already been yielded
+        yielded = set(king_kills)
+        yielded.add(first_move)
+        for move in self.generate_captures():
+            if move not in yielded:
+                yield move
+
+        yielded = {first_move}
+        board = self._board
+        for move in quiet_first:
+            if (move is not None and move not in yielded and board[move[1]] == EMPTY
+                    and self.move_error(*move) == MOVE_OK):
+                yielded.add(move)
+                yield move
+
+        quiet_moves = self.generate_quiet_moves()
+        if quiet_key is not None:
+            quiet_moves.sort(key=quiet_key, reverse=True)
+        for move in quiet_moves:
+            if move not in yielded:
+                yield move
+
+    def generate_legal_moves(self):
+        """
+        Returns a list of every legal move for the player whose turn it is, as (home square, destination square) tuples.
+        All atomic rules are applied: pawns only capture diagonally and only advance onto empty tiles,
+        pieces cannot pass through or capture their own pieces, kings cannot capture,
+        and captures that would blow up both kings are left out. There are no moves once the game is over.
+        """
+        if self._game_status != UNFINISHED:
+            return []
+
+        turn = self._turn
+        board = self._board
+        own_pieces = self._occupancy[turn]
+        enemy_pieces = self._occupancy[turn ^ 1]
+        all_pieces = own_pieces | enemy_pieces
+        empty_tiles = ~all_pieces
+        kings = self._bitboards[KING] | self._bitboards[6 + KING]
+        non_pawns = all_pieces & ~(self._bitboards[PAWN] | self._bitboards[6 + PAWN])
+        pawn_pushes = PAWN_PUSHES[turn]
+
+        moves = []
+        for home_square in iter_squares(own_pieces):
+            piece_type = board[home_square] % 6
+
+            if piece_type == PAWN:
+                destinations = PAWN_ATTACKS[turn][home_square] & enemy_pieces
+                push = pawn_pushes[home_square] & empty_tiles
+                if push:
+                    destinations |= push
+                    if self._unmoved_pawns & BIT[home_square]:
+                        destinations |= pawn_pushes[home_square + PAWN_DIRECTIONS[turn]] & empty_tiles
+            elif piece_type == KING:
+                # A king cannot capture in atomic chess
+                destinations = KING_ATTACKS[home_square] & empty_tiles
+            else:
+                # Other pieces move wherever they attack (sliding pieces stop at the first piece in the way)
+                destinations = piece_attacks(board[home_square], home_square, all_pieces) & ~own_pieces
 
-                    # If the tile is empty or if the tile is occupied by a pawn, we do not clear the tile.
-                    if self._all_rows_dict[str(row + row_num)][column_index + num] != " " \
-                            and type(self._pos_to_piece_dict[tile_position]) is not Pawn:
+            for destination_square in iter_squares(destinations):
+                if enemy_pieces & BIT[destination_square]:
+                    # A capture cannot blow up both kings at once
+                    kings_exploded = ((BLAST_MASKS[destination_square] & non_pawns) | BIT[destination_square]) & kings
+                    if kings_exploded & (kings_exploded - 1):
+                        continue
+                moves.append((home_square, destination_square))
 
-                        pos_of_exploded_pieces.add(tile_position)
+        return moves
 
-        # If center tile position has not been added yet (due to it being a pawn), add it.
-        if tile_pos not in pos_of_exploded_pieces:
-            pos_of_exploded_pieces.add(tile_pos)
+    def perft(self, depth):
+        """
+        Returns the number of leaf positions reached by playing every sequence of legal moves of the given depth.
+        Finished games are leaves with no moves after them. Used to check and time move generation.
+        """
+        moves = self.generate_legal_moves()
+        if depth <= 1:
+            return len(moves) if depth == 1 else 1
+
+        nodes = 0
+        for move in moves:
+            self.push(move)
+            nodes += self.perft(depth - 1)
+            self.pop()
+        return nodes
+
+    def perft_divide(self, depth):
+        """Returns a dictionary mapping each legal move (in coordinate notation, such as "e2e4") to its perft count one ply deeper."""
+        counts = {}
+        for move in self.generate_legal_moves():
+            self.push(move)
+            counts[move_to_uci(move)] = self.perft(depth - 1)
+            self.pop()
+        return counts
+
+    def _reject(self, error):
+        """Returns an unsuccessful MoveResult carrying the given error code. The game is left unchanged."""
+        return MoveResult(False, error, frozenset(), self._game_status)
 
-        # We count the number of kings exploded
-        king_count = 0
-        for tile_position in pos_of_exploded_pieces:
-            if type(self._pos_to_piece_dict[tile_position]) is King:
-                king_count += 1
+    def update_turn(self):
+        """
+        Updates whose turn it is.
+        If current turn equals white, update to black. And vice versa.
+        """
+        self._turn ^= 1
+        self._hash ^= ZOBRIST_BLACK_TO_MOVE
 
-        if king_count <= 1:
-            # If number of kings is not more than 1, explode the tiles and return True.
+    def get_turn(self):
+        """Returns the color whose turn it is (WHITE or BLACK)."""
+        return self._turn
 
-            for tile_position in pos_of_exploded_pieces:
-                self.clear_tile_on_board(tile_position)
-                del self._pos_to_piece_dict[tile_position]
+    def get_whose_turn(self):
+        """Returns whose turn it is ("White" or "Black")."""
+        return COLOR_NAMES[self._turn]
 
-            if king_count == 1:
-                # If one king is exploded, change game status so that the make_move() function can call declare_winner()
-                self._game_status = self._whose_turn
+    def get_game_state(self):
+        """Returns the current game state."""
+        return self._game_status
 
-            return True
-        else:
-            # Else, return False because we cannot explode two kings at the same time.
-            return False
+    def get_board_rows(self):
+        """Returns a dictionary mapping each row ("1" to "8") to its list of tiles (emoji or " "), for display."""
+        all_rows_dict = {}
+        for row in range(8):
+            all_rows_dict[str(row + 1)] = [" " if piece_code == EMPTY else PIECE_EMOJIS[piece_code]
+                                           for piece_code in self._board[row * 8:row * 8 + 8]]
+        return all_rows_dict
 
     def characters_are_invalid(self, str_1, str_2):
         """
@@ -767,39 +1492,306 @@ class ChessVar:
             # Checking the length of each string
             if len(string) != 2:
                 return True
-            
+
             # If the characters are valid, do nothing
             elif string[0].isalpha() and string[1].isnumeric():
                 pass
-            
+
             # If the previous test did not pass, the string is invalid
             else:
                 return True
-        
+
         return False
 
-    def out_of_bounds(self, tile_position):
-        """Returns True if a tile's position is out of bounds, with respect to the chess board."""
-        # The ord() function assigns single-character strings to numbers, with 'a' to 'h' being 97-104.
-        # This allows us to index through each list of rows to find the appropriate column.
-        if 97 <= ord(tile_position[0]) <= 104 and 1 <= int(tile_position[1]) <= 8:
-            return False
+    def tile_squares(self, home_tile, destination_tile):
+        """
+        Returns the (home square, destination square) of two lowercase tiles such as "e2" and "e4",
+        or None if either is not a tile on the board. Tiles are looked up in SQUARE_INDEX, as parse_moves() does.
+        """
+        home_square = SQUARE_INDEX.get(home_tile)
+        destination_square = SQUARE_INDEX.get(destination_tile)
+        if home_square is None or destination_square is None:
+            return None
+        return home_square, destination_square
 
-        return True
+    def out_of_bounds(self, column, row):
+        """Returns True if a tile's column and row (each counted from 0) are out of bounds, with respect to the chess board."""
+        return not (0 <= column < 8 and 0 <= row < 8)
 
     def is_game_over(self):
         """Returns True or False, depending on if either side has won yet."""
-        if self._game_status == self._unfinished:
+        return self._game_status != UNFINISHED
+
+    def declare_winner(self, winner):
+        """Declares the given color (WHITE or BLACK) the winner."""
+        if winner == WHITE:
+            self._game_status = WHITE_WON
+        else:
+            self._game_status = BLACK_WON
+
+    def resign(self, color=None):
+        """
+        Ends the game by having a player (WHITE or BLACK, the player whose turn it is by default) resign, so the other player wins.
+        Returns True, or False without changing anything if the game is already over.
+        """
+        if self._game_status != UNFINISHED:
+            return False
+        self.declare_winner((self._turn if color is None else color) ^ 1)
+        return True
+
+
+# ---------------------------------- Board rendering ----------------------------------- #
+# "text" prints the whole board after every move, "ansi" keeps the board at the top of the terminal and rewrites
+# only the tiles that changed, and "quiet" draws nothing (for when nobody is watching).
+DISPLAY_MODES = ("text", "ansi", "quiet")
+
+# Terminal control sequences used by the "ansi" display mode
+ANSI_CLEAR_SCREEN = "\x1b[2J"
+ANSI_CLEAR_BELOW = "\x1b[J"
+ANSI_MOVE_CURSOR = "\x1b[{};{}H"     # Line and column, counting from 1
+
+# Where tiles appear in a drawn row such as "8  ['♜', '♞', ...]": the first tile is in text column 6,
+# and each tile is 5 columns after the one before it. The board takes up 10 lines (8 rows, the letters and a blank line).
+FIRST_TILE_COLUMN = 6
+TILE_COLUMN_STEP = 5
+BOARD_LINES = 10
+
+BOARD_FOOTERS = ("     A    B    C    D    E    F    G    H",
+                 "     H    G    F    E    D    C    B    A")
+
+
+class BoardRenderer:
+    """
+    Draws the board of an AtomicGame, from White's side or from Black's side, in the format of the original text UI.
+    The formatted rows of both sides are cached, and update() is told which squares a move or explosion touched,
+    so only the rows holding those squares are formatted again. Each drawing is written to the stream at once.
+    By default the board is drawn from the side of the player whose turn it is; a fixed orientation (WHITE or BLACK)
+    suits spectators, and in "ansi" mode it means a move only rewrites the tiles it changed.
+    """
+
+    def __init__(self, stream=None, mode="text", orientation=None):
+        if mode not in DISPLAY_MODES:
+            raise ValueError(f"Unknown display mode {mode!r}; expected one of {', '.join(DISPLAY_MODES)}.")
+        self._stream = stream                   # None writes to whatever sys.stdout is at the time
+        self._mode = mode
+        self._orientation = orientation         # WHITE, BLACK, or None to follow the player to move
+        self._tiles = [" "] * 64                # The text of each tile, as of the last update
+        self._row_lines = [[None] * 8, [None] * 8]  # [orientation][line]: a formatted row, or None if it must be redone
+        self._changed_squares = set()           # Squares changed since the board was last drawn in "ansi" mode
+        self._drawn_orientation = None          # The orientation on screen in "ansi" mode, or None before the first drawing
+        self._stale = True                      # True if every square must be checked before the next drawing
+
+    def get_mode(self):
+        """Returns the display mode."""
+        return self._mode
+
+    def set_mode(self, mode):
+        """Changes the display mode. The next drawing checks the whole board, since it may have changed unseen."""
+        if mode not in DISPLAY_MODES:
+            raise ValueError(f"Unknown display mode {mode!r}; expected one of {', '.join(DISPLAY_MODES)}.")
+        self._mode = mode
+        self.invalidate()
+
+    def invalidate(self):
+        """Makes the next drawing check every square and redraw the whole board, such as after moves made elsewhere."""
+        self._stale = True
+        self._drawn_orientation = None
+
+    def update(self, game, squares=None):
+        """
+        Refreshes the cached tiles of the given squares (every square if None) from the game.
+        Only rows with a tile that actually changed are formatted again.
+        """
+        if self._mode == "quiet":
+            # Nothing is drawn, so the cache is left to be refreshed in full if drawing starts again
+            self._stale = True
+            return
+
+        for square in range(64) if squares is None else squares:
+            piece_code = game.get_piece_code(square)
+            tile = " " if piece_code == EMPTY else PIECE_EMOJIS[piece_code]
+            if tile != self._tiles[square]:
+                self._tiles[square] = tile
+                self._row_lines[WHITE][7 - square // 8] = None
+                self._row_lines[BLACK][square // 8] = None
+                self._changed_squares.add(square)
+
+    def get_lines(self, orientation):
+        """Returns the 9 lines of the board (8 rows, then the column letters) as seen from a color's side."""
+        row_lines = self._row_lines[orientation]
+        for line in range(8):
+            if row_lines[line] is None:
+                if orientation == WHITE:
+                    row = 7 - line
+                    row_lines[line] = f"{row + 1}  {self._tiles[row * 8:row * 8 + 8]!r}"
+                else:
+                    # The rows are shown backwards, as they appear from black's perspective
+                    row = line
+                    row_lines[line] = f"{row + 1}  {self._tiles[row * 8:row * 8 + 8][::-1]!r}"
+        return row_lines + [BOARD_FOOTERS[orientation]]
+
+    def draw(self, game, orientation=None):
+        """
+        Draws the board according to the display mode. Call update() first with the squares the last move touched.
+        orientation (WHITE or BLACK) overrides the side of the player to move, unless the renderer has a fixed orientation.
+        """
+        if self._mode == "quiet":
+            self._stale = True
+            return
+        if self._stale:
+            self.update(game)
+            self._stale = False
+
+        if self._orientation is not None:
+            orientation = self._orientation
+        elif orientation is None:
+            orientation = game.get_turn()
+        stream = self._stream or sys.stdout
+
+        if self._mode == "text":
+            stream.write("\n".join(self.get_lines(orientation)) + "\n\n")
+        elif self._drawn_orientation != orientation:
+            # Nothing (or the other side) is on screen, so every line is rewritten
+            clear = ANSI_CLEAR_SCREEN if self._drawn_orientation is None else ""
+            stream.write(clear + ANSI_MOVE_CURSOR.format(1, 1) + "\n".join(self.get_lines(orientation)) + "\n")
+        else:
+            parts = []
+            for square in self._changed_squares:
+                row, column = square // 8, square % 8
+                line, position = (8 - row, column) if orientation == WHITE else (row + 1, 7 - column)
+                parts.append(ANSI_MOVE_CURSOR.format(line, FIRST_TILE_COLUMN + position * TILE_COLUMN_STEP))
+                parts.append(self._tiles[square])
+            stream.write("".join(parts))
+
+        if self._mode == "ansi":
+            # Anything printed after the board goes in the cleared space below it
+            stream.write(ANSI_MOVE_CURSOR.format(BOARD_LINES + 1, 1) + ANSI_CLEAR_BELOW)
+            self._drawn_orientation = orientation
+        self._changed_squares.clear()
+        stream.flush()
+
+
+class ChessVar:
+    """
+    Text UI for an AtomicGame, played by two players at the same terminal. White always starts first.
+    ChessVar prints the board and any rejected moves, and asks the players for their moves until the game ends.
+    display is the BoardRenderer mode: "text" (the default), "ansi" to redraw the board in place, or "quiet".
+    With ponder, the engine keeps searching in the background while waiting for the player's move.
+    """
+
+    def __init__(self, interactive=True, engine=None, engine_color="Black", fen=None, display="text", ponder=False):
+        self._game = AtomicGame(fen)
+        self._engine = engine               # A computer player (such as engine.Engine), or None for two players
+        self._engine_color = engine_color
+        self._ponder = ponder and engine is not None
+        self._renderer = BoardRenderer(mode=display)
+        self.print_board()
+        self.print_whose_turn()
+
+        if interactive:
+            self.play()
+
+    def get_game(self):
+        """Returns the AtomicGame being played."""
+        return self._game
+
+    def get_renderer(self):
+        """Returns the BoardRenderer that draws the board."""
+        return self._renderer
+
+    def play(self):
+        """Asks the players (or the engine, on its turn) for moves until the game ends."""
+        try:
+            while not self._game.is_game_over():
+                if self._engine is not None and self._game.get_whose_turn() == self._engine_color:
+                    if self.make_engine_move() is False:
+                        return
+                    continue
+
+                # input() lets the pondering thread run while the player thinks
+                if self._ponder:
+                    self._engine.start_pondering(self._game)
+                move_from, move_to = self.request_user_input()
+                while self.make_move(move_from, move_to) is False:
+                    move_from, move_to = self.request_user_input()
+        finally:
+            if self._ponder:
+                self._engine.stop_pondering()
+
+    def make_engine_move(self):
+        """Lets the engine choose and make a move. Returns False if it has no legal moves."""
+        move = self._engine.choose_move(self._game)
+        if move is None:
+            print(f"{self._game.get_whose_turn()} has no legal moves.")
+            return False
+
+        print(f"{self._game.get_whose_turn()} plays {move_to_uci(move)}\n")
+        return self.make_move(SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]])
+
+    def request_user_input(self):
+        """Asks the user what their desired moved is."""
+
+        move_from = input("Move piece from: ")
+        move_to = input("Move piece to: ")
+        print()
+
+        return move_from, move_to
+
+    def make_move(self, move_from, move_to):
+        """
+        Makes a move in the game and returns True, or prints why the move is not allowed and returns False.
+        Calls print_board() and print_whose_turn() automatically when returning True.
+        As always in this game, the board is drawn from the capturing player's side after a capture.
+        If either king is captured, it calls self.declare_winner().
+        """
+        mover = self._game.get_turn()
+        result = self._game.make_move(move_from, move_to)
+
+        if not result.success:
+            print(ERROR_MESSAGES[result.error])
             return False
+
+        # Only the tiles of the move and its explosion have changed
+        touched_squares = set(self._game.get_last_move())
+        touched_squares.update(SQUARE_INDEX[tile] for tile in result.exploded)
+        self._renderer.update(self._game, touched_squares)
+
+        self.print_board(mover if result.exploded else None)
+        if self._game.is_game_over():
+            self.declare_winner()
         else:
-            return True
+            self.print_whose_turn()
+
+        return True
+
+    def print_whose_turn(self):
+        """
+        Prints whose turn it is.
+        """
+        print(f"{self._game.get_whose_turn()}'s turn!\n")
+
+    def get_game_state(self):
+        """Returns the current game state."""
+        return self._game.get_game_state()
+
+    def is_game_over(self):
+        """Returns True or False, depending on if either side has won yet."""
+        return self._game.is_game_over()
+
+    def print_board(self, orientation=None):
+        """
+        Prints the board from the side of the player whose turn it is, or of the given color
+        (unless the renderer is set up with a fixed orientation).
+        """
+        self._renderer.draw(self._game, orientation)
 
     def declare_winner(self):
         """Declares the winner."""
-        winner = self._whose_turn
-        if winner == "White":
-            self._game_status = self._white_wins
-        elif winner == "Black":
-            self._game_status = self._black_wins
+        if self._game.get_game_state() == WHITE_WON:
+            print("White wins!")
+        elif self._game.get_game_state() == BLACK_WON:
+            print("Black wins!")
+
 
-        print(f"{winner} wins!")
+if __name__ == "__main__":
+    ChessVar()
@@ -0,0 +1,134 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Multi-PV analysis of AtomicGame positions: the best few moves of a position, each with its score and
+#              expected line of play. Results are kept in a least-recently-used cache keyed by position hash,
+#              so popular positions are only searched again when deeper analysis is asked for.
+#              Run "python analysis.py [depth] [number of lines] [fen]" to analyze a position.
+
+import sys
+from collections import OrderedDict, namedtuple
+
+from ChessVar import AtomicGame, ChessVar, move_to_uci
+from engine import Engine
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_DEPTH = 4
+
+
+class AnalysisLine(namedtuple("AnalysisLine", ["move", "score", "pv"])):
+    """
+    Represents one line of an analysis: a (home square, destination square) move,
+    its score in centipawns from the point of view of the player to move, and the expected line of play starting with it.
+    """
+    __slots__ = ()
+
+
+class AnalysisResult(namedtuple("AnalysisResult", ["lines", "depth", "nodes", "elapsed", "cached"])):
+    """
+    Represents the analysis of a position: its AnalysisLines, best first,
+    the depth every line was searched to, the number of positions visited and the seconds taken
+    (for the search that produced the lines), and whether it came from the cache.
+    """
+    __slots__ = ()
+
+
+class Analyzer:
+    """
+    Represents an analysis service around one Engine, whose transposition table stays warm between requests.
+    Up to cache_size results are cached by position hash, least recently used first out.
+    """
+
+    def __init__(self, engine=None, cache_size=DEFAULT_CACHE_SIZE):
+        self._engine = engine or Engine()
+        # Position hash: (position record, AnalysisResult, lines, depth and time limit asked for)
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._hits = 0
+        self._misses = 0
+
+    def get_cache_stats(self):
+        """Returns the (hits, misses, cached positions) of the cache so far."""
+        return self._hits, self._misses, len(self._cache)
+
+    def clear_cache(self):
+        """Forgets every cached result."""
+        self._cache.clear()
+
+    def analyze(self, position, depth=None, time_limit=None, multipv=1):
+        """
+        Returns an AnalysisResult with the best multipv moves of a position (an AtomicGame or a ChessVar),
+        each searched to depth, or for about time_limit seconds split between the lines.
+        With neither, the lines are searched to DEFAULT_DEPTH.
+        A cached result is reused when it has at least as many lines and was searched at least as deep
+        (or, for a time limit, for at least as long); otherwise the position is searched again,
+        and the new result replaces the cached one.
+        """
+        if multipv < 1:
+            raise ValueError(f"multipv must be at least 1, not {multipv}.")
+        game = position.get_game() if isinstance(position, ChessVar) else position
+        if depth is None and time_limit is None:
+            depth = DEFAULT_DEPTH
+
+        position_hash, position_record = game.get_hash(), game.to_bytes()
+        cached = self._cache.get(position_hash)
+        # The record is compared too, so that two positions with the same hash are never confused
+        if cached is not None and cached[0] == position_record:
+            self._cache.move_to_end(position_hash)
+            # What was asked for is compared rather than what the search reached, since a search stops early
+            # once it finds a forced win or loss
+            result, cached_multipv, cached_depth, cached_time_limit = cached[1:]
+            if depth is not None:
+                searched_enough = cached_depth is not None and cached_depth >= depth
+            else:
+                searched_enough = cached_time_limit is not None and cached_time_limit >= time_limit
+            if cached_multipv >= multipv and searched_enough:
+                self._hits += 1
+                return result._replace(lines=result.lines[:multipv], cached=True)
+
+        self._misses += 1
+        result = self._search(game.copy(), depth, time_limit, multipv)
+        self._cache[position_hash] = (position_record, result, multipv, depth, time_limit)
+        self._cache.move_to_end(position_hash)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _search(self, game, depth, time_limit, multipv):
+        """
+        Searches the best multipv moves one at a time, each search leaving out the moves already found,
+        and returns the AnalysisResult.
+        """
+        lines = []
+        excluded_moves = []
+        nodes = elapsed = 0
+        line_time = time_limit / multipv if time_limit is not None else None
+        searched_depth = None
+
+        for _ in range(multipv):
+            search_result = self._engine.search(game, max_depth=depth, time_limit=line_time,
+                                                excluded_moves=excluded_moves)
+            if search_result.move is None:
+                # Every legal move already has its line
+                break
+            nodes += search_result.nodes
+            elapsed += search_result.elapsed
+            lines.append(AnalysisLine(search_result.move, search_result.score, search_result.pv))
+            excluded_moves.append(search_result.move)
+            searched_depth = search_result.depth if searched_depth is None else min(searched_depth, search_result.depth)
+
+        # With a time limit the lines may reach different depths, so they are put back in order of score
+        lines.sort(key=lambda line: line.score, reverse=True)
+        return AnalysisResult(tuple(lines), searched_depth or 0, nodes, elapsed, False)
+
+
+if __name__ == "__main__":
+    # Usage: python analysis.py [depth] [number of lines] [fen]
+    requested_depth = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DEPTH
+    requested_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    analyzed_game = AtomicGame(" ".join(sys.argv[3:]) if len(sys.argv) > 3 else None)
+
+    analysis = Analyzer().analyze(analyzed_game, depth=requested_depth, multipv=requested_lines)
+    print(f"Depth {analysis.depth}, {analysis.nodes} nodes in {analysis.elapsed:.2f} s")
+    for line_number, line in enumerate(analysis.lines, 1):
+        print(f"{line_number}. {line.score:+6d}  {' '.join(move_to_uci(move) for move in line.pv)}")
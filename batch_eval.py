@@ -0,0 +1,184 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Scores many AtomicGame positions at once with NumPy.
+#              A batch of N positions is held as an (N, 12, 8, 8) array of piece planes (plane = piece code, then row, column)
+#              or as an (N, 64) array of piece codes, and material, king safety, explosions and the engine's evaluation
+#              are all computed as array operations over the whole batch. Requires NumPy.
+
+import numpy as np
+
+from ChessVar import WHITE, BLACK, PAWN, KING, EMPTY, PIECE_VALUES, BLAST_MASKS, POSITION_STRUCT
+from engine import MATE_SCORE, OWN_PIECE_NEAR_KING_PENALTY, ATTACKER_NEAR_ENEMY_KING_BONUS, PAWN_ADVANCE_BONUS
+
+# The binary position records written by AtomicGame.to_bytes(), as a NumPy record type
+RECORD_DTYPE = np.dtype([("occupied", "<u8"), ("pieces", "u1", 16), ("unmoved_pawns", "<u8"), ("turn", "u1")])
+assert RECORD_DTYPE.itemsize == POSITION_STRUCT.size
+
+# The value of each piece code, and the same with pawns left out (pawns survive explosions they are not part of)
+CODE_VALUES = np.array(PIECE_VALUES * 2, dtype=np.int32)
+BLASTABLE_CODE_VALUES = np.where(np.arange(12) % 6 == PAWN, 0, CODE_VALUES).astype(np.int32)
+
+# BLAST_PLANES[square] is BLAST_MASKS[square] as an 8 x 8 array
+BLAST_PLANES = np.unpackbits(np.array([[(mask >> (8 * row)) & 255 for row in range(8)] for mask in BLAST_MASKS],
+                                      dtype=np.uint8), axis=1, bitorder="little").reshape(64, 8, 8).astype(bool)
+
+# The row number of each tile, for scoring pawn advances
+ROWS = np.arange(8, dtype=np.int32).reshape(8, 1)
+
+
+# ------------------------------ Building batches ------------------------------ #
+
+def planes_from_games(games):
+    """Returns an (N, 12, 8, 8) array of uint8 with a 1 wherever each game has a piece of each piece code."""
+    bitboard_bytes = b"".join(game.get_bitboard(piece_code // 6, piece_code % 6).to_bytes(8, "little")
+                              for game in games for piece_code in range(12))
+    rows = np.frombuffer(bitboard_bytes, dtype=np.uint8).reshape(-1, 12, 8)
+    # Byte n of a bitboard is row n, and bit n of each byte is column n
+    return np.unpackbits(rows, axis=2, bitorder="little").reshape(-1, 12, 8, 8)
+
+
+def turns_from_games(games):
+    """Returns an (N,) array of whose turn it is in each game."""
+    return np.array([game.get_turn() for game in games], dtype=np.uint8)
+
+
+def boards_from_records(data):
+    """
+    Returns the (N, 64) array of piece codes (EMPTY for an empty tile) and the (N,) array of turns
+    of a batch of binary position records (see AtomicGame.to_bytes() and position_io), without building any games.
+    """
+    records = np.frombuffer(data, dtype=RECORD_DTYPE)
+    occupied_bytes = np.ascontiguousarray(records["occupied"]).view(np.uint8).reshape(-1, 8)
+    occupied = np.unpackbits(occupied_bytes, axis=1, bitorder="little").astype(bool)
+
+    # The codes of the occupied tiles are packed two to a byte, low nibble first, in square order
+    packed = records["pieces"]
+    codes = np.stack((packed & 15, packed >> 4), axis=2).reshape(-1, 32)
+    code_index = np.clip(np.cumsum(occupied, axis=1) - 1, 0, 31)
+    boards = np.where(occupied, np.take_along_axis(codes, code_index, axis=1), EMPTY).astype(np.int8)
+    return boards, records["turn"].copy()
+
+
+def planes_from_boards(boards):
+    """Returns the (N, 12, 8, 8) piece planes of an (N, 64) array of piece codes."""
+    boards = np.asarray(boards)
+    planes = boards[:, np.newaxis, :] == np.arange(12, dtype=boards.dtype)[np.newaxis, :, np.newaxis]
+    return planes.astype(np.uint8).reshape(-1, 12, 8, 8)
+
+
+def boards_from_planes(planes):
+    """Returns the (N, 64) array of piece codes (EMPTY for an empty tile) of (N, 12, 8, 8) piece planes."""
+    flat = planes.reshape(len(planes), 12, 64)
+    return np.where(flat.any(axis=1), flat.argmax(axis=1), EMPTY).astype(np.int8)
+
+
+# ------------------------------ Explosions ------------------------------ #
+
+def box_sum(array):
+    """
+    Returns the sum of each tile and the (up to) 8 tiles around it, over the last two (row, column) axes.
+    This is the 3 x 3 neighbourhood of explode_surroundings(), done as shifted additions (rows first, then columns).
+    """
+    array = np.asarray(array, dtype=np.int32)
+    padding = [(0, 0)] * (array.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(array, padding)
+    row_sums = padded[..., :-2, :] + padded[..., 1:-1, :] + padded[..., 2:, :]
+    return row_sums[..., :-2] + row_sums[..., 1:-1] + row_sums[..., 2:]
+
+
+def explosion_masks(planes, squares):
+    """
+    Returns an (N, 8, 8) array of bool marking the pieces a capture on squares[n] would blow up in position n:
+    the captured piece and every non-pawn piece around it, the same as AtomicGame.explosion_mask().
+    The capturing piece is not included.
+    """
+    squares = np.asarray(squares)
+    occupied = planes.any(axis=1)
+    pawns = (planes[:, PAWN] | planes[:, 6 + PAWN]).astype(bool)
+    captured = np.zeros_like(occupied)
+    captured.reshape(-1, 64)[np.arange(len(squares)), squares] = True
+    return (BLAST_PLANES[squares] & occupied & ~pawns) | captured
+
+
+def explode(planes, squares):
+    """Returns a copy of the piece planes with the explosion of a capture on squares[n] cleared from position n."""
+    return planes * ~explosion_masks(planes, squares)[:, np.newaxis]
+
+
+def explosion_losses(planes):
+    """
+    Returns an (N, 2, 8, 8) array with the material each color (WHITE, BLACK) would lose
+    if the piece on each tile were captured, not counting the capturing piece. Kings count 0, as in PIECE_VALUES.
+    Empty tiles get the value of an explosion there, even though nothing can be captured on them.
+    """
+    losses = np.empty((len(planes), 2, 8, 8), dtype=np.int32)
+    for color in (WHITE, BLACK):
+        color_codes = slice(color * 6, color * 6 + 6)
+        blastable = np.tensordot(planes[:, color_codes], BLASTABLE_CODE_VALUES[color_codes], axes=([1], [0]))
+        # A pawn only explodes when it is the piece being captured
+        captured_pawns = planes[:, color * 6 + PAWN].astype(np.int32) * PIECE_VALUES[PAWN]
+        losses[:, color] = box_sum(blastable) + captured_pawns
+    return losses
+
+
+def king_blasts(planes):
+    """
+    Returns an (N, 2, 8, 8) array of bool marking, for each color, the tiles where a capture would blow up its king.
+    Where both colors are marked, the capture would blow up both kings and is not allowed.
+    """
+    return box_sum(planes[:, [KING, 6 + KING]]) > 0
+
+
+# ------------------------------ Scoring ------------------------------ #
+
+def material(planes):
+    """Returns an (N, 2) array with the material of each color (WHITE, BLACK) in centipawns."""
+    counts = planes.reshape(len(planes), 12, 64).sum(axis=2, dtype=np.int32)
+    weighted = counts * CODE_VALUES
+    return np.stack((weighted[:, :6].sum(axis=1), weighted[:, 6:].sum(axis=1)), axis=1)
+
+
+def king_safety(planes):
+    """
+    Returns the king-safety features used by engine.evaluate() as three arrays:
+    bombs (N, 2), the pieces of each color standing next to their own king, which the enemy can capture to blow it up;
+    attackers (N, 2), the pieces of each color within two tiles of the enemy king;
+    and kings_connected (N,), whether the kings touch, so neither can be blown up.
+    Pawns and the kings themselves are not counted as bombs or attackers.
+    """
+    kings = planes[:, [KING, 6 + KING]].astype(np.int32)
+    king_zones = box_sum(kings) > 0
+    approach_zones = box_sum(king_zones) > 0
+    # Knights, bishops, rooks and queens of each color
+    pieces = np.stack((planes[:, 1:5].sum(axis=1), planes[:, 7:11].sum(axis=1)), axis=1).astype(np.int32)
+
+    bombs = (king_zones * pieces).sum(axis=(2, 3))
+    attackers = (approach_zones[:, ::-1] * pieces).sum(axis=(2, 3))
+    kings_connected = (king_zones[:, WHITE] & kings[:, BLACK].astype(bool)).any(axis=(1, 2))
+    return bombs, attackers, kings_connected
+
+
+def evaluate_batch(planes, turns=None):
+    """
+    Returns an (N,) array with engine.evaluate() of every position, in centipawns.
+    Scores are from White's point of view, or from the point of view of the player to move if turns is given.
+    """
+    white_score = material(planes) @ np.array([1, -1], dtype=np.int32)
+
+    bombs, attackers, kings_connected = king_safety(planes)
+    king_terms = ATTACKER_NEAR_ENEMY_KING_BONUS * attackers - OWN_PIECE_NEAR_KING_PENALTY * bombs
+    white_score += np.where(kings_connected, 0, king_terms[:, WHITE] - king_terms[:, BLACK])
+
+    white_pawn_rows = (planes[:, PAWN] * (ROWS - 1)).sum(axis=(1, 2))
+    black_pawn_rows = (planes[:, 6 + PAWN] * (6 - ROWS)).sum(axis=(1, 2))
+    white_score += PAWN_ADVANCE_BONUS * (white_pawn_rows - black_pawn_rows)
+
+    # A finished game: whoever still has a king has won
+    has_king = planes[:, [KING, 6 + KING]].any(axis=(2, 3))
+    white_score = np.where(has_king[:, WHITE] & has_king[:, BLACK], white_score,
+                           np.where(has_king[:, WHITE], MATE_SCORE, -MATE_SCORE)).astype(np.int32)
+
+    if turns is None:
+        return white_score
+    return np.where(np.asarray(turns) == BLACK, -white_score, white_score)
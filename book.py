@@ -0,0 +1,229 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: An opening book for AtomicGame: a sorted file of (position hash, move, weight, score) records,
+#              memory-mapped and searched by binary search so that opening it is instant and processes share its pages.
+#              BookBuilder plays recorded games through the rules and adds up how each early move fared.
+#              Run "python book.py build book.bin archive.txt [max ply]", "python book.py selfplay book.bin [games]"
+#              or "python book.py probe book.bin [fen]".
+
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+
+from ChessVar import AtomicGame, WHITE, BLACK, WHITE_WON, BLACK_WON, encode_move, decode_move, uci_to_move, \
+    move_to_uci
+
+# The file starts with a header (magic bytes, format version, record count),
+# followed by the records sorted by position hash and then by move code.
+BOOK_MAGIC = b"ATOMBOOK"
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct("<8sII")
+# Position hash (see AtomicGame.get_hash()), move packed by encode_move(), number of games that played the move,
+# and the sum of their results for the player who made the move (+1 for a win, -1 for a loss, 0 otherwise).
+BOOK_RECORD = struct.Struct("<QHIi")
+_RECORD_HASH = struct.Struct("<Q")
+
+# Moves are recorded for this many plies (moves by either player) from the start of each game unless asked otherwise.
+DEFAULT_MAX_PLY = 16
+
+
+class BookEntry(namedtuple("BookEntry", ["move", "weight", "score"])):
+    """
+    Represents one book move of a position: a (home square, destination square) move,
+    the number of games that played it, and the sum of their results for the player who played it.
+    """
+    __slots__ = ()
+
+
+class OpeningBook:
+    """
+    Represents an opening book file, opened read-only with mmap.
+    Lookups are a binary search over the sorted records, so only the pages touched are ever read from disk.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as book_file:
+            self._map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_count = BOOK_HEADER.unpack_from(self._map.read(BOOK_HEADER.size).ljust(BOOK_HEADER.size))
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not an opening book of version {BOOK_VERSION}.")
+        if BOOK_HEADER.size + record_count * BOOK_RECORD.size > len(self._map):
+            self._map.close()
+            raise ValueError(f"{path} is shorter than its {record_count} records.")
+        self._record_count = record_count
+
+    def __len__(self):
+        return self._record_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+    def close(self):
+        """Unmaps the book file."""
+        self._map.close()
+
+    def probe(self, position_hash):
+        """Returns the BookEntries of a position, most played first, or an empty list if the book does not have it."""
+        book_map = self._map
+        low, high = 0, self._record_count
+        while low < high:
+            middle = (low + high) // 2
+            if _RECORD_HASH.unpack_from(book_map, BOOK_HEADER.size + middle * BOOK_RECORD.size)[0] < position_hash:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+        for index in range(low, self._record_count):
+            record_hash, move_code, weight, score = BOOK_RECORD.unpack_from(
+                book_map, BOOK_HEADER.size + index * BOOK_RECORD.size)
+            if record_hash != position_hash:
+                break
+            entries.append(BookEntry(decode_move(move_code), weight, score))
+
+        entries.sort(key=lambda entry: (entry.weight, entry.score), reverse=True)
+        return entries
+
+    def choose_move(self, game, rng=None, min_weight=1):
+        """
+        Returns a book move for the game's position, or None if the book has none played at least min_weight times.
+        Without rng it is the most played move; with a random.Random, moves are picked in proportion to how often they were played.
+        Moves are checked to be legal, so a hash collision cannot produce a bad move.
+        """
+        if game.is_game_over():
+            return None
+        entries = [entry for entry in self.probe(game.get_hash()) if entry.weight >= min_weight]
+        if not entries:
+            return None
+        legal_moves = set(game.generate_legal_moves())
+        entries = [entry for entry in entries if entry.move in legal_moves]
+        if not entries:
+            return None
+        if rng is None:
+            return entries[0].move
+        return rng.choices([entry.move for entry in entries], [entry.weight for entry in entries])[0]
+
+
+class BookBuilder:
+    """
+    Adds up the moves played in the first max_ply plies of many games, for writing an OpeningBook.
+    Each game is played from the starting position through the rules, so games with an illegal move are left out,
+    and each move is credited with the game's final result.
+    """
+
+    def __init__(self, max_ply=DEFAULT_MAX_PLY):
+        self._max_ply = max_ply
+        self._statistics = {}           # (position hash, move code): [weight, score]
+        self._game = AtomicGame()
+        self._start_position = self._game.to_bytes()
+        self._games_added = 0
+        self._games_rejected = 0
+
+    def get_games_added(self):
+        """Returns the number of games added to the book."""
+        return self._games_added
+
+    def get_games_rejected(self):
+        """Returns the number of games left out because they contained an illegal move."""
+        return self._games_rejected
+
+    def get_position_count(self):
+        """Returns the number of different (position, move) pairs seen so far."""
+        return len(self._statistics)
+
+    def add_game(self, moves):
+        """
+        Plays a game's moves (text such as "e2e4", square tuples, or codes packed by encode_move()) and adds up its early moves.
+        Returns True, or False if the game has an illegal move and was left out.
+        """
+        game = self._game
+        game.set_bytes(self._start_position)
+        book_moves = []
+
+        for move in moves:
+            try:
+                if isinstance(move, str):
+                    move = uci_to_move(move)
+                elif isinstance(move, int):
+                    move = decode_move(move)
+            except ValueError:
+                self._games_rejected += 1
+                return False
+
+            position_hash, mover = game.get_hash(), game.get_turn()
+            if not game.make_square_move(*move).success:
+                self._games_rejected += 1
+                return False
+            if len(book_moves) < self._max_ply:
+                book_moves.append((position_hash, encode_move(move), mover))
+
+        game_state = game.get_game_state()
+        winner = WHITE if game_state == WHITE_WON else BLACK if game_state == BLACK_WON else None
+
+        statistics = self._statistics
+        for position_hash, move_code, mover in book_moves:
+            move_statistics = statistics.get((position_hash, move_code))
+            if move_statistics is None:
+                move_statistics = statistics[(position_hash, move_code)] = [0, 0]
+            move_statistics[0] += 1
+            if winner is not None:
+                move_statistics[1] += 1 if winner == mover else -1
+
+        self._games_added += 1
+        return True
+
+    def add_games(self, move_lists):
+        """Adds every game of an iterable of move lists (such as replay.read_move_log()), one at a time."""
+        for moves in move_lists:
+            self.add_game(moves)
+
+    def write(self, path, min_weight=1):
+        """
+        Writes the book to path, leaving out moves played fewer than min_weight times, and returns the number of records.
+        The file is written under a temporary name and then renamed, so readers never see a half-written book.
+        """
+        records = sorted((position_hash, move_code, weight, score)
+                         for (position_hash, move_code), (weight, score) in self._statistics.items()
+                         if weight >= min_weight)
+
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as book_file:
+            book_file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, len(records)))
+            pack = BOOK_RECORD.pack
+            book_file.write(b"".join(pack(*record) for record in records))
+        os.replace(temporary_path, path)
+        return len(records)
+
+
+if __name__ == "__main__":
+    # Usage: python book.py build book.bin archive.txt [max ply]
+    #        python book.py selfplay book.bin [games] [max ply]
+    #        python book.py probe book.bin [fen]
+    command, book_path = sys.argv[1], sys.argv[2]
+
+    if command == "probe":
+        position = AtomicGame(" ".join(sys.argv[3:]) if len(sys.argv) > 3 else None)
+        with OpeningBook(book_path) as book:
+            for book_entry in book.probe(position.get_hash()):
+                print(f"{move_to_uci(book_entry.move)}  played {book_entry.weight}  score {book_entry.score:+d}")
+    else:
+        builder = BookBuilder(int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_MAX_PLY)
+        if command == "build":
+            from replay import read_move_log
+            builder.add_games(read_move_log(sys.argv[3]))
+        else:
+            from selfplay import run_selfplay
+            for finished_batch in run_selfplay(int(sys.argv[3]) if len(sys.argv) > 3 else 1000, "weighted"):
+                builder.add_games(record.moves for record in finished_batch)
+
+        written = builder.write(book_path)
+        print(f"{builder.get_games_added()} games added ({builder.get_games_rejected()} left out), "
+              f"{written} book moves written to {book_path}")
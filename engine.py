@@ -0,0 +1,469 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Defines an Engine class that picks moves for either side of an AtomicGame,
+#              using an alpha-beta search with iterative deepening, quiescence search over captures,
+#              a transposition table, and time or node limits.
+
+import threading
+import time
+from collections import namedtuple
+
+from ChessVar import (ChessVar, WHITE, BLACK, PAWN, KING, EMPTY, UNFINISHED, WHITE_WON,
+                      PIECE_VALUES, BIT, BLAST_MASKS, iter_squares, encode_move, decode_move)
+from transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Scores are in centipawns from the point of view of the player whose turn it is.
+# Blowing up the enemy king scores MATE_SCORE minus the number of moves it takes.
+MATE_SCORE = 100000
+MATE_THRESHOLD = MATE_SCORE - 1000
+INFINITE_SCORE = MATE_SCORE + 1
+
+
+def _build_king_approach_masks():
+    """Returns, for each square, the 5 x 5 block of tiles around it: the tiles from which a piece is one step from its blast zone."""
+    approach_masks = []
+    for square in range(64):
+        mask = 0
+        for near_square in iter_squares(BLAST_MASKS[square]):
+            mask |= BLAST_MASKS[near_square]
+        approach_masks.append(mask)
+    return tuple(approach_masks)
+
+
+KING_APPROACH_MASKS = _build_king_approach_masks()
+
+# Evaluation weights
+OWN_PIECE_NEAR_KING_PENALTY = 30     # A piece next to its own king is a bomb the other player can set off
+ATTACKER_NEAR_ENEMY_KING_BONUS = 12  # A piece near the enemy king threatens to blow it up
+PAWN_ADVANCE_BONUS = 4               # Per row advanced
+
+# Check the clock every this many nodes
+CLOCK_CHECK_INTERVAL = 1024
+
+
+class SearchResult(namedtuple("SearchResult", ["move", "score", "depth", "nodes", "pv", "elapsed"])):
+    """
+    Represents the outcome of Engine.search().
+    move is the best (home square, destination square) move, or None if there are no legal moves.
+    score is from the point of view of the player to move, depth is the deepest completed iteration,
+    nodes is the number of positions visited, pv is the expected line of play, and elapsed is in seconds.
+    """
+    __slots__ = ()
+
+
+class SearchStopped(Exception):
+    """Raised inside the search when its time or node limit runs out."""
+
+
+def evaluate(game):
+    """
+    Returns the static score of a position, in centipawns, from the point of view of the player whose turn it is.
+    Besides material, it knows that in atomic chess a king is in danger from its own pieces standing next to it
+    (capturing any of them blows the king up), that pieces close to the enemy king threaten it,
+    and that kings touching each other cannot be blown up.
+    """
+    white_king = game.get_bitboard(WHITE, KING)
+    black_king = game.get_bitboard(BLACK, KING)
+    if not white_king or not black_king:
+        # A finished game: whoever still has a king has won
+        score = MATE_SCORE if white_king else -MATE_SCORE
+        return score if game.get_turn() == WHITE else -score
+
+    king_squares = (white_king.bit_length() - 1, black_king.bit_length() - 1)
+    kings_connected = BLAST_MASKS[king_squares[WHITE]] & black_king != 0
+    pawns = game.get_bitboard(WHITE, PAWN) | game.get_bitboard(BLACK, PAWN)
+
+    score = 0
+    for color in (WHITE, BLACK):
+        own_pieces = game.get_occupancy(color)
+        side_score = 0
+
+        for piece_type in range(5):
+            side_score += PIECE_VALUES[piece_type] * game.get_bitboard(color, piece_type).bit_count()
+
+        if not kings_connected:
+            # Non-pawn pieces next to the king can be captured to blow it up; pawns survive explosions
+            bombs = BLAST_MASKS[king_squares[color]] & own_pieces & ~pawns & ~BIT[king_squares[color]]
+            side_score -= OWN_PIECE_NEAR_KING_PENALTY * bombs.bit_count()
+
+            attackers = KING_APPROACH_MASKS[king_squares[color ^ 1]] & own_pieces & ~pawns & ~BIT[king_squares[color]]
+            side_score += ATTACKER_NEAR_ENEMY_KING_BONUS * attackers.bit_count()
+
+        for square in iter_squares(game.get_bitboard(color, PAWN)):
+            side_score += PAWN_ADVANCE_BONUS * (square // 8 - 1 if color == WHITE else 6 - square // 8)
+
+        score += side_score if color == WHITE else -side_score
+
+    return score if game.get_turn() == WHITE else -score
+
+
+class Engine:
+    """
+    Represents a computer player for AtomicGame.
+    search() runs an alpha-beta search with iterative deepening until a depth, time or node limit is reached.
+    The game passed in is searched with push() and pop(), and is always left as it was found.
+    """
+
+    def __init__(self, tt_size_mb=16, max_depth=64, time_limit=None, node_limit=None, book=None, tablebase=None):
+        self._table = TranspositionTable(tt_size_mb)
+        self._book = book           # An opening book (such as book.OpeningBook) to play from before searching, or None
+        self._tablebase = tablebase  # Endgame tables (such as tablebase.Tablebase) to play and score small endings from, or None
+        self._tablebase_pieces = tablebase.get_max_pieces() if tablebase is not None else 0
+        self._max_depth = max_depth
+        self._time_limit = time_limit
+        self._node_limit = node_limit
+        self._killers = []
+        self._history = {}
+        self._nodes = 0
+        self._deadline = None
+        self._stop_at_nodes = None
+        self._excluded_root_moves = frozenset()     # Root moves the current search leaves out (for multi-PV analysis)
+        self._root_best_move = None                 # Best root move of the last completed iteration
+        self._stop_requested = threading.Event()    # Set to stop a search running on another thread
+        self._expected_reply = None                 # The opponent's reply expected by the last move chosen, or None
+        self._ponder_thread = None
+        self._ponder_position = None                # Position record after the predicted reply, or None for every reply
+        self._ponder_result = None                  # SearchResult of the last pondering search
+
+    def get_transposition_table(self):
+        """Returns the engine's transposition table."""
+        return self._table
+
+    def choose_move(self, game):
+        """
+        Returns the move the engine would play, or None if there are no legal moves.
+        A position in the opening book or the endgame tables is answered from them; any other is searched with the default limits.
+        If the engine was pondering and the opponent played the predicted reply, the pondering search counts toward
+        those limits, and its move is played at once if it already reached them.
+        """
+        ponder_result = self._finish_pondering(game)
+        self._expected_reply = None
+        if self._book is not None:
+            book_move = self._book.choose_move(game)
+            if book_move is not None:
+                return book_move
+        if self._tablebase is not None:
+            tablebase_move = self._tablebase.choose_move(game)
+            if tablebase_move is not None:
+                return tablebase_move
+
+        if ponder_result is None:
+            result = self.search(game)
+        elif self._search_is_complete(ponder_result):
+            result = ponder_result
+        else:
+            # The table is already filled in from pondering, so the shallow depths are searched again quickly
+            time_left = self._time_limit - ponder_result.elapsed if self._time_limit is not None else None
+            nodes_left = self._node_limit - ponder_result.nodes if self._node_limit is not None else None
+            result = self.search(game, time_limit=time_left, node_limit=nodes_left)
+
+        if len(result.pv) > 1:
+            self._expected_reply = result.pv[1]
+        return result.move
+
+    def search(self, game, max_depth=None, time_limit=None, node_limit=None, excluded_moves=()):
+        """
+        Searches the position one depth at a time until max_depth is completed or a time limit (in seconds)
+        or node limit runs out, and returns a SearchResult for the deepest completed depth.
+        Limits that are not given default to the ones the engine was created with.
+        Root moves in excluded_moves are not considered, so the best of the remaining moves is found
+        (its move is None if every legal move is excluded). Any pondering is stopped first.
+        """
+        self.stop_pondering()
+        max_depth = max_depth if max_depth is not None else self._max_depth
+        time_limit = time_limit if time_limit is not None else self._time_limit
+        node_limit = node_limit if node_limit is not None else self._node_limit
+        return self._search(game, max_depth, time_limit, node_limit, excluded_moves)
+
+    def _search(self, game, max_depth, time_limit, node_limit, excluded_moves=()):
+        """Carries out search() with every limit given (None for no limit)."""
+        start_time = time.perf_counter()
+        self._deadline = start_time + time_limit if time_limit is not None else None
+        self._stop_at_nodes = node_limit
+        self._nodes = 0
+        self._killers = [[None, None] for _ in range(max_depth + 64)]
+        self._history = {}
+        self._table.new_search()
+
+        self._excluded_root_moves = frozenset(excluded_moves)
+        root_moves = [move for move in game.generate_legal_moves() if move not in self._excluded_root_moves]
+        if not root_moves:
+            return SearchResult(None, evaluate(game), 0, 0, [], 0.0)
+
+        root_ply = game.get_ply()
+        first_move = next(move for move in self._staged_moves(game, None, 0) if move not in self._excluded_root_moves)
+        result = SearchResult(first_move, 0, 0, 0, [], 0.0)
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self._negamax(game, depth, -INFINITE_SCORE, INFINITE_SCORE, 0)
+            except SearchStopped:
+                # Take back the moves of the unfinished iteration
+                while game.get_ply() > root_ply:
+                    game.pop()
+                break
+
+            # The line starts from the best root move of this iteration, since the table entry of the root
+            # may belong to a search that did not exclude the same moves
+            best_move = self._root_best_move
+            game.push(best_move)
+            pv = [best_move] + self._principal_variation(game, depth - 1)
+            game.pop()
+            result = SearchResult(best_move, score, depth, self._nodes, pv, time.perf_counter() - start_time)
+
+            if abs(score) >= MATE_THRESHOLD:
+                # A forced win or loss has been found; searching deeper will not change it
+                break
+
+        return result._replace(nodes=self._nodes, elapsed=time.perf_counter() - start_time)
+
+    # ---------------------------------- Pondering ---------------------------------- #
+
+    def start_pondering(self, game, predicted_move=None):
+        """
+        Starts searching on a background thread while the opponent decides on their move in the game,
+        until stop_pondering() or the next choose_move() or search().
+        The predicted reply (by default the one expected by the last move chosen) is played on a copy of the game
+        and the position after it is searched, so choose_move() can answer at once if the opponent plays it.
+        Without a prediction, the opponent's position itself is searched, filling in the table for every reply.
+        The game may be changed while pondering; the engine only searches its copy.
+        """
+        self.stop_pondering()
+        ponder_game = game.copy()
+        if predicted_move is None:
+            predicted_move = self._expected_reply
+        if predicted_move is not None and predicted_move in ponder_game.generate_legal_moves():
+            ponder_game.push(predicted_move)
+        if ponder_game.get_turn() == game.get_turn() or ponder_game.is_game_over():
+            # No usable prediction: ponder every reply instead
+            ponder_game = game.copy()
+            self._ponder_position = None
+        else:
+            self._ponder_position = ponder_game.to_bytes()
+
+        self._ponder_result = None
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(ponder_game,), name="engine-ponder",
+                                               daemon=True)
+        self._ponder_thread.start()
+
+    def stop_pondering(self):
+        """Stops the pondering search, if there is one, and waits for its thread to finish."""
+        if self._ponder_thread is not None:
+            self._stop_requested.set()
+            self._ponder_thread.join()
+            self._ponder_thread = None
+            self._stop_requested.clear()
+
+    def is_pondering(self):
+        """Returns True if a pondering search is running (False once it has stopped, or ended by itself)."""
+        return self._ponder_thread is not None and self._ponder_thread.is_alive()
+
+    def _ponder(self, game):
+        """Searches a position with no limits until asked to stop, and keeps the result. Runs on the pondering thread."""
+        self._ponder_result = self._search(game, self._max_depth, None, None)
+
+    def _finish_pondering(self, game):
+        """
+        Stops pondering, and returns its SearchResult if it searched the game's position
+        (the opponent played the predicted reply), or None otherwise.
+        """
+        self.stop_pondering()
+        result, pondered_position = self._ponder_result, self._ponder_position
+        self._ponder_result = self._ponder_position = None
+        if result is None or result.move is None or pondered_position != game.to_bytes():
+            return None
+        return result
+
+    def _search_is_complete(self, result):
+        """Returns True if a search result already reached the engine's default depth, time or node limit."""
+        return (result.depth >= self._max_depth or abs(result.score) >= MATE_THRESHOLD
+                or self._time_limit is not None and result.elapsed >= self._time_limit
+                or self._node_limit is not None and result.nodes >= self._node_limit)
+
+    def _check_limits(self):
+        """Raises SearchStopped if the time or node limit has run out, or another thread asked the search to stop."""
+        if self._stop_requested.is_set():
+            raise SearchStopped()
+        if self._stop_at_nodes is not None and self._nodes >= self._stop_at_nodes:
+            raise SearchStopped()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchStopped()
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """Returns the score of the position searched to the given depth, within the (alpha, beta) window."""
+        self._nodes += 1
+        if self._nodes % CLOCK_CHECK_INTERVAL == 0:
+            self._check_limits()
+
+        if ply > 0 and game.get_occupancy().bit_count() <= self._tablebase_pieces:
+            # A small ending is scored exactly from the tables, counting the plies to the explosion from the root
+            result = self._tablebase.probe(game)
+            if result is not None:
+                if result.distance is None:
+                    return 0
+                score = MATE_SCORE - (ply + result.distance)
+                return score if result.outcome > 0 else -score
+
+        if depth <= 0:
+            return self._quiescence(game, alpha, beta, ply)
+
+        position_hash = game.get_hash()
+        entry = self._table.probe(position_hash)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, entry_move = entry
+            tt_move = decode_move(entry_move) if entry_move else None
+            if entry_depth >= depth and ply > 0:
+                entry_score = _score_from_table(entry_score, ply)
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER_BOUND and entry_score >= beta:
+                    return entry_score
+                if entry_flag == UPPER_BOUND and entry_score <= alpha:
+                    return entry_score
+
+        original_alpha = alpha
+        best_score = -INFINITE_SCORE
+        best_move = None
+        turn = game.get_turn()
+        excluded_moves = self._excluded_root_moves if ply == 0 else ()
+
+        # Most nodes cut off after the first move or two, so the moves are generated lazily, a stage at a time
+        for move in self._staged_moves(game, tt_move, ply):
+            if move in excluded_moves:
+                continue
+            game.push(move)
+            if game.get_game_state() != UNFINISHED:
+                score = _terminal_score(game, turn, ply + 1)
+            else:
+                score = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game.pop()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if game.get_piece_code(move[1]) == EMPTY:
+                            self._remember_quiet_cutoff(move, depth, ply)
+                        break
+
+        if best_move is None:
+            # The variant has no stalemate rule; a player who cannot move is treated as a draw
+            return 0
+
+        if ply == 0:
+            self._root_best_move = best_move
+            if self._excluded_root_moves:
+                # The score only holds for the moves searched, so it is not stored for the position
+                return best_score
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._table.store(position_hash, depth, _score_to_table(best_score, ply), flag, encode_move(best_move))
+
+        return best_score
+
+    def _quiescence(self, game, alpha, beta, ply):
+        """
+        Returns the score of the position once the captures have played out.
+        Explosions swing the material so far that quiet positions are the only ones worth evaluating.
+        """
+        self._nodes += 1
+        if self._nodes % CLOCK_CHECK_INTERVAL == 0:
+            self._check_limits()
+
+        stand_pat = evaluate(game)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        # Captures come sorted by the value of their explosions, best first
+        captures = game.generate_captures()
+        turn = game.get_turn()
+
+        for move in captures:
+            game.push(move)
+            if game.get_game_state() != UNFINISHED:
+                score = _terminal_score(game, turn, ply + 1)
+            else:
+                score = -self._quiescence(game, -beta, -alpha, ply + 1)
+            game.pop()
+
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def _staged_moves(self, game, tt_move, ply):
+        """
+        Returns an iterator over the legal moves in the order they should be searched: the transposition table move,
+        captures that blow up the enemy king, the other captures by value, the killer moves, then the quiet moves by history.
+        Each stage is only generated once the moves before it have been searched (see AtomicGame.iter_moves()).
+        """
+        killers = self._killers[ply] if ply < len(self._killers) else ()
+        history = self._history
+        return game.iter_moves(tt_move, killers, lambda move: history.get(move, 0))
+
+    def _remember_quiet_cutoff(self, move, depth, ply):
+        """Records a quiet move that caused a beta cutoff, as a killer move and in the history table."""
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self._history[move] = self._history.get(move, 0) + depth * depth
+
+    def _principal_variation(self, game, max_length):
+        """Returns the line of best moves stored in the transposition table, starting from the position."""
+        pv = []
+        seen = set()
+        while len(pv) < max_length and game.get_hash() not in seen:
+            seen.add(game.get_hash())
+            entry = self._table.probe(game.get_hash())
+            if entry is None or not entry[3]:
+                break
+            move = decode_move(entry[3])
+            if move not in game.generate_legal_moves():
+                break
+            pv.append(move)
+            game.push(move)
+        for _ in pv:
+            game.pop()
+        return pv
+
+
+def _terminal_score(game, mover, ply):
+    """Returns the score of a game that the mover's last move finished, from the mover's point of view."""
+    mover_won = (game.get_game_state() == WHITE_WON) == (mover == WHITE)
+    return MATE_SCORE - ply if mover_won else -(MATE_SCORE - ply)
+
+
+def _score_to_table(score, ply):
+    """Converts a mate score to be relative to the position, so it can be reused at any ply."""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    """Converts a mate score stored with _score_to_table() back to be relative to the root."""
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+if __name__ == "__main__":
+    ChessVar(engine=Engine(time_limit=2.0), engine_color="Black", ponder=True)
@@ -0,0 +1,285 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: An append-only store of recorded games. Each game is a small header (move count and result) followed by
+#              its moves as 16-bit codes (see encode_move()), and a side index file holds the offset of every game,
+#              so any game can be read by its id. Appends take a file lock, so many processes can add games to one store,
+#              and reads go through mmap, so scanning a store copies nothing but the moves themselves.
+#              Run "python game_store.py import store.dat archive.txt", "python game_store.py selfplay store.dat [games]"
+#              or "python game_store.py scan store.dat".
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:
+    # Without fcntl (on Windows), appends are only safe from one process at a time
+    fcntl = None
+
+from ChessVar import UNFINISHED, WHITE_WON, BLACK_WON, encode_move, uci_to_move
+
+# The data file starts with a header (magic bytes, format version). Each game follows as a GAME_HEADER
+# (number of moves, result code, unused byte) and then its moves, two bytes each, little-endian.
+STORE_MAGIC = b"ATOMGAME"
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct("<8sI")
+GAME_HEADER = struct.Struct("<HBx")
+MAX_GAME_MOVES = 65535
+
+# The index file is the offset of each game in the data file, one little-endian 8-byte integer per game id.
+INDEX_EXTENSION = ".idx"
+INDEX_ENTRY = struct.Struct("<Q")
+
+# Result codes stored in the game headers, and the game state each stands for
+RESULT_STATES = (UNFINISHED, WHITE_WON, BLACK_WON)
+RESULT_CODES = {game_state: code for code, game_state in enumerate(RESULT_STATES)}
+
+# The moves are stored little-endian, so they are byte-swapped after reading on a big-endian machine
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+class StoredGame(namedtuple("StoredGame", ["game_id", "result", "moves"])):
+    """
+    Represents one game read from a GameStore: its id (counting from 0 in the order games were added),
+    its final game state, and an array of its moves, each packed by encode_move().
+    """
+    __slots__ = ()
+
+
+def move_codes(moves):
+    """
+    Returns an array("H") of moves packed by encode_move(). Moves may be given as text such as "e2e4",
+    as (home square, destination square) tuples, or already packed; an array("H") is returned as it is.
+    Raises ValueError for text that is not a move.
+    """
+    if isinstance(moves, array) and moves.typecode == "H":
+        return moves
+    codes = array("H")
+    for move in moves:
+        if isinstance(move, str):
+            move = uci_to_move(move)
+        codes.append(move if isinstance(move, int) else encode_move(move))
+    return codes
+
+
+class GameStore:
+    """
+    Represents a game store: a data file at path and its index at path + ".idx", created if they do not exist.
+    Games are only ever added at the end, so a game id always refers to the same game.
+    Other processes may add games at the same time, and each read sees every game added before it.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._data_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._index_fd = os.open(path + INDEX_EXTENSION, os.O_RDWR | os.O_CREAT, 0o644)
+        self._data_map = None
+        self._index_map = None
+        self._game_count = 0            # Number of games covered by the mapped files
+
+        with self._locked():
+            if os.lseek(self._data_fd, 0, os.SEEK_END) == 0:
+                os.write(self._data_fd, STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION))
+            os.lseek(self._data_fd, 0, os.SEEK_SET)
+            header = os.read(self._data_fd, STORE_HEADER.size).ljust(STORE_HEADER.size)
+        magic, version = STORE_HEADER.unpack(header)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a game store of version {STORE_VERSION}.")
+        self.refresh()
+
+    def __len__(self):
+        # Counted from the index file, so games added since the last refresh() are included
+        return os.fstat(self._index_fd).st_size // INDEX_ENTRY.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+    def close(self):
+        """Unmaps and closes the store's files."""
+        self._unmap()
+        if self._data_fd is not None:
+            os.close(self._data_fd)
+            os.close(self._index_fd)
+            self._data_fd = self._index_fd = None
+
+    def refresh(self):
+        """Maps the files again, so that games added since (by any process) can be read. Returns the number of games."""
+        self._unmap()
+        self._game_count = os.fstat(self._index_fd).st_size // INDEX_ENTRY.size
+        if self._game_count:
+            self._index_map = mmap.mmap(self._index_fd, self._game_count * INDEX_ENTRY.size, access=mmap.ACCESS_READ)
+            self._data_map = mmap.mmap(self._data_fd, 0, access=mmap.ACCESS_READ)
+        return self._game_count
+
+    # ---------------------------------- Appending ---------------------------------- #
+
+    def append_game(self, moves, result=UNFINISHED):
+        """Adds a game with the given moves (see move_codes()) and final game state, and returns its game id."""
+        return self.append_games(((moves, result),))[0]
+
+    def append_games(self, games):
+        """
+        Adds every (moves, result) pair of an iterable in one locked write, and returns the list of their game ids.
+        Batching many games into one call is much faster than adding them one at a time.
+        """
+        records = []
+        for moves, result in games:
+            codes = move_codes(moves)
+            if len(codes) > MAX_GAME_MOVES:
+                raise ValueError(f"A stored game can have at most {MAX_GAME_MOVES} moves, not {len(codes)}.")
+            if result not in RESULT_CODES:
+                raise ValueError(f"Unknown result {result!r}; expected one of {', '.join(RESULT_STATES)}.")
+            if _SWAP_BYTES:
+                codes = array("H", codes)
+                codes.byteswap()
+            records.append(GAME_HEADER.pack(len(codes), RESULT_CODES[result]) + codes.tobytes())
+        if not records:
+            return []
+
+        with self._locked():
+            # The games are written before their index entries, so readers never find an entry for a half-written game
+            offset = os.lseek(self._data_fd, 0, os.SEEK_END)
+            offsets = []
+            for record in records:
+                offsets.append(offset)
+                offset += len(record)
+            _write_all(self._data_fd, b"".join(records))
+
+            index_size = os.lseek(self._index_fd, 0, os.SEEK_END)
+            first_game_id = index_size // INDEX_ENTRY.size
+            try:
+                _write_all(self._index_fd, b"".join(INDEX_ENTRY.pack(offset) for offset in offsets))
+            except OSError:
+                # A partly written entry would shift every later one, so the index is cut back to its whole entries
+                os.ftruncate(self._index_fd, index_size)
+                raise
+        return list(range(first_game_id, first_game_id + len(records)))
+
+    def _locked(self):
+        """Returns a context manager that holds the store's write lock, shared by every process using the store."""
+        return _FileLock(self._data_fd)
+
+    # ---------------------------------- Reading ---------------------------------- #
+
+    def get_game(self, game_id):
+        """Returns the StoredGame with the given id. Raises IndexError if there is no such game."""
+        if game_id < 0 or game_id >= self._game_count and game_id >= self.refresh():
+            raise IndexError(f"There is no game {game_id} in {self._path}.")
+        offset = INDEX_ENTRY.unpack_from(self._index_map, game_id * INDEX_ENTRY.size)[0]
+        return self._read_game(game_id, offset)
+
+    def iter_games(self, first_game_id=0, last_game_id=None):
+        """
+        Yields a StoredGame for every game from first_game_id up to (not including) last_game_id,
+        or to the last game stored when the scan started. The scan maps the files for itself,
+        so games can be read or added while it runs.
+        """
+        game_count = os.fstat(self._index_fd).st_size // INDEX_ENTRY.size
+        last_game_id = game_count if last_game_id is None else min(last_game_id, game_count)
+        if first_game_id >= last_game_id:
+            return
+        with open(self._path + INDEX_EXTENSION, "rb") as index_file:
+            index = index_file.read(last_game_id * INDEX_ENTRY.size)[first_game_id * INDEX_ENTRY.size:]
+        with mmap.mmap(self._data_fd, 0, access=mmap.ACCESS_READ) as data_map:
+            read_game = self._read_game
+            for game_id, (offset,) in enumerate(INDEX_ENTRY.iter_unpack(index), first_game_id):
+                yield read_game(game_id, offset, data_map)
+
+    def _read_game(self, game_id, offset, data_map=None):
+        """Returns the StoredGame whose record starts at offset in the data file."""
+        if data_map is None:
+            data_map = self._data_map
+        move_count, result_code = GAME_HEADER.unpack_from(data_map, offset)
+        moves_start = offset + GAME_HEADER.size
+        moves = array("H")
+        moves.frombytes(data_map[moves_start:moves_start + 2 * move_count])
+        if _SWAP_BYTES:
+            moves.byteswap()
+        return StoredGame(game_id, RESULT_STATES[result_code], moves)
+
+    def _unmap(self):
+        """Unmaps the files, if they are mapped."""
+        if self._data_map is not None:
+            self._data_map.close()
+            self._index_map.close()
+            self._data_map = self._index_map = None
+
+
+def _write_all(file_descriptor, data):
+    """
+    Writes all of data at the file's current position. os.write() may write only part of a large buffer
+    (when the disk fills up or a signal arrives), so it is called until nothing is left; an error raises OSError.
+    """
+    view = memoryview(data)
+    while view:
+        written = os.write(file_descriptor, view)
+        if written <= 0:
+            raise OSError(f"Could not write {len(view)} bytes to the game store.")
+        view = view[written:]
+
+
+class _FileLock:
+    """Holds an exclusive lock on an open file (through flock) from entering a with block until leaving it."""
+
+    def __init__(self, file_descriptor):
+        self._file_descriptor = file_descriptor
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self._file_descriptor, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        if fcntl is not None:
+            fcntl.flock(self._file_descriptor, fcntl.LOCK_UN)
+
+
+if __name__ == "__main__":
+    # Usage: python game_store.py import store.dat archive.txt
+    #        python game_store.py selfplay store.dat [games] [policy]
+    #        python game_store.py scan store.dat
+    command, store_path = sys.argv[1], sys.argv[2]
+
+    with GameStore(store_path) as store:
+        if command == "import":
+            from replay import read_move_log
+            added = 0
+            batch = []
+            for archived_moves in read_move_log(sys.argv[3]):
+                batch.append((archived_moves, UNFINISHED))
+                if len(batch) == 1000:
+                    added += len(store.append_games(batch))
+                    batch = []
+            added += len(store.append_games(batch))
+            # Text archives do not record results, so the games are stored as unfinished
+            print(f"{added} games added to {store_path}")
+
+        elif command == "selfplay":
+            from selfplay import run_selfplay
+            requested_games = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+            requested_policy = sys.argv[4] if len(sys.argv) > 4 else "random"
+            for finished_batch in run_selfplay(requested_games, requested_policy, store_path=store_path):
+                pass
+            print(f"{requested_games} games added to {store_path}, which now has {len(store)}")
+
+        else:
+            start_time = time.perf_counter()
+            results = {game_state: 0 for game_state in RESULT_STATES}
+            total_moves = 0
+            for stored_game in store.iter_games():
+                results[stored_game.result] += 1
+                total_moves += len(stored_game.moves)
+            elapsed = time.perf_counter() - start_time
+            print(f"{len(store)} games, {total_moves} moves scanned in {elapsed:.2f} s "
+                  f"({total_moves / max(elapsed, 1e-9) * 60:,.0f} moves/minute)")
+            print(f"White won {results[WHITE_WON]}, Black won {results[BLACK_WON]}, unfinished {results[UNFINISHED]}")
@@ -0,0 +1,194 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Opt-in counters and timers for the phases of AtomicGame's move pipeline, and counts of rejected moves
+#              by error code. While disabled, AtomicGame runs its own methods untouched, so there is no overhead at all;
+#              enable() swaps in timed wrappers of those methods for every AtomicGame, and disable() puts the originals back.
+
+import functools
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import ChessVar
+from ChessVar import AtomicGame, ERROR_MESSAGES
+
+# Each timed phase, and the AtomicGame method that carries it out
+PHASES = (
+    ("parsing", "characters_are_invalid"),
+    ("bounds", "tile_squares"),
+    ("piece_moves", "piece_move_error"),
+    ("path", "path_is_blocked"),
+    ("explosion", "explode_surroundings"),
+    ("make_move", "_play_square_move"),     # Every move made by make_move() or apply_moves()
+)
+
+# Each timed phase carried out by a function of the ChessVar module rather than by an AtomicGame method
+FUNCTION_PHASES = (
+    ("move_lists", "parse_moves"),       # Reading the move lists of apply_moves() (MOVES and replays)
+)
+
+
+class PhaseStats(namedtuple("PhaseStats", ["calls", "seconds"])):
+    """Represents how many times a phase ran and the total time spent in it."""
+    __slots__ = ()
+
+
+class InstrumentationSnapshot(namedtuple("InstrumentationSnapshot", ["phases", "rejections", "elapsed"])):
+    """
+    Represents the totals at one moment: phases maps each phase name to its PhaseStats,
+    rejections maps each error code to the number of moves rejected for it,
+    and elapsed is the number of seconds the instrumentation has been enabled since the last reset.
+    """
+    __slots__ = ()
+
+
+class Instrumentation:
+    """
+    Represents the counters and timers of the move pipeline.
+    There is one shared instance, INSTRUMENTATION, since enabling it changes the AtomicGame class itself.
+    """
+
+    def __init__(self):
+        self._calls = {phase: 0 for phase, _ in PHASES + FUNCTION_PHASES}
+        self._times_ns = {phase: 0 for phase, _ in PHASES + FUNCTION_PHASES}
+        self._rejections = {error: 0 for error in ERROR_MESSAGES}
+        self._original_methods = {}
+        self._original_functions = {}
+        self._enabled_time_ns = 0       # Time enabled before the current period (since the last reset)
+        self._enabled_since_ns = None   # When the current period of being enabled started, or None if disabled
+        self._dump_stop = None          # Event that stops the periodic dump thread, or None if there is none
+
+    def is_enabled(self):
+        """Returns True if the move pipeline is being instrumented."""
+        return self._enabled_since_ns is not None
+
+    def enable(self):
+        """Starts counting and timing every AtomicGame's move pipeline."""
+        if self.is_enabled():
+            return
+        for phase, method_name in PHASES:
+            method = AtomicGame.__dict__[method_name]
+            self._original_methods[method_name] = method
+            setattr(AtomicGame, method_name, self._timed(phase, method))
+        # AtomicGame looks these functions up in the module each time it calls them, so replacing them there is enough
+        for phase, function_name in FUNCTION_PHASES:
+            function = getattr(ChessVar, function_name)
+            self._original_functions[function_name] = function
+            setattr(ChessVar, function_name, self._timed(phase, function))
+
+        reject = AtomicGame.__dict__["_reject"]
+        self._original_methods["_reject"] = reject
+        setattr(AtomicGame, "_reject", self._counted_reject(reject))
+        self._enabled_since_ns = time.perf_counter_ns()
+
+    def disable(self):
+        """Stops instrumenting, so AtomicGame runs its own methods again. The totals are kept."""
+        if not self.is_enabled():
+            return
+        for method_name, method in self._original_methods.items():
+            setattr(AtomicGame, method_name, method)
+        self._original_methods.clear()
+        for function_name, function in self._original_functions.items():
+            setattr(ChessVar, function_name, function)
+        self._original_functions.clear()
+        self._enabled_time_ns += time.perf_counter_ns() - self._enabled_since_ns
+        self._enabled_since_ns = None
+
+    def reset(self):
+        """Sets every total back to zero."""
+        for phase in self._calls:
+            self._calls[phase] = 0
+            self._times_ns[phase] = 0
+        for error in self._rejections:
+            self._rejections[error] = 0
+        self._enabled_time_ns = 0
+        if self.is_enabled():
+            self._enabled_since_ns = time.perf_counter_ns()
+
+    def snapshot(self):
+        """Returns an InstrumentationSnapshot of the totals so far."""
+        elapsed_ns = self._enabled_time_ns
+        if self.is_enabled():
+            elapsed_ns += time.perf_counter_ns() - self._enabled_since_ns
+        phases = {phase: PhaseStats(self._calls[phase], self._times_ns[phase] / 1e9) for phase in self._calls}
+        return InstrumentationSnapshot(phases, dict(self._rejections), elapsed_ns / 1e9)
+
+    def format_snapshot(self, snapshot=None):
+        """Returns a snapshot (a new one by default) as lines of text for a log."""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        lines = [f"Move pipeline over {snapshot.elapsed:.1f} s:"]
+        for phase, stats in snapshot.phases.items():
+            mean_us = stats.seconds / stats.calls * 1e6 if stats.calls else 0.0
+            lines.append(f"  {phase:<12} {stats.calls:>10} calls {stats.seconds * 1000:>10.1f} ms {mean_us:>8.2f} us/call")
+        rejected = [(error, count) for error, count in snapshot.rejections.items() if count]
+        lines.append(f"  rejected moves: {sum(count for _, count in rejected)}")
+        for error, count in rejected:
+            lines.append(f"    {count:>10}  {ERROR_MESSAGES[error]} (error {error})")
+        return "\n".join(lines)
+
+    def start_periodic_dump(self, interval=60.0, stream=None):
+        """Writes format_snapshot() to a stream (standard error by default) every interval seconds, from a background thread."""
+        self.stop_periodic_dump()
+        stop = threading.Event()
+
+        def dump_until_stopped():
+            while not stop.wait(interval):
+                output = stream or sys.stderr
+                output.write(self.format_snapshot() + "\n")
+                output.flush()
+
+        self._dump_stop = stop
+        threading.Thread(target=dump_until_stopped, name="instrumentation-dump", daemon=True).start()
+
+    def stop_periodic_dump(self):
+        """Stops the periodic dump, if there is one."""
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+
+    def _timed(self, phase, method):
+        """Returns a version of an AtomicGame method that counts and times its calls under a phase name."""
+        calls, times_ns, clock = self._calls, self._times_ns, time.perf_counter_ns
+
+        @functools.wraps(method)
+        def timed_method(*arguments):
+            start_ns = clock()
+            try:
+                return method(*arguments)
+            finally:
+                times_ns[phase] += clock() - start_ns
+                calls[phase] += 1
+
+        return timed_method
+
+    def _counted_reject(self, reject):
+        """Returns a version of AtomicGame._reject() that counts rejections by error code."""
+        rejections = self._rejections
+
+        @functools.wraps(reject)
+        def counted_reject(game, error):
+            rejections[error] += 1
+            return reject(game, error)
+
+        return counted_reject
+
+
+INSTRUMENTATION = Instrumentation()
+
+
+def enable():
+    """Starts instrumenting the move pipeline (see Instrumentation.enable())."""
+    INSTRUMENTATION.enable()
+
+
+def disable():
+    """Stops instrumenting the move pipeline (see Instrumentation.disable())."""
+    INSTRUMENTATION.disable()
+
+
+def snapshot():
+    """Returns an InstrumentationSnapshot of the totals so far."""
+    return INSTRUMENTATION.snapshot()
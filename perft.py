@@ -0,0 +1,93 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: A perft suite for AtomicGame. Each reference position is played out to a fixed depth,
+#              and the number of leaf positions is compared with the expected count and timed.
+#              Run "python perft.py [max depth] [position name]" to check the rules engine after changing it.
+
+import sys
+import time
+
+from ChessVar import AtomicGame
+
+# Each reference position is (name, description, moves played from the starting position, expected counts),
+# where expected counts[n] is the perft count at depth n + 1.
+PERFT_POSITIONS = [
+    ("start", "The standard starting position",
+     "",
+     (20, 400, 8902, 197779, 4895433)),
+    ("open-centre", "Open centre with both sides' pieces developed into each other's blast zones",
+     "e2e4 d7d5 g1f3 b8c6 f1b5 g8f6 b1c3 e7e5",
+     (33, 1191, 39400, 1441189)),
+    ("queens-out", "Both queens out early, so most lines contain several explosions",
+     "e2e4 e7e5 d1h5 d8g5 f1c4 f8c5 b1c3 b8c6",
+     (45, 1963, 79649, 3245542)),
+    ("king-hunt", "White can blow up the black king on f7 straight away",
+     "e2e4 e7e5 d1h5 b8c6 f1c4 g8f6",
+     (43, 1157, 46214, 1315205)),
+    ("connected-kings", "Touching kings: capturing the white king would also blow up the black king, so it is not allowed",
+     "e2e4 d7d5 e1e2 e8d7 e2e3 d7d6 e3f4 d6e6 f4f5 g7g6 d2d3",
+     (27, 984, 26947, 976525)),
+]
+
+# Positions are checked up to this depth unless asked otherwise, so the suite finishes in seconds.
+DEFAULT_MAX_DEPTH = 3
+
+
+def load_position(moves):
+    """Returns a new AtomicGame with the given space-separated moves (such as "e2e4 e7e5") played from the start."""
+    game = AtomicGame()
+    for move in moves.split():
+        result = game.make_move(move[:2], move[2:])
+        if not result.success:
+            raise ValueError(f"Move {move} is not legal in the perft position.")
+    return game
+
+
+def run_suite(max_depth=DEFAULT_MAX_DEPTH, names=None, stream=sys.stdout):
+    """
+    Runs perft on every reference position (or only those named) up to max_depth,
+    writing the expected and actual node counts and the nodes per second to stream.
+    Returns True if every count matched.
+    """
+    all_passed = True
+    total_nodes = 0
+    total_time = 0.0
+
+    for name, description, moves, expected_counts in PERFT_POSITIONS:
+        if names and name not in names:
+            continue
+
+        stream.write(f"{name}: {description}\n")
+        game = load_position(moves)
+
+        for depth in range(1, min(max_depth, len(expected_counts)) + 1):
+            start_time = time.perf_counter()
+            nodes = game.perft(depth)
+            elapsed = time.perf_counter() - start_time
+            total_nodes += nodes
+            total_time += elapsed
+
+            passed = nodes == expected_counts[depth - 1]
+            all_passed = all_passed and passed
+            nodes_per_second = nodes / elapsed if elapsed > 0 else float("inf")
+            stream.write(f"  depth {depth}: expected {expected_counts[depth - 1]:>10}  got {nodes:>10}  "
+                         f"{'ok  ' if passed else 'FAIL'}  {nodes_per_second:>12,.0f} nodes/s\n")
+
+    if total_time > 0:
+        stream.write(f"{total_nodes} nodes in {total_time:.2f} s ({total_nodes / total_time:,.0f} nodes/s)\n")
+    stream.write("All counts match.\n" if all_passed else "Some counts do not match!\n")
+    return all_passed
+
+
+def divide(moves, depth, stream=sys.stdout):
+    """Writes the perft count below each legal move of a position, to find which move a wrong count comes from."""
+    counts = load_position(moves).perft_divide(depth)
+    for move in sorted(counts):
+        stream.write(f"{move}: {counts[move]}\n")
+    stream.write(f"Total: {sum(counts.values())}\n")
+
+
+if __name__ == "__main__":
+    depth_argument = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MAX_DEPTH
+    sys.exit(0 if run_suite(depth_argument, sys.argv[2:]) else 1)
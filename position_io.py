@@ -0,0 +1,75 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Reads and writes many AtomicGame positions at once, either as FEN-like text (one position per line)
+#              or as back-to-back fixed-size binary records (see AtomicGame.to_bytes() and POSITION_STRUCT).
+
+from ChessVar import AtomicGame, POSITION_STRUCT
+
+RECORD_SIZE = POSITION_STRUCT.size
+
+
+def dump_positions(games, stream):
+    """Writes the binary record of each game's position to a binary stream, and returns how many were written."""
+    count = 0
+    write = stream.write
+    for game in games:
+        write(game.to_bytes())
+        count += 1
+    return count
+
+
+def dumps_positions(games):
+    """Returns the binary records of every game's position joined into one bytes object."""
+    return b"".join(game.to_bytes() for game in games)
+
+
+def iter_position_records(data):
+    """
+    Yields the unpacked (occupied, packed pieces, unmoved pawns, turn) tuples of the binary records in data,
+    without building any games. Useful when only a few of the positions will be looked at.
+    """
+    if len(data) % RECORD_SIZE:
+        raise ValueError(f"Position data must be a multiple of {RECORD_SIZE} bytes long.")
+    return POSITION_STRUCT.iter_unpack(data)
+
+
+def load_positions(data):
+    """Yields a new AtomicGame for each binary record in data (bytes, bytearray or memoryview)."""
+    if len(data) % RECORD_SIZE:
+        raise ValueError(f"Position data must be a multiple of {RECORD_SIZE} bytes long.")
+
+    view = memoryview(data)
+    for offset in range(0, len(view), RECORD_SIZE):
+        yield AtomicGame.from_bytes(view[offset:offset + RECORD_SIZE])
+
+
+def read_positions(path):
+    """Yields an AtomicGame for each binary record in the file at path."""
+    with open(path, "rb") as position_file:
+        data = position_file.read()
+    yield from load_positions(data)
+
+
+def write_positions(games, path):
+    """Writes the binary record of each game's position to the file at path, and returns how many were written."""
+    with open(path, "wb") as position_file:
+        return dump_positions(games, position_file)
+
+
+def read_fen_file(path):
+    """Yields an AtomicGame for each non-blank line of a text file of FEN-like positions."""
+    with open(path, encoding="utf-8") as fen_file:
+        for line in fen_file:
+            if line.strip():
+                yield AtomicGame(line)
+
+
+def write_fen_file(games, path):
+    """Writes each game's position to a text file, one FEN-like position per line, and returns how many were written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as fen_file:
+        for game in games:
+            fen_file.write(game.to_fen() + "\n")
+            count += 1
+    return count
@@ -0,0 +1,111 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Replays archives of recorded games through the rules of AtomicGame without printing anything.
+#              Games are read and replayed one at a time, so an archive of any size is replayed in constant memory.
+#              Run "python replay.py archive.txt" to check every game of an archive and print a summary.
+
+import sys
+import time
+from collections import namedtuple
+
+from ChessVar import AtomicGame, COLOR_NAMES, WHITE, BLACK, WHITE_WON, BLACK_WON, UNFINISHED, MOVE_OK, ERROR_MESSAGES
+
+
+class ReplayResult(namedtuple("ReplayResult", ["game_index", "game_state", "winner", "moves_played",
+                                               "first_illegal_move", "error", "white_exploded", "black_exploded"])):
+    """
+    Represents the outcome of replaying one recorded game.
+    game_index counts the games of the archive from 0, and winner is "White", "Black" or None.
+    first_illegal_move is the index of the first move that was rejected (None if every move was legal),
+    and error is its error code (see ERROR_MESSAGES). Replaying stops at the first illegal move.
+    white_exploded and black_exploded count the pieces of each color removed by explosions,
+    including the capturing pieces.
+    """
+    __slots__ = ()
+
+
+def read_move_log(path):
+    """
+    Yields the moves of each game in a text archive, one game per line, as lists of moves such as "e2e4".
+    Blank lines are skipped. Only one line is held in memory at a time.
+    """
+    with open(path, encoding="utf-8") as archive:
+        for line in archive:
+            moves = line.split()
+            if moves:
+                yield moves
+
+
+def replay_game(game, moves, game_index=0):
+    """
+    Plays a recorded game's moves on game from its current position and returns a ReplayResult.
+    Moves may be given as text such as "e2e4", as (home square, destination square) tuples,
+    or as integers packed by encode_move().
+    """
+    white_pieces = game.get_occupancy(WHITE).bit_count()
+    black_pieces = game.get_occupancy(BLACK).bit_count()
+
+    # Replaying stops at the first illegal move, which is then the last result
+    results = game.apply_moves(moves)
+    moves_played = len(results)
+    first_illegal_move = error = None
+    if results and results[-1] != MOVE_OK:
+        moves_played -= 1
+        first_illegal_move, error = moves_played, results[-1]
+
+    # Only explosions remove pieces, so every piece missing at the end was exploded
+    white_exploded = white_pieces - game.get_occupancy(WHITE).bit_count()
+    black_exploded = black_pieces - game.get_occupancy(BLACK).bit_count()
+
+    game_state = game.get_game_state()
+    if game_state == WHITE_WON:
+        winner = COLOR_NAMES[WHITE]
+    elif game_state == BLACK_WON:
+        winner = COLOR_NAMES[BLACK]
+    else:
+        winner = None
+
+    return ReplayResult(game_index, game_state, winner, moves_played, first_illegal_move, error,
+                        white_exploded, black_exploded)
+
+
+def replay_games(move_lists):
+    """
+    Yields a ReplayResult for each game in an iterable of move lists (such as read_move_log()),
+    with every game played from the starting position.
+    One AtomicGame is reset and reused for every game, so memory use does not grow with the number of games.
+    """
+    game = AtomicGame()
+    start_position = game.to_bytes()
+    for game_index, moves in enumerate(move_lists):
+        game.set_bytes(start_position)
+        yield replay_game(game, moves, game_index)
+
+
+def replay_file(path):
+    """Yields a ReplayResult for each game in a text archive (see read_move_log())."""
+    return replay_games(read_move_log(path))
+
+
+if __name__ == "__main__":
+    # Usage: python replay.py archive.txt
+    results = {WHITE_WON: 0, BLACK_WON: 0, UNFINISHED: 0}
+    illegal_games = 0
+    total_moves = 0
+    start_time = time.perf_counter()
+
+    for replayed in replay_file(sys.argv[1]):
+        results[replayed.game_state] += 1
+        total_moves += replayed.moves_played
+        if replayed.first_illegal_move is not None:
+            illegal_games += 1
+            print(f"Game {replayed.game_index}: move {replayed.first_illegal_move + 1} is illegal "
+                  f"({ERROR_MESSAGES[replayed.error]})")
+    elapsed = time.perf_counter() - start_time
+
+    game_total = sum(results.values())
+    print(f"{game_total} games, {total_moves} moves in {elapsed:.2f} s "
+          f"({total_moves / elapsed if elapsed > 0 else 0:,.0f} moves/s)")
+    print(f"White won {results[WHITE_WON]}, Black won {results[BLACK_WON]}, unfinished {results[UNFINISHED]}, "
+          f"{illegal_games} with illegal moves")
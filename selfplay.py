@@ -0,0 +1,153 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Plays complete atomic chess games against itself, spread across every core with a process pool.
+#              Moves are chosen at random, at random weighted toward good captures, or by the engine.
+#              Every game has its own seed, so any game can be played again exactly.
+
+import os
+import random
+import sys
+import time
+from array import array
+from collections import namedtuple
+from multiprocessing import Pool
+
+from ChessVar import AtomicGame, BIT, UNFINISHED, WHITE_WON, BLACK_WON, encode_move
+from engine import Engine, MATE_SCORE
+from game_store import GameStore
+
+POLICIES = ("random", "weighted", "engine")
+
+# Games still going after this many moves (counting both players) are stopped and left unfinished.
+DEFAULT_MAX_PLIES = 300
+
+
+class GameRecord(namedtuple("GameRecord", ["game_id", "seed", "policy", "result", "moves"])):
+    """
+    Represents one finished self-play game.
+    result is the final game state (UNFINISHED if the move limit was reached or a player had no legal moves),
+    and moves is an array of the moves played, each packed by encode_move().
+    """
+    __slots__ = ()
+
+
+# Each worker process keeps its own engine, so its transposition table is only allocated once,
+# and its own handle on the game store its games are added to (if any).
+_worker_engine = None
+_worker_store = None
+
+
+def _start_worker(engine_depth, engine_nodes, tt_size_mb, store_path=None):
+    """Sets up a worker process of the pool."""
+    global _worker_engine, _worker_store
+    _worker_engine = Engine(tt_size_mb=tt_size_mb, max_depth=engine_depth, node_limit=engine_nodes)
+    _worker_store = GameStore(store_path) if store_path is not None else None
+
+
+def game_seed(base_seed, game_id):
+    """Returns the seed of a game, so that the same base seed and game id always play the same game."""
+    return f"{base_seed}:{game_id}"
+
+
+def choose_weighted_move(game, moves, rng):
+    """
+    Returns a random move, where captures are more likely the more enemy material they blow up,
+    and a capture that blows up the enemy king is almost always chosen.
+    """
+    enemy_pieces = game.get_occupancy(game.get_turn() ^ 1)
+    weights = []
+    for move in moves:
+        if enemy_pieces & BIT[move[1]]:
+            score = game.capture_value(move)
+            if score >= MATE_SCORE // 2:
+                weights.append(1000.0)
+            else:
+                weights.append(1.0 + max(score, 0) / 100)
+        else:
+            weights.append(1.0)
+    return rng.choices(moves, weights)[0]
+
+
+def play_game(game_id, base_seed=0, policy="random", max_plies=DEFAULT_MAX_PLIES, random_opening_plies=4,
+              engine=None):
+    """
+    Plays one game with no output and returns its GameRecord.
+    With the "engine" policy, the first random_opening_plies moves are random so that games differ.
+    """
+    seed = game_seed(base_seed, game_id)
+    rng = random.Random(seed)
+    game = AtomicGame()
+    moves_played = array("H")
+
+    if policy == "engine":
+        if engine is None:
+            engine = _worker_engine or Engine(max_depth=2)
+        # Start every game from an empty table, so a game plays the same whichever worker plays it
+        engine.get_transposition_table().clear()
+
+    while len(moves_played) < max_plies and game.get_game_state() == UNFINISHED:
+        moves = game.generate_legal_moves()
+        if not moves:
+            break
+
+        if policy == "random" or (policy == "engine" and len(moves_played) < random_opening_plies):
+            move = rng.choice(moves)
+        elif policy == "weighted":
+            move = choose_weighted_move(game, moves, rng)
+        else:
+            move = engine.choose_move(game)
+
+        game.push(move)
+        moves_played.append(encode_move(move))
+
+    return GameRecord(game_id, seed, policy, game.get_game_state(), moves_played)
+
+
+def _play_batch(batch):
+    """Plays a batch of games in a worker process and returns their GameRecords, adding them to the worker's game store if any."""
+    first_game_id, game_count, base_seed, policy, max_plies = batch
+    records = [play_game(game_id, base_seed, policy, max_plies)
+               for game_id in range(first_game_id, first_game_id + game_count)]
+    if _worker_store is not None:
+        _worker_store.append_games((record.moves, record.result) for record in records)
+    return records
+
+
+def run_selfplay(game_count, policy="random", processes=None, batch_size=32, base_seed=0,
+                 max_plies=DEFAULT_MAX_PLIES, engine_depth=2, engine_nodes=None, tt_size_mb=4, store_path=None):
+    """
+    Plays game_count games across a pool of processes (one per core by default),
+    and yields lists of GameRecords as each batch of up to batch_size games is finished.
+    Batches may finish out of order; each record carries its game id and seed.
+    With store_path, each worker also adds its games to the game_store.GameStore at that path as it finishes them.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {', '.join(POLICIES)}.")
+
+    batches = [(first_game_id, min(batch_size, game_count - first_game_id), base_seed, policy, max_plies)
+               for first_game_id in range(0, game_count, batch_size)]
+
+    with Pool(processes or os.cpu_count(), initializer=_start_worker,
+              initargs=(engine_depth, engine_nodes, tt_size_mb, store_path)) as pool:
+        for records in pool.imap_unordered(_play_batch, batches):
+            yield records
+
+
+if __name__ == "__main__":
+    # Usage: python selfplay.py [number of games] [policy]
+    requested_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    requested_policy = sys.argv[2] if len(sys.argv) > 2 else "random"
+
+    results = {WHITE_WON: 0, BLACK_WON: 0, UNFINISHED: 0}
+    total_plies = 0
+    start_time = time.perf_counter()
+    for finished_batch in run_selfplay(requested_games, requested_policy):
+        for record in finished_batch:
+            results[record.result] += 1
+            total_plies += len(record.moves)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{requested_games} games in {elapsed:.2f} s ({requested_games / elapsed:,.0f} games/s, "
+          f"{total_plies / elapsed:,.0f} moves/s)")
+    print(f"White won {results[WHITE_WON]}, Black won {results[BLACK_WON]}, unfinished {results[UNFINISHED]}")
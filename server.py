@@ -0,0 +1,307 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Hosts many atomic chess games at once in a single asyncio event loop, over TCP or a Unix socket.
+#              Clients send one command per line and get one response line back (see PROTOCOL below).
+#              Run "python server.py [port]" for TCP, or "python server.py unix:/path/to/socket".
+
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+
+from ChessVar import AtomicGame, WHITE, BLACK, KING, WHITE_WON, MOVE_OK, ERROR_MESSAGES
+
+PROTOCOL = """
+Commands (one per line, words separated by spaces; game ids are numbers given out by NEW):
+  NEW [fen]              Starts a game, from a FEN-like position if given.   -> OK <game id>
+  MOVE <game id> <move>  Makes a move such as e2e4.                          -> OK <state> <whose turn> <exploded tiles or ->
+                                                                                or ILLEGAL <error code> <message>
+  MOVES <game id> <move> <move> ...
+                         Makes several moves, stopping at an illegal one.     -> OK <state> <whose turn> <moves made>
+                                                                                or ILLEGAL <moves made> <error code> <message>
+  STATE <game id>        Describes a game.                                    -> OK <state> <whose turn> <fen>
+  RESIGN <game id>       The player whose turn it is resigns.                 -> OK <state>
+  STATS [game id]        Move latency of one game, or of the whole server.    -> OK <name>=<value> ...
+                         moves counts every move tried (each move of a MOVES batch), mean_us is per move,
+                         and max_us is the slowest move (a batch counts as its mean per move).
+  QUIT                   Closes the connection.                               -> OK bye
+Any other problem is answered with ERR <message>.
+"""
+
+DEFAULT_PORT = 7117
+
+# Games that have not been touched recently are packed into 33-byte position records (see AtomicGame.to_bytes())
+# until their next command. This many games are kept unpacked.
+DEFAULT_ACTIVE_LIMIT = 1024
+
+# How many connections may wait to be accepted at once, so that thousands of clients can connect together
+CONNECTION_BACKLOG = 4096
+
+
+class ProtocolError(Exception):
+    """Raised for a command the server cannot carry out. The message is sent back to the client."""
+
+
+class GameSession:
+    """
+    Represents one hosted game: either an AtomicGame (while it is active) or its packed position record (while it is idle),
+    along with its game state and how long its moves have taken to handle.
+    The state is kept here because a packed position cannot tell a resigned game from one still being played.
+    """
+
+    __slots__ = ("game", "packed_position", "game_state", "move_count", "total_latency_ns", "max_latency_ns")
+
+    def __init__(self, game):
+        self.game = game
+        self.packed_position = None
+        self.game_state = game.get_game_state()
+        self.move_count = 0
+        self.total_latency_ns = 0
+        self.max_latency_ns = 0
+
+
+class GameServer:
+    """
+    Represents a server hosting any number of AtomicGames. handle_line() carries out one command and returns the response,
+    and serve_tcp() or serve_unix() answers clients with it. Every command is handled without blocking,
+    so one event loop serves all connections and games.
+    """
+
+    def __init__(self, active_limit=DEFAULT_ACTIVE_LIMIT):
+        self._sessions = {}
+        self._active = OrderedDict()        # Game ids of the unpacked games, least recently used first
+        self._active_limit = active_limit
+        self._next_game_id = 1
+        self._move_count = 0
+        self._total_latency_ns = 0
+        self._max_latency_ns = 0
+        self._commands = {
+            "NEW": self._new_game,
+            "MOVE": self._move,
+            "MOVES": self._moves,
+            "STATE": self._state,
+            "RESIGN": self._resign,
+            "STATS": self._stats,
+        }
+
+    def get_game_count(self):
+        """Returns the number of games hosted."""
+        return len(self._sessions)
+
+    def get_active_count(self):
+        """Returns the number of games currently unpacked."""
+        return len(self._active)
+
+    def handle_line(self, line):
+        """Carries out one command line and returns the response line (without a line ending)."""
+        words = line.split()
+        if not words:
+            return "ERR Empty command."
+        handler = self._commands.get(words[0].upper())
+        if handler is None:
+            return f"ERR Unknown command {words[0]!r}."
+        try:
+            return handler(words[1:])
+        except (ProtocolError, ValueError) as error:
+            # A ValueError means input the game could not read, which the client can correct like any other error
+            return f"ERR {error}"
+
+    # ---------------------------------- Commands ---------------------------------- #
+
+    def _new_game(self, arguments):
+        """
+        Starts a game and returns its id. The position must have one king of each color,
+        and must fit in a packed position record (set_fen() rejects any position that does not).
+        """
+        try:
+            game = AtomicGame(" ".join(arguments) if arguments else None)
+        except ValueError as error:
+            raise ProtocolError(error)
+        if not game.get_bitboard(WHITE, KING) or not game.get_bitboard(BLACK, KING):
+            raise ProtocolError("A game must start with one king of each color.")
+
+        game_id = self._next_game_id
+        self._next_game_id += 1
+        self._sessions[game_id] = GameSession(game)
+        self._mark_active(game_id)
+        return f"OK {game_id}"
+
+    def _move(self, arguments):
+        """Makes a move in a game."""
+        if len(arguments) != 2:
+            raise ProtocolError("Expected MOVE <game id> <move>.")
+        start_time = time.perf_counter_ns()
+        game_id, session = self._find_session(arguments[0])
+        game = self._unpack(game_id, session)
+
+        move = arguments[1]
+        result = game.make_move(move[:2], move[2:])
+        if result.success:
+            session.game_state = result.game_state
+            exploded = ",".join(sorted(result.exploded)) or "-"
+            response = f"OK {result.game_state} {game.get_whose_turn()} {exploded}"
+        else:
+            response = f"ILLEGAL {result.error} {ERROR_MESSAGES[result.error]}"
+
+        self._record_latency(session, time.perf_counter_ns() - start_time)
+        return response
+
+    def _moves(self, arguments):
+        """Makes a list of moves in a game in one batch, stopping at the first illegal move."""
+        if len(arguments) < 2:
+            raise ProtocolError("Expected MOVES <game id> <move> <move> ...")
+        start_time = time.perf_counter_ns()
+        game_id, session = self._find_session(arguments[0])
+        game = self._unpack(game_id, session)
+
+        results = game.apply_moves(arguments[1:])
+        moves_made = len(results)
+        session.game_state = game.get_game_state()
+        if results[-1] == MOVE_OK:
+            response = f"OK {session.game_state} {game.get_whose_turn()} {moves_made}"
+        else:
+            moves_made -= 1
+            response = f"ILLEGAL {moves_made} {results[-1]} {ERROR_MESSAGES[results[-1]]}"
+
+        self._record_latency(session, time.perf_counter_ns() - start_time, len(results))
+        return response
+
+    def _state(self, arguments):
+        """Describes a game."""
+        if len(arguments) != 1:
+            raise ProtocolError("Expected STATE <game id>.")
+        game_id, session = self._find_session(arguments[0])
+        game = self._unpack(game_id, session)
+        return f"OK {session.game_state} {game.get_whose_turn()} {game.to_fen()}"
+
+    def _resign(self, arguments):
+        """Has the player whose turn it is resign."""
+        if len(arguments) != 1:
+            raise ProtocolError("Expected RESIGN <game id>.")
+        game_id, session = self._find_session(arguments[0])
+        game = self._unpack(game_id, session)
+        if not game.resign():
+            raise ProtocolError("Game has ended.")
+        session.game_state = game.get_game_state()
+        return f"OK {session.game_state}"
+
+    def _stats(self, arguments):
+        """Reports the move latency of one game, or of every game together."""
+        if len(arguments) > 1:
+            raise ProtocolError("Expected STATS [game id].")
+        if arguments:
+            _, session = self._find_session(arguments[0])
+            move_count, total_latency_ns, max_latency_ns = \
+                session.move_count, session.total_latency_ns, session.max_latency_ns
+            prefix = ""
+        else:
+            move_count, total_latency_ns, max_latency_ns = \
+                self._move_count, self._total_latency_ns, self._max_latency_ns
+            prefix = f"games={len(self._sessions)} active={len(self._active)} "
+
+        mean_latency_us = total_latency_ns / move_count / 1000 if move_count else 0.0
+        return (f"OK {prefix}moves={move_count} mean_us={mean_latency_us:.1f} "
+                f"max_us={max_latency_ns / 1000:.1f}")
+
+    # ---------------------------------- Sessions ---------------------------------- #
+
+    def _find_session(self, game_id_text):
+        """Returns the (game id, GameSession) of a game id sent by a client."""
+        try:
+            game_id = int(game_id_text)
+        except ValueError:
+            raise ProtocolError(f"Game id {game_id_text!r} is not a number.")
+        session = self._sessions.get(game_id)
+        if session is None:
+            raise ProtocolError(f"Unknown game {game_id}.")
+        return game_id, session
+
+    def _unpack(self, game_id, session):
+        """Returns the AtomicGame of a session, unpacking it if it was idle."""
+        if session.game is None:
+            game = AtomicGame.from_bytes(session.packed_position)
+            if session.game_state != game.get_game_state():
+                # A resigned game still has both kings, so its result only survives in the session
+                game.declare_winner(WHITE if session.game_state == WHITE_WON else BLACK)
+            session.game = game
+            session.packed_position = None
+        self._mark_active(game_id)
+        return session.game
+
+    def _mark_active(self, game_id):
+        """Marks a game as the most recently used, and packs the least recently used games beyond the active limit."""
+        self._active[game_id] = None
+        self._active.move_to_end(game_id)
+        while len(self._active) > self._active_limit:
+            idle_game_id = next(iter(self._active))
+            idle_session = self._sessions[idle_game_id]
+            # The game is packed before it leaves the active list, so a failure leaves the session as it was
+            idle_session.packed_position = idle_session.game.to_bytes()
+            idle_session.game = None
+            del self._active[idle_game_id]
+
+    def _record_latency(self, session, latency_ns, move_count=1):
+        """
+        Adds the time taken to handle one or more moves (tried in one command) to the game's and the server's statistics.
+        The slowest move of a batch is not known, so the batch's mean time per move counts toward the maximum.
+        """
+        move_latency_ns = latency_ns // move_count
+        session.move_count += move_count
+        session.total_latency_ns += latency_ns
+        session.max_latency_ns = max(session.max_latency_ns, move_latency_ns)
+        self._move_count += move_count
+        self._total_latency_ns += latency_ns
+        self._max_latency_ns = max(self._max_latency_ns, move_latency_ns)
+
+    # ---------------------------------- Networking ---------------------------------- #
+
+    async def handle_connection(self, reader, writer):
+        """Answers the command lines of one client until it sends QUIT or disconnects."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # The line went past the reader's limit; what was read of it is dropped, and the client may go on
+                    writer.write(b"ERR Line too long.\n")
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                command = line.decode("utf-8", errors="replace").strip()
+                if command.upper() == "QUIT":
+                    writer.write(b"OK bye\n")
+                    break
+                writer.write(self.handle_line(command).encode("utf-8") + b"\n")
+                await writer.drain()
+        except OSError:
+            # The client went away; its games stay on the server
+            pass
+        finally:
+            writer.close()
+
+    async def serve_tcp(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Serves clients over TCP until cancelled."""
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=CONNECTION_BACKLOG)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_unix(self, path):
+        """Serves clients over a Unix socket until cancelled."""
+        server = await asyncio.start_unix_server(self.handle_connection, path, backlog=CONNECTION_BACKLOG)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    # Usage: python server.py [port | unix:/path/to/socket]
+    address = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_PORT)
+    game_server = GameServer()
+    try:
+        if address.startswith("unix:"):
+            asyncio.run(game_server.serve_unix(address[len("unix:"):]))
+        else:
+            asyncio.run(game_server.serve_tcp(port=int(address)))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,523 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Endgame tablebases for atomic chess positions without pawns, built by retrograde analysis.
+#              Every position of a material signature (such as "KQvK") gets a win, draw or loss value for the player to move,
+#              with the number of moves (plies) until a king is blown up. Tables are written one file per signature,
+#              probed through mmap, and built in parallel across cores, smaller signatures first.
+#              Run "python tablebase.py build directory [max pieces]" or "python tablebase.py probe directory fen".
+
+import itertools
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+from multiprocessing import Pool
+
+from ChessVar import AtomicGame, WHITE, BLACK, WHITE_WON, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, BIT, BLAST_MASKS, \
+    KNIGHT_ATTACKS, KING_ATTACKS, BISHOP_DIRECTIONS, ROOK_DIRECTIONS, QUEEN_DIRECTIONS, sliding_attacks, iter_squares
+
+# A table file is a header (magic bytes, format version, signature) followed by one value byte per index.
+TABLE_MAGIC = b"ATOMTB\r\n"
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct("<8sI16s")
+TABLE_EXTENSION = ".atb"
+
+# Value bytes, from the point of view of the player to move. 0 marks an index that is not a position.
+# Wins and losses carry the number of plies until a king is blown up, capped at MAX_DISTANCE:
+# a larger distance is stored as MAX_DISTANCE, so the result stays right but the distance becomes a lower bound.
+DRAW_VALUE = 1
+WIN_VALUE_BASE = 1          # WIN_VALUE_BASE + distance (1 to MAX_DISTANCE)
+LOSS_VALUE_BASE = 128       # LOSS_VALUE_BASE + distance (1 to MAX_DISTANCE)
+MAX_DISTANCE = 127
+
+# Outcomes for the player to move
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+# Tables are built up to this many pieces (kings included) unless asked otherwise.
+# Each extra piece multiplies the work by 64, so pure Python builds are practical up to 4 pieces.
+DEFAULT_MAX_PIECES = 3
+
+# Pieces are listed white first, then black, each side with its king first and then from most to least valuable
+SIGNATURE_TYPE_ORDER = (KING, QUEEN, ROOK, BISHOP, KNIGHT)
+SIGNATURE_LETTERS = {KING: "K", QUEEN: "Q", ROOK: "R", BISHOP: "B", KNIGHT: "N"}
+
+
+class TablebaseResult(namedtuple("TablebaseResult", ["outcome", "distance"])):
+    """
+    Represents a tablebase value: outcome is WIN, DRAW or LOSS for the player to move,
+    and distance is the number of plies until the losing king is blown up (None for a draw).
+    """
+    __slots__ = ()
+
+
+# ------------------------------ Symmetry ------------------------------ #
+# Without pawns the rules look the same after turning or mirroring the board, so each position is stored once for
+# all 8 of its symmetric copies: the first white king is always put in the a1-d1-d4 triangle.
+
+def _build_transforms():
+    """Returns, for each of the 8 symmetries of the board, the square each square is moved to."""
+    transforms = []
+    for swap, flip_column, flip_row in itertools.product((False, True), repeat=3):
+        transform = []
+        for square in range(64):
+            column, row = square % 8, square // 8
+            if swap:
+                column, row = row, column
+            if flip_column:
+                column = 7 - column
+            if flip_row:
+                row = 7 - row
+            transform.append(row * 8 + column)
+        transforms.append(tuple(transform))
+    return tuple(transforms)
+
+
+TRANSFORMS = _build_transforms()
+TRIANGLE = tuple(row * 8 + column for column in range(4) for row in range(column + 1))
+TRIANGLE_INDEX = tuple(TRIANGLE.index(square) if square in TRIANGLE else -1 for square in range(64))
+# The symmetries that move each square into the triangle (two for squares on a diagonal, otherwise one)
+TRIANGLE_TRANSFORMS = tuple(tuple(transform for transform in TRANSFORMS if TRIANGLE_INDEX[transform[square]] >= 0)
+                            for square in range(64))
+
+
+# ------------------------------ Signatures ------------------------------ #
+
+def _piece_order_key(piece_code):
+    """Returns the sort key that puts piece codes in signature order."""
+    return piece_code // 6, SIGNATURE_TYPE_ORDER.index(piece_code % 6)
+
+
+def signature_name(piece_codes):
+    """Returns the signature of some pieces, such as "KRvKN"."""
+    sides = ["", ""]
+    for piece_code in sorted(piece_codes, key=_piece_order_key):
+        sides[piece_code // 6] += SIGNATURE_LETTERS[piece_code % 6]
+    return "v".join(sides)
+
+
+def signature_pieces(signature):
+    """Returns the piece codes of a signature, in signature order. Raises ValueError for an unknown signature."""
+    sides = signature.split("v")
+    if len(sides) != 2 or not all(side.startswith("K") and side.count("K") == 1 for side in sides):
+        raise ValueError(f"Expected a signature such as 'KQvK', not {signature!r}.")
+    piece_codes = []
+    for color, side in enumerate(sides):
+        for letter in side:
+            if letter not in "KQRBN":
+                raise ValueError(f"Unexpected piece {letter!r} in signature {signature!r}; tablebases have no pawns.")
+            piece_codes.append(color * 6 + "PNBRQK".index(letter))
+    return tuple(sorted(piece_codes, key=_piece_order_key))
+
+
+def signatures_up_to(max_pieces):
+    """Returns the signatures with both kings and up to max_pieces pieces, grouped into lists by piece count."""
+    groups = []
+    for piece_count in range(3, max_pieces + 1):
+        group = []
+        for white_count in range(piece_count - 1):
+            black_count = piece_count - 2 - white_count
+            for white_pieces in itertools.combinations_with_replacement((QUEEN, ROOK, BISHOP, KNIGHT), white_count):
+                for black_pieces in itertools.combinations_with_replacement((QUEEN, ROOK, BISHOP, KNIGHT), black_count):
+                    group.append(signature_name((KING, 6 + KING) + white_pieces
+                                                + tuple(6 + piece_type for piece_type in black_pieces)))
+        groups.append(group)
+    return groups
+
+
+def table_size(piece_count):
+    """Returns the number of indexes of a table with the given number of pieces."""
+    return 2 * len(TRIANGLE) * 64 ** (piece_count - 1)
+
+
+def position_index(squares, turn):
+    """
+    Returns the table index of the pieces on the given squares (in signature order) with the given player to move.
+    Of the symmetric copies of the position with the white king in the triangle, the smallest index is used,
+    so every copy of a position has the same index.
+    """
+    best_index = None
+    for transform in TRIANGLE_TRANSFORMS[squares[0]]:
+        index = TRIANGLE_INDEX[transform[squares[0]]]
+        for square in squares[1:]:
+            index = index * 64 + transform[square]
+        if best_index is None or index < best_index:
+            best_index = index
+    return best_index * 2 + turn
+
+
+def index_position(index, piece_count):
+    """Returns the (squares, turn) of a table index."""
+    index, turn = divmod(index, 2)
+    squares = []
+    for _ in range(piece_count - 1):
+        index, square = divmod(index, 64)
+        squares.append(square)
+    squares.append(TRIANGLE[index])
+    squares.reverse()
+    return squares, turn
+
+
+def _encode_value(outcome, distance):
+    """Returns the value byte of an outcome and distance."""
+    if outcome == DRAW:
+        return DRAW_VALUE
+    distance = min(distance, MAX_DISTANCE)
+    return WIN_VALUE_BASE + distance if outcome == WIN else LOSS_VALUE_BASE + distance
+
+
+def decode_value(value):
+    """Returns the TablebaseResult of a value byte, or None for 0 (not a position)."""
+    if value == 0:
+        return None
+    if value == DRAW_VALUE:
+        return TablebaseResult(DRAW, None)
+    if value <= LOSS_VALUE_BASE:
+        return TablebaseResult(WIN, value - WIN_VALUE_BASE)
+    return TablebaseResult(LOSS, value - LOSS_VALUE_BASE)
+
+
+# ------------------------------ Probing ------------------------------ #
+
+class Tablebase:
+    """
+    Represents a directory of table files. Tables are opened with mmap the first time they are needed,
+    so probing only reads the pages it touches and processes share them.
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        self._tables = {}               # Signature: mmap of its file, or None if there is no file for it
+        self._max_pieces = 2
+        for file_name in os.listdir(directory):
+            if file_name.endswith(TABLE_EXTENSION):
+                signature = file_name[:-len(TABLE_EXTENSION)]
+                self._max_pieces = max(self._max_pieces, len(signature) - 1)
+
+    def get_max_pieces(self):
+        """Returns the most pieces (kings included) of any table in the directory."""
+        return self._max_pieces
+
+    def close(self):
+        """Unmaps every table opened so far."""
+        for table in self._tables.values():
+            if table is not None:
+                table.close()
+        self._tables.clear()
+
+    def probe(self, game):
+        """
+        Returns the TablebaseResult of a game's position, or None if it is not covered
+        (the game is over, there are pawns, or there is no table for its pieces).
+        """
+        if game.is_game_over():
+            return None
+        occupied = game.get_occupancy()
+        if occupied.bit_count() > self._max_pieces or game.get_bitboard(WHITE, PAWN) or game.get_bitboard(BLACK, PAWN):
+            return None
+        pieces = sorted(((game.get_piece_code(square), square) for square in iter_squares(occupied)),
+                        key=lambda piece: _piece_order_key(piece[0]))
+        return self.probe_pieces([piece_code for piece_code, _ in pieces], [square for _, square in pieces],
+                                 game.get_turn())
+
+    def probe_pieces(self, piece_codes, squares, turn):
+        """
+        Returns the TablebaseResult of pieces (piece codes in signature order, with their squares) and the player to move,
+        or None if there is no table for them. Two bare kings are always a draw, since neither can capture.
+        """
+        if len(piece_codes) == 2:
+            return TablebaseResult(DRAW, None)
+        table = self._open_table(signature_name(piece_codes))
+        if table is None:
+            return None
+        return decode_value(table[TABLE_HEADER.size + position_index(squares, turn)])
+
+    def choose_move(self, game):
+        """
+        Returns the best move of a game's position according to the tables, or None if the position is not covered.
+        A win is played out as quickly as possible and a loss put off for as long as possible.
+        """
+        if self.probe(game) is None:
+            return None
+        turn = game.get_turn()
+        best_move, best_rank = None, None
+        for move in game.generate_legal_moves():
+            game.push(move)
+            if game.is_game_over():
+                # A king was blown up: the result for the opponent, who has no moves left
+                winner = WHITE if game.get_game_state() == WHITE_WON else BLACK
+                result = TablebaseResult(LOSS if winner == turn else WIN, 0)
+            else:
+                result = self.probe(game)
+            game.pop()
+            if result is None:
+                return None
+
+            # Rank from the mover's point of view: a quick win first, then a draw, then a slow loss
+            if result.outcome == LOSS:
+                rank = (2, -result.distance)
+            elif result.outcome == DRAW:
+                rank = (1, 0)
+            else:
+                rank = (0, result.distance)
+            if best_rank is None or rank > best_rank:
+                best_move, best_rank = move, rank
+        return best_move
+
+    def _open_table(self, signature):
+        """Returns the mmap of a signature's table, or None if it has no file."""
+        if signature not in self._tables:
+            path = os.path.join(self._directory, signature + TABLE_EXTENSION)
+            if not os.path.exists(path):
+                self._tables[signature] = None
+            else:
+                with open(path, "rb") as table_file:
+                    table = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, _ = TABLE_HEADER.unpack_from(table.read(TABLE_HEADER.size).ljust(TABLE_HEADER.size))
+                if magic != TABLE_MAGIC or version != TABLE_VERSION:
+                    table.close()
+                    raise ValueError(f"{path} is not a tablebase file of version {TABLE_VERSION}.")
+                self._tables[signature] = table
+        return self._tables[signature]
+
+
+# ------------------------------ Building ------------------------------ #
+
+def _piece_moves(piece_type, square, occupied):
+    """Returns the bitboard of tiles a (non-pawn) piece attacks or can move to, through empty tiles only."""
+    if piece_type == KING:
+        return KING_ATTACKS[square]
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[square]
+    if piece_type == BISHOP:
+        return sliding_attacks(square, occupied, BISHOP_DIRECTIONS)
+    if piece_type == ROOK:
+        return sliding_attacks(square, occupied, ROOK_DIRECTIONS)
+    return sliding_attacks(square, occupied, QUEEN_DIRECTIONS)
+
+
+def build_table(signature, directory):
+    """
+    Builds the table of one signature by retrograde analysis and writes it to the directory, where the tables of
+    every smaller signature must already be. Returns the signature and the number of (won, drawn, lost) positions.
+
+    Quiet moves stay within the table, so they are worked backwards from decided positions one ply at a time:
+    a position with a move to a lost position is won, and a position whose every move leads to a won position is lost.
+    Captures always remove pieces, so their results are looked up in smaller tables before the backward passes start.
+    """
+    piece_codes = signature_pieces(signature)
+    piece_count = len(piece_codes)
+    piece_types = [piece_code % 6 for piece_code in piece_codes]
+    piece_colors = [piece_code // 6 for piece_code in piece_codes]
+    smaller_tables = Tablebase(directory)
+
+    size = table_size(piece_count)
+    values = bytearray(size)
+    remaining_moves = bytearray(size)   # Quiet successors not yet known to be won for the opponent
+    capture_losses = bytearray(size)    # Longest loss among the captures, which all lose when a position has no better move
+    cannot_lose = bytearray(size)       # 1 if some capture wins or draws
+    pending = {}                        # Ply distance: positions whose capture result decides them at that distance
+
+    def schedule(distance, index):
+        pending.setdefault(distance, []).append(index)
+
+    # ---- Forward pass: count quiet moves and look up every capture ---- #
+    for index in range(size):
+        squares, turn = index_position(index, piece_count)
+        if len(set(squares)) != piece_count or position_index(squares, turn) != index:
+            # Two pieces on one tile, or a symmetric copy stored under a smaller index
+            continue
+
+        occupied = 0
+        kings = 0
+        for slot, square in enumerate(squares):
+            occupied |= BIT[square]
+            if piece_types[slot] == KING:
+                kings |= BIT[square]
+        enemy_pieces = 0
+        for slot, square in enumerate(squares):
+            if piece_colors[slot] != turn:
+                enemy_pieces |= BIT[square]
+
+        quiet_successors = set()
+        best_capture_win = 0
+        longest_capture_loss = 0
+        capture_draw = False
+
+        for slot, square in enumerate(squares):
+            if piece_colors[slot] != turn:
+                continue
+            moves = _piece_moves(piece_types[slot], square, occupied)
+
+            for destination_square in iter_squares(moves & ~occupied):
+                squares[slot] = destination_square
+                quiet_successors.add(position_index(squares, turn ^ 1))
+            squares[slot] = square
+
+            if piece_types[slot] == KING:
+                # A king cannot capture in atomic chess
+                continue
+            for destination_square in iter_squares(moves & enemy_pieces):
+                exploded = (BLAST_MASKS[destination_square] & occupied) | BIT[destination_square] | BIT[square]
+                kings_exploded = exploded & kings
+                if kings_exploded & (kings_exploded - 1):
+                    # We cannot explode two kings at the same time.
+                    continue
+
+                if kings_exploded:
+                    own_king_exploded = any(piece_types[other] == KING and piece_colors[other] == turn
+                                            and BIT[squares[other]] & kings_exploded for other in range(piece_count))
+                    if own_king_exploded:
+                        longest_capture_loss = max(longest_capture_loss, 1)
+                    else:
+                        best_capture_win = 1
+                    continue
+
+                survivors = [other for other in range(piece_count) if not exploded & BIT[squares[other]]]
+                result = smaller_tables.probe_pieces([piece_codes[other] for other in survivors],
+                                                     [squares[other] for other in survivors], turn ^ 1)
+                if result is None:
+                    raise ValueError(f"The table of {signature_name([piece_codes[other] for other in survivors])} "
+                                     f"must be built before {signature}.")
+                if result.outcome == DRAW:
+                    capture_draw = True
+                elif result.outcome == LOSS:
+                    distance = min(result.distance + 1, MAX_DISTANCE)
+                    if not best_capture_win or distance < best_capture_win:
+                        best_capture_win = distance
+                else:
+                    longest_capture_loss = max(longest_capture_loss, min(result.distance + 1, MAX_DISTANCE))
+
+        remaining_moves[index] = len(quiet_successors)
+        capture_losses[index] = longest_capture_loss
+        cannot_lose[index] = 1 if best_capture_win or capture_draw else 0
+
+        if best_capture_win:
+            schedule(best_capture_win, index)
+        elif not quiet_successors:
+            if longest_capture_loss and not capture_draw:
+                # Every move is a capture that loses
+                schedule(longest_capture_loss, index)
+            else:
+                # No moves at all (treated as a draw), or only captures that draw or lose
+                values[index] = DRAW_VALUE
+
+    # ---- Backward passes: one ply of distance at a time ---- #
+    distance = 1
+    decided = []
+    while decided or pending:
+        for index in pending.pop(distance, ()):
+            if values[index] == 0:
+                if cannot_lose[index]:
+                    values[index] = _encode_value(WIN, distance)
+                else:
+                    values[index] = _encode_value(LOSS, distance)
+                decided.append(index)
+
+        newly_decided = []
+        for decided_index in decided:
+            decided_lost = values[decided_index] > LOSS_VALUE_BASE
+            squares, turn = index_position(decided_index, piece_count)
+            occupied = 0
+            for square in squares:
+                occupied |= BIT[square]
+
+            # Every position one quiet move earlier: the player who just moved takes a piece back to where it came from
+            predecessors = set()
+            for slot, square in enumerate(squares):
+                if piece_colors[slot] == turn:
+                    continue
+                for origin_square in iter_squares(_piece_moves(piece_types[slot], square, occupied) & ~occupied):
+                    squares[slot] = origin_square
+                    predecessors.add(position_index(squares, turn ^ 1))
+                squares[slot] = square
+
+            for index in predecessors:
+                if values[index]:
+                    continue
+                if decided_lost:
+                    values[index] = _encode_value(WIN, distance + 1)
+                    newly_decided.append(index)
+                else:
+                    remaining_moves[index] -= 1
+                    if remaining_moves[index] == 0 and not cannot_lose[index]:
+                        loss_distance = max(distance + 1, capture_losses[index])
+                        if loss_distance == distance + 1:
+                            values[index] = _encode_value(LOSS, loss_distance)
+                            newly_decided.append(index)
+                        else:
+                            schedule(loss_distance, index)
+
+        decided = newly_decided
+        distance += 1
+
+    # Whatever is still undecided can be played forever without losing
+    won = drawn = lost = 0
+    for index in range(size):
+        if values[index] == 0:
+            squares, turn = index_position(index, piece_count)
+            if len(set(squares)) == piece_count and position_index(squares, turn) == index:
+                values[index] = DRAW_VALUE
+            else:
+                continue
+        if values[index] == DRAW_VALUE:
+            drawn += 1
+        elif values[index] > LOSS_VALUE_BASE:
+            lost += 1
+        else:
+            won += 1
+
+    smaller_tables.close()
+    temporary_path = os.path.join(directory, signature + TABLE_EXTENSION + ".tmp")
+    with open(temporary_path, "wb") as table_file:
+        table_file.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, signature.encode("ascii")))
+        table_file.write(values)
+    os.replace(temporary_path, os.path.join(directory, signature + TABLE_EXTENSION))
+    return signature, (won, drawn, lost)
+
+
+def _build_table_in_worker(job):
+    """Builds one table in a worker process of the pool."""
+    signature, directory = job
+    return build_table(signature, directory)
+
+
+def build_tablebases(directory, max_pieces=DEFAULT_MAX_PIECES, processes=None, rebuild=False):
+    """
+    Builds the tables of every signature up to max_pieces pieces into a directory, and yields
+    (signature, (won, drawn, lost)) as each table is finished. Signatures with the same number of pieces
+    are built in parallel across a pool of processes (one per core by default), fewest pieces first.
+    Tables already in the directory are kept unless rebuild is True.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with Pool(processes or os.cpu_count()) as pool:
+        for signatures in signatures_up_to(max_pieces):
+            jobs = [(signature, directory) for signature in signatures
+                    if rebuild or not os.path.exists(os.path.join(directory, signature + TABLE_EXTENSION))]
+            for finished in pool.imap_unordered(_build_table_in_worker, jobs):
+                yield finished
+
+
+if __name__ == "__main__":
+    # Usage: python tablebase.py build directory [max pieces]
+    #        python tablebase.py probe directory fen
+    command, tablebase_directory = sys.argv[1], sys.argv[2]
+
+    if command == "build":
+        requested_pieces = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_MAX_PIECES
+        for built_signature, (won_count, drawn_count, lost_count) in build_tablebases(tablebase_directory,
+                                                                                       requested_pieces):
+            print(f"{built_signature}: {won_count} won, {drawn_count} drawn, {lost_count} lost")
+    else:
+        position = AtomicGame(" ".join(sys.argv[3:]))
+        tablebase_result = Tablebase(tablebase_directory).probe(position)
+        if tablebase_result is None:
+            print("Not in the tablebase.")
+        elif tablebase_result.outcome == DRAW:
+            print("Draw")
+        else:
+            outcome_name = "wins" if tablebase_result.outcome == WIN else "loses"
+            print(f"{position.get_whose_turn()} {outcome_name} in {tablebase_result.distance} plies")
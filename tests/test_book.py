@@ -0,0 +1,83 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests the opening book: building it from games, writing the file, and probing it back.
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChessVar import AtomicGame, uci_to_move
+from book import BookBuilder, OpeningBook, BookEntry
+
+# The second game is a white win: the queen's capture on f7 blows up the black king next to it
+GAMES = (
+    ["e2e4", "e7e5", "g1f3"],
+    ["e2e4", "e7e5", "d1h5", "b8c6", "h5f7"],
+    ["d2d4", "d7d5"],
+)
+
+
+class OpeningBookTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "book.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def build(self, games, max_ply=16, min_weight=1):
+        """Builds a book of the games, writes it, and returns the number of records written."""
+        builder = BookBuilder(max_ply)
+        builder.add_games(games)
+        return builder.write(self.path, min_weight)
+
+    def test_write_then_probe(self):
+        self.assertEqual(self.build(GAMES), 8)
+        game = AtomicGame()
+        with OpeningBook(self.path) as book:
+            self.assertEqual(len(book), 8)
+            self.assertEqual(book.probe(game.get_hash()), [BookEntry(uci_to_move("e2e4"), 2, 1),
+                                                           BookEntry(uci_to_move("d2d4"), 1, 0)])
+            self.assertEqual(book.choose_move(game), uci_to_move("e2e4"))
+
+            game.push(uci_to_move("e2e4"))
+            self.assertEqual(book.probe(game.get_hash()), [BookEntry(uci_to_move("e7e5"), 2, -1)])
+            game.push(uci_to_move("e7e5"))
+            # Both moves were played once; the one that won comes first
+            self.assertEqual([entry.move for entry in book.probe(game.get_hash())],
+                             [uci_to_move("d1h5"), uci_to_move("g1f3")])
+
+            game.push(uci_to_move("a2a3"))
+            self.assertEqual(book.probe(game.get_hash()), [])
+            self.assertIsNone(book.choose_move(game))
+
+    def test_weighted_choice_and_limits(self):
+        self.assertEqual(self.build(GAMES, max_ply=1, min_weight=2), 1)
+        with OpeningBook(self.path) as book:
+            self.assertEqual(book.choose_move(AtomicGame(), random.Random(1)), uci_to_move("e2e4"))
+            self.assertIsNone(book.choose_move(AtomicGame(), min_weight=3))
+
+    def test_illegal_games_are_left_out(self):
+        builder = BookBuilder()
+        self.assertFalse(builder.add_game(["e2e4", "e2e4"]))
+        self.assertFalse(builder.add_game(["e2e9"]))
+        self.assertTrue(builder.add_game(GAMES[0]))
+        self.assertEqual((builder.get_games_added(), builder.get_games_rejected()), (1, 2))
+        self.assertEqual(builder.write(self.path), 3)
+
+    def test_not_a_book(self):
+        with open(self.path, "wb") as not_a_book:
+            not_a_book.write(b"These are not book moves.\n")
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests the append-only game store: adding games, reading them back by id, scanning, and reopening.
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChessVar import UNFINISHED, WHITE_WON, BLACK_WON, encode_move, uci_to_move
+from game_store import GameStore, move_codes
+
+GAMES = (
+    (["e2e4", "e7e5", "g1f3"], UNFINISHED),
+    (["d2d4", "d7d5", "c1g5", "c8g4", "g5e7"], WHITE_WON),
+    ([], BLACK_WON),
+)
+
+
+class GameStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "games.dat")
+        self.store = GameStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def assertStoredGame(self, stored_game, game_id):
+        moves, result = GAMES[game_id]
+        self.assertEqual(stored_game.game_id, game_id)
+        self.assertEqual(stored_game.result, result)
+        self.assertEqual(list(stored_game.moves), [encode_move(uci_to_move(move)) for move in moves])
+
+    def test_append_then_read_by_id(self):
+        self.assertEqual(len(self.store), 0)
+        for game_id, (moves, result) in enumerate(GAMES):
+            self.assertEqual(self.store.append_game(moves, result), game_id)
+        self.assertEqual(len(self.store), len(GAMES))
+        for game_id in reversed(range(len(GAMES))):
+            self.assertStoredGame(self.store.get_game(game_id), game_id)
+        with self.assertRaises(IndexError):
+            self.store.get_game(len(GAMES))
+        with self.assertRaises(IndexError):
+            self.store.get_game(-1)
+
+    def test_append_games_then_scan(self):
+        self.assertEqual(list(self.store.iter_games()), [])
+        self.assertEqual(self.store.append_games(GAMES), [0, 1, 2])
+        scanned = list(self.store.iter_games())
+        self.assertEqual(len(scanned), len(GAMES))
+        for game_id, stored_game in enumerate(scanned):
+            self.assertStoredGame(stored_game, game_id)
+        self.assertEqual([stored_game.game_id for stored_game in self.store.iter_games(1, 2)], [1])
+        self.assertEqual([stored_game.game_id for stored_game in self.store.iter_games(2, 10)], [2])
+
+    def test_moves_in_every_form(self):
+        moves = ["e2e4", uci_to_move("e7e5"), encode_move(uci_to_move("g1f3"))]
+        game_id = self.store.append_game(moves)
+        self.assertEqual(self.store.get_game(game_id).moves, move_codes(["e2e4", "e7e5", "g1f3"]))
+
+    def test_reopen_and_second_store(self):
+        self.store.append_games(GAMES[:2])
+        # Another store on the same files sees games added through the first one, and the other way around
+        with GameStore(self.path) as other_store:
+            self.assertEqual(len(other_store), 2)
+            self.assertStoredGame(other_store.get_game(1), 1)
+            other_store.append_game(*GAMES[2])
+        self.assertStoredGame(self.store.get_game(2), 2)
+
+        self.store.close()
+        self.store = GameStore(self.path)
+        self.assertEqual(len(self.store), len(GAMES))
+        for game_id, stored_game in enumerate(self.store.iter_games()):
+            self.assertStoredGame(stored_game, game_id)
+
+    def test_rejections(self):
+        with self.assertRaises(ValueError):
+            self.store.append_game(["e2e4"], "DRAW")
+        with self.assertRaises(ValueError):
+            self.store.append_game(["e2e9"])
+        self.assertEqual(len(self.store), 0)
+
+        not_a_store = os.path.join(self.directory.name, "notes.txt")
+        with open(not_a_store, "w") as notes:
+            notes.write("These are not games.\n")
+        with self.assertRaises(ValueError):
+            GameStore(not_a_store)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests that the move pipeline instrumentation sees moves made in batches (AtomicGame.apply_moves()),
+#              as the server's MOVES command and replay.py make them.
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ChessVar
+import instrumentation
+from ChessVar import AtomicGame, ERROR_EMPTY_TILE, ERROR_INVALID_CHARACTERS
+from server import GameServer
+
+
+class BatchInstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.INSTRUMENTATION.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.INSTRUMENTATION.reset()
+
+    def test_moves_command_is_counted(self):
+        server = GameServer()
+        self.assertEqual(server.handle_line("NEW"), "OK 1")
+        self.assertTrue(server.handle_line("MOVES 1 e2e4 e7e5 g1f3").startswith("OK "))
+        # The third move starts from an empty tile, so the batch stops there
+        self.assertTrue(server.handle_line("MOVES 1 b8c6 f1c4 e3e4").startswith("ILLEGAL 2 "))
+
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(snapshot.phases["move_lists"].calls, 2)
+        self.assertEqual(snapshot.phases["make_move"].calls, 6)
+        self.assertEqual(snapshot.rejections[ERROR_EMPTY_TILE], 1)
+
+    def test_unreadable_moves_are_counted(self):
+        game = AtomicGame()
+        game.apply_moves("e2e4 e2 e7e5", stop_at_error=False)
+
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(snapshot.phases["make_move"].calls, 2)
+        self.assertEqual(snapshot.rejections[ERROR_INVALID_CHARACTERS], 1)
+        self.assertEqual(game.get_ply(), 2)
+
+
+class DisabledInstrumentationTest(unittest.TestCase):
+
+    def test_disable_restores_the_pipeline(self):
+        original_parse_moves = ChessVar.parse_moves
+        instrumentation.enable()
+        self.assertIsNot(ChessVar.parse_moves, original_parse_moves)
+        instrumentation.disable()
+        self.assertIs(ChessVar.parse_moves, original_parse_moves)
+
+
+if __name__ == "__main__":
+    unittest.main()
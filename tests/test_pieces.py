@@ -0,0 +1,38 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests that the shared chess pieces stay unchanged and copy and pickle to themselves.
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import copy
+import os
+import pickle
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChessVar import AtomicGame, PIECES
+
+
+class SharedPieceTest(unittest.TestCase):
+
+    def test_pieces_cannot_be_changed(self):
+        with self.assertRaises(AttributeError):
+            PIECES[3]._color = "Black"
+
+    def test_pieces_copy_to_themselves(self):
+        for piece in PIECES:
+            self.assertIs(copy.copy(piece), piece)
+            self.assertIs(copy.deepcopy(piece), piece)
+            self.assertIs(pickle.loads(pickle.dumps(piece)), piece)
+
+    def test_board_of_pieces_can_be_copied(self):
+        game = AtomicGame()
+        board = {square: game.get_piece(square) for square in range(64) if game.get_piece(square) is not None}
+        self.assertEqual(copy.deepcopy(board), board)
+        self.assertEqual(pickle.loads(pickle.dumps(board)), board)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests the engine's pondering when its search ends by itself (depth limit reached) before the opponent moves.
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChessVar import AtomicGame, uci_to_move
+from engine import Engine
+
+# Long enough for a depth 2 search many times over
+PONDER_TIMEOUT = 30.0
+
+
+class PonderingTest(unittest.TestCase):
+
+    def wait_for_pondering(self, engine):
+        """Waits until the engine's pondering search ends by itself, failing the test after PONDER_TIMEOUT seconds."""
+        deadline = time.monotonic() + PONDER_TIMEOUT
+        while engine.is_pondering():
+            if time.monotonic() > deadline:
+                self.fail("The pondering search did not end by itself.")
+            time.sleep(0.01)
+
+    def test_finished_ponder_search_is_not_pondering(self):
+        engine = Engine(max_depth=2)
+        game = AtomicGame()
+        engine.start_pondering(game)
+        self.wait_for_pondering(engine)
+
+        self.assertFalse(engine.is_pondering())
+        engine.stop_pondering()
+        self.assertFalse(engine.is_pondering())
+
+    def test_finished_ponder_search_answers_a_ponder_hit(self):
+        game = AtomicGame()
+        game.push(uci_to_move("e2e4"))
+        reply = uci_to_move("e7e5")
+        after_reply = game.copy()
+        after_reply.push(reply)
+        fresh_result = Engine(max_depth=3).search(after_reply)
+
+        engine = Engine(max_depth=3)
+        engine.start_pondering(game, predicted_move=reply)
+        self.wait_for_pondering(engine)
+        # Without the table filled in from pondering, searching again would take as long as a fresh search
+        engine.get_transposition_table().clear()
+        game.push(reply)
+        start_time = time.perf_counter()
+        move = engine.choose_move(game)
+        elapsed = time.perf_counter() - start_time
+
+        # The pondering search already reached the depth limit, so its move is played without searching again
+        self.assertEqual(move, fresh_result.move)
+        self.assertLess(elapsed, fresh_result.elapsed / 4)
+        self.assertFalse(engine.is_pondering())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests the FEN-like text and 33-byte binary position formats, one position at a time and in bulk.
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import position_io
+from ChessVar import AtomicGame, POSITION_STRUCT, START_FEN, QUEEN
+
+
+def random_games(count, seed=1):
+    """Returns count games, each played from the start for a random number of random moves."""
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        game = AtomicGame()
+        for _ in range(rng.randrange(60)):
+            moves = game.generate_legal_moves()
+            if not moves:
+                break
+            game.push(rng.choice(moves))
+        games.append(game)
+    return games
+
+
+class PositionFormatTest(unittest.TestCase):
+
+    def test_start_position(self):
+        game = AtomicGame()
+        self.assertEqual(game.to_fen(), START_FEN)
+        self.assertEqual(len(game.to_bytes()), POSITION_STRUCT.size)
+
+    def test_round_trips(self):
+        for game in random_games(200):
+            record = game.to_bytes()
+            from_record = AtomicGame.from_bytes(record)
+            from_fen = AtomicGame(game.to_fen())
+            for loaded in (from_record, from_fen):
+                self.assertEqual(loaded.to_fen(), game.to_fen())
+                self.assertEqual(loaded.to_bytes(), record)
+                self.assertEqual(loaded.get_hash(), game.get_hash())
+                self.assertEqual(loaded.get_game_state(), game.get_game_state())
+                self.assertEqual(sorted(loaded.generate_legal_moves()), sorted(game.generate_legal_moves()))
+
+    def test_bulk_round_trip(self):
+        games = random_games(50, seed=2)
+        data = position_io.dumps_positions(games)
+        self.assertEqual(len(data), 50 * POSITION_STRUCT.size)
+        loaded = list(position_io.load_positions(data))
+        self.assertEqual([game.to_fen() for game in loaded], [game.to_fen() for game in games])
+        self.assertEqual(len(list(position_io.iter_position_records(data))), 50)
+        with self.assertRaises(ValueError):
+            list(position_io.load_positions(data[:-1]))
+
+    def test_unpackable_positions_are_rejected(self):
+        for fen in ("QQQQQQQQ/QQQQQQQQ/QQQQQQQQ/QQQQQQQQ/QQQQQQQQ/8/8/K6k w -",
+                    "KKKKKKKK/8/8/8/8/8/8/7k w -",
+                    "8/8/8/8/8/8/8/7k w",
+                    "8/8/8/8/8/8/7k w -",
+                    "8/8/8/8/8/8/8/6xk w -"):
+            with self.assertRaises(ValueError):
+                AtomicGame(fen)
+
+        game = AtomicGame("8/8/8/8/8/8/8/K6k w -")
+        for square in range(8, 41):
+            game.put_piece(QUEEN, square)
+        with self.assertRaises(ValueError):
+            game.to_bytes()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests the game server's line protocol: each command's response, error answers, move statistics,
+#              packing idle games, and a connection that sends a line past the reader's limit.
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ChessVar import START_FEN
+from server import GameServer
+
+
+class HandleLineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = GameServer()
+
+    def test_new_and_state(self):
+        self.assertEqual(self.server.handle_line("NEW"), "OK 1")
+        self.assertEqual(self.server.handle_line("new 4k3/8/8/8/8/8/8/4K3 b -"), "OK 2")
+        self.assertEqual(self.server.handle_line("STATE 1"), f"OK UNFINISHED White {START_FEN}")
+        self.assertEqual(self.server.handle_line("STATE 2"), "OK UNFINISHED Black 4k3/8/8/8/8/8/8/4K3 b -")
+        self.assertEqual(self.server.get_game_count(), 2)
+
+    def test_new_rejections(self):
+        self.assertTrue(self.server.handle_line("NEW nonsense").startswith("ERR "))
+        self.assertEqual(self.server.handle_line("NEW 8/8/8/8/8/8/8/K7 w -"),
+                         "ERR A game must start with one king of each color.")
+        self.assertEqual(self.server.get_game_count(), 0)
+
+    def test_move(self):
+        self.server.handle_line("NEW")
+        self.assertEqual(self.server.handle_line("MOVE 1 e2e4"), "OK UNFINISHED Black -")
+        self.assertEqual(self.server.handle_line("MOVE 1 e2e4"), "ILLEGAL 5 No piece to move on that tile.")
+        self.assertEqual(self.server.handle_line("MOVE 1"), "ERR Expected MOVE <game id> <move>.")
+
+    def test_unreadable_moves(self):
+        self.server.handle_line("NEW")
+        # Digits outside a-h and 1-8 (even ones int() could read) are answered like any other tile off the board
+        self.assertEqual(self.server.handle_line("MOVE 1 e²e4"), "ILLEGAL 2 Move is out of bounds.")
+        self.assertEqual(self.server.handle_line("MOVE 1 e٢e٤"), "ILLEGAL 2 Move is out of bounds.")
+        self.assertEqual(self.server.handle_line("MOVES 1 e²e4 e7e5"), "ILLEGAL 0 2 Move is out of bounds.")
+        self.assertEqual(self.server.handle_line("STATE 1"), f"OK UNFINISHED White {START_FEN}")
+
+    def test_moves(self):
+        self.server.handle_line("NEW")
+        self.assertEqual(self.server.handle_line("MOVES 1 e2e4 e7e5 g1f3"), "OK UNFINISHED Black 3")
+        self.assertEqual(self.server.handle_line("MOVES 1 b8c6 d1h5 c6d4"),
+                         "ILLEGAL 1 7 Your piece cannot make that move.")
+        self.assertEqual(self.server.handle_line("MOVES 1"), "ERR Expected MOVES <game id> <move> <move> ...")
+
+        self.server.handle_line("NEW")
+        # The queen's capture on f7 blows up the black king next to it
+        self.assertEqual(self.server.handle_line("MOVES 2 e2e4 e7e5 d1h5 b8c6 h5f7"), "OK WHITE_WON White 5")
+        self.assertEqual(self.server.handle_line("MOVE 2 a7a6"), "ILLEGAL 4 Game has ended.")
+
+    def test_resign(self):
+        self.server.handle_line("NEW")
+        self.assertEqual(self.server.handle_line("RESIGN 1"), "OK BLACK_WON")
+        self.assertEqual(self.server.handle_line("RESIGN 1"), "ERR Game has ended.")
+        self.assertTrue(self.server.handle_line("STATE 1").startswith("OK BLACK_WON White "))
+
+    def test_stats_count_every_move(self):
+        self.server.handle_line("NEW")
+        self.server.handle_line("NEW")
+        self.server.handle_line("MOVE 1 e2e4")
+        self.server.handle_line("MOVES 2 e2e4 e7e5 g1f3")
+        # The batch stops at its second move, which is still counted as a move tried
+        self.server.handle_line("MOVES 2 b8c6 e2e4")
+        self.assertTrue(self.server.handle_line("STATS 1").startswith("OK moves=1 "))
+        self.assertTrue(self.server.handle_line("STATS 2").startswith("OK moves=5 "))
+        self.assertTrue(self.server.handle_line("STATS").startswith("OK games=2 active=2 moves=6 "))
+
+    def test_errors(self):
+        self.assertEqual(self.server.handle_line(""), "ERR Empty command.")
+        self.assertEqual(self.server.handle_line("FOO 1"), "ERR Unknown command 'FOO'.")
+        self.assertEqual(self.server.handle_line("STATE x"), "ERR Game id 'x' is not a number.")
+        self.assertEqual(self.server.handle_line("STATE 9"), "ERR Unknown game 9.")
+        self.assertEqual(self.server.handle_line("STATS 1 2"), "ERR Expected STATS [game id].")
+
+    def test_idle_games_are_packed(self):
+        server = GameServer(active_limit=1)
+        server.handle_line("NEW")
+        server.handle_line("MOVE 1 e2e4")
+        server.handle_line("NEW")
+        server.handle_line("RESIGN 2")
+        self.assertEqual(server.get_active_count(), 1)
+        # Each game is unpacked as it was left, including a result the position alone cannot show
+        self.assertEqual(server.handle_line("MOVE 1 e7e5"), "OK UNFINISHED White -")
+        self.assertTrue(server.handle_line("STATE 2").startswith("OK BLACK_WON White "))
+        self.assertEqual(server.get_active_count(), 1)
+        self.assertEqual(server.get_game_count(), 2)
+
+
+class RecordingWriter:
+    """Stands in for an asyncio.StreamWriter, keeping everything written to it."""
+
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class HandleConnectionTest(unittest.TestCase):
+
+    def answer(self, data, limit=64):
+        """Returns the response lines the server writes for the data sent on one connection."""
+        async def run():
+            reader = asyncio.StreamReader(limit=limit)
+            reader.feed_data(data)
+            reader.feed_eof()
+            writer = RecordingWriter()
+            await GameServer().handle_connection(reader, writer)
+            self.assertTrue(writer.closed)
+            return writer.data.decode("utf-8").splitlines()
+        return asyncio.run(run())
+
+    def test_commands_until_quit(self):
+        self.assertEqual(self.answer(b"NEW\nMOVE 1 e2e4\nQUIT\nSTATE 1\n"),
+                         ["OK 1", "OK UNFINISHED Black -", "OK bye"])
+
+    def test_overlong_line(self):
+        self.assertEqual(self.answer(b"NEW\nMOVES 1" + b" e2e4" * 40 + b"\nMOVE 1 e2e4\n"),
+                         ["OK 1", "ERR Line too long.", "OK UNFINISHED Black -"])
+
+
+if __name__ == "__main__":
+    unittest.main()
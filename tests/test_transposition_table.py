@@ -0,0 +1,36 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Tests the transposition table's replacement policy and clear().
+#              Run "python -m unittest discover tests" or "python -m pytest tests".
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transposition_table import TranspositionTable, EXACT, LOWER_BOUND
+
+POSITION_HASH = 0x123456789ABCDEF0
+
+
+class TranspositionTableTest(unittest.TestCase):
+
+    def test_best_move_is_kept_for_a_result_without_one(self):
+        table = TranspositionTable(size_mb=1)
+        table.store(POSITION_HASH, 3, 10, EXACT, 777)
+        table.store(POSITION_HASH, 4, 5, LOWER_BOUND)
+        self.assertEqual(table.probe(POSITION_HASH), (4, 5, LOWER_BOUND, 777))
+
+    def test_clear_forgets_best_moves(self):
+        table = TranspositionTable(size_mb=1)
+        table.store(POSITION_HASH, 3, 10, EXACT, 777)
+        table.clear()
+        self.assertIsNone(table.probe(POSITION_HASH))
+        table.store(POSITION_HASH, 1, 5, LOWER_BOUND)
+        self.assertEqual(table.probe(POSITION_HASH), (1, 5, LOWER_BOUND, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
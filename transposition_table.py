@@ -0,0 +1,94 @@
+# Author: Joshua Arnett
+# GitHub username: joshua-arnett
+# Date: 10/18/26
+# Description: Defines a fixed-size transposition table that stores search results by Zobrist hash (see AtomicGame.get_hash()).
+
+from array import array
+
+# Kinds of score stored in an entry. EMPTY_SLOT marks a slot that has never been written.
+EMPTY_SLOT = 0
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+# Bytes used by one entry: key (8), score (4), move (2), depth (1), flag (1) and generation (1).
+ENTRY_SIZE = 17
+
+
+class TranspositionTable:
+    """
+    Represents a transposition table with a fixed number of slots, chosen from a memory budget in megabytes.
+    Each position hash maps to one slot. Entries are kept in typed arrays, so the table never grows after it is created.
+
+    When two positions share a slot, the new entry replaces the stored one if the slot holds the same position,
+    if the stored entry was written during an earlier search, or if the new entry was searched at least as deep.
+    Otherwise the deeper, current entry is kept.
+    """
+
+    def __init__(self, size_mb=16):
+        # The number of slots is rounded down to a power of two, so that a slot is found by masking the hash.
+        slot_count = 1
+        while slot_count * 2 * ENTRY_SIZE <= size_mb * 1024 * 1024:
+            slot_count *= 2
+
+        self._mask = slot_count - 1
+        self._keys = array("Q", bytes(8 * slot_count))
+        self._scores = array("i", bytes(4 * slot_count))
+        self._moves = array("H", bytes(2 * slot_count))
+        self._depths = array("B", bytes(slot_count))
+        self._flags = array("B", bytes(slot_count))
+        self._generations = array("B", bytes(slot_count))
+        self._generation = 0
+
+    def get_slot_count(self):
+        """Returns the number of entries the table can hold."""
+        return self._mask + 1
+
+    def new_search(self):
+        """Marks the start of a new search, so entries from earlier searches are replaced first."""
+        self._generation = (self._generation + 1) & 255
+
+    def clear(self):
+        """Empties every slot."""
+        slot_count = self._mask + 1
+        self._flags = array("B", bytes(slot_count))
+        self._generation = 0
+
+    def store(self, position_hash, depth, score, flag, move_code=0):
+        """
+        Stores a search result for a position, subject to the replacement policy.
+        flag is EXACT, LOWER_BOUND or UPPER_BOUND, and move_code is the best move packed by encode_move() (0 for none).
+        """
+        slot = position_hash & self._mask
+        if (self._flags[slot] != EMPTY_SLOT and self._keys[slot] != position_hash
+                and self._generations[slot] == self._generation and self._depths[slot] > depth):
+            # Keep the deeper entry from this search
+            return
+
+        if move_code == 0 and self._flags[slot] != EMPTY_SLOT and self._keys[slot] == position_hash:
+            # Do not forget the best move of a position just because this result has none
+            # (a cleared slot keeps its old key and move, but they no longer count)
+            move_code = self._moves[slot]
+
+        self._keys[slot] = position_hash
+        self._scores[slot] = score
+        self._moves[slot] = move_code
+        self._depths[slot] = min(depth, 255)
+        self._flags[slot] = flag
+        self._generations[slot] = self._generation
+
+    def probe(self, position_hash):
+        """Returns the (depth, score, flag, move code) stored for a position, or None if it is not in the table."""
+        slot = position_hash & self._mask
+        if self._flags[slot] == EMPTY_SLOT or self._keys[slot] != position_hash:
+            return None
+        return self._depths[slot], self._scores[slot], self._flags[slot], self._moves[slot]
+
+    def get_fill_permille(self, sample_size=1000):
+        """Returns roughly how many of every 1000 slots hold an entry from the current search."""
+        sample_size = min(sample_size, self._mask + 1)
+        used = 0
+        for slot in range(sample_size):
+            if self._flags[slot] != EMPTY_SLOT and self._generations[slot] == self._generation:
+                used += 1
+        return used * 1000 // sample_size